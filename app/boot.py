@@ -4,10 +4,18 @@ boot.py
 
 import sys
 import gc
+import micropython
 
 # 添加 lib 目录到 Python 搜索路径
 # 这样就可以使用 from lib.module import Class 的导入方式
 sys.path.append("/lib")
 
-# 初始化垃圾回收
-gc.collect()
+# 中断回调中抛出的异常需要紧急缓冲区才能打印回溯
+micropython.alloc_emergency_exception_buf(100)
+
+# 初始化垃圾回收: 经回收调度器执行, 同时按启动后的空闲堆设置 gc.threshold
+try:
+    from lib.gc_scheduler import get_gc_scheduler
+    get_gc_scheduler().collect_now("boot")
+except Exception:
+    gc.collect()
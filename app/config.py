@@ -20,7 +20,7 @@ CONFIG = {
         "max_error_count": 10,
         # 描述: 看门狗定时器(WDT)的超时时间, 单位为毫秒。
         # 影响: 如果主程序在指定时间内没有"喂狗"(feed), 看门狗将强制重启设备。这是防止固件死锁或主循环卡死的最后防线。
-        # 建议: 60000-300000 毫秒, 必须远大于主循环的正常执行时间。
+        # 建议: 60000-300000 毫秒, 必须远大于主循环的正常执行时间。主循环按该值的 1/4 周期登记喂狗截止时间, 休眠不会越过它。
         "wdt_timeout": 60000,
         # 描述: 是否启用硬件看门狗。
         # 影响: 生产环境中强烈建议启用, 以保证设备在无人值守的情况下能从未知错误中自愈。开发调试时可关闭。
@@ -28,10 +28,74 @@ CONFIG = {
         "wdt_enabled": True,
     },
     "system": {
-        # 描述: 主循环(main loop)的延迟时间, 单位为毫秒。
-        # 影响: 这是主循环每次迭代的间隔, 直接影响系统的响应速度和CPU使用率。值越小响应越快, 但CPU占用越高, 也越耗电。
-        # 建议: 50-1000 毫秒。
-        "main_loop_delay": 25,
+        # 描述: 主循环最长休眠时间, 单位为毫秒。主循环按各子系统声明的最近截止时间休眠, 不超过该值
+        # 影响: 仅作安全上限(喂狗、GC 间隔都已登记为截止时间); 值越大空闲时唤醒越少、越省电
+        # 建议: 10000-60000 毫秒
+        "loop_max_sleep_ms": 30000,
+        # 描述: 是否允许主循环以 machine.lightsleep 休眠
+        # 影响: 仅在无待分发事件、网络离线且处于共享退避时生效; lightsleep 期间事件循环与硬件定时器暂停,
+        #       正在播放的 LED 动画先暂停并熄灭, 醒来后恢复原模式
+        # 建议: 电池供电节点 True; 需要 LED 动画持续显示或低延迟响应时 False
+        "lightsleep": False,
+        # 描述: 是否启用主循环剖析(每轮、各阶段耗时与休眠超时的 ticks_us 直方图)
+        # 影响: 每个阶段多两次 ticks_us 与一次分桶计数, 不分配内存; 结果随子系统诊断上报(state/diag/loop)
+        # 建议: 常态开启 True, 便于现场定位阻塞主循环的环节
+        "loop_profiling": True,
+        # 描述: 是否启用事件总线回调耗时剖析
+        # 影响: 开启后统计每个 (事件, 回调) 的次数/总耗时/最大耗时/直方图, 并随周期指标上报; 关闭时几乎零开销
+        # 建议: 排查主循环卡顿时开启, 常态关闭
+        "event_profiling": False,
+        # 描述: 慢回调阈值, 单位微秒
+        # 影响: 单次回调耗时超过该值即标记为慢回调并打印一次告警
+        # 建议: 10000-50000 微秒
+        "slow_callback_us": 20000,
+        # 描述: 是否启用事件总线二进制追踪(发布/分发写入 RAM 环形缓冲, 重启前落盘 /trace.bin)
+        # 影响: 每次发布与分发多一次 struct.pack_into; 占用 trace_entries * 12 字节 RAM
+        # 建议: 复现重连风暴等问题时开启, 取回文件后用 tools/trace_replay.py 解码回放
+        "event_trace": False,
+        # 描述: 追踪缓冲容量(条), 满后覆盖最旧记录
+        # 影响: 容量越大可回溯时间越长, RAM 占用线性增加
+        # 建议: 128-512
+        "trace_entries": 256,
+    },
+    "button": {
+        # 描述: 是否挂载按键中断; 按下时经 EventBus.publish_from_isr 发布 button.press, 并上报 state/button
+        # 影响: 中断中不分配内存, 按键事件经预分配槽位进入总线; 关闭后该引脚不配置中断
+        # 建议: 开发板 BOOT 键可直接使用 True; 引脚另作他用时 False
+        "enabled": True,
+        # 描述: 按键引脚(按下接地, 启用内部上拉)
+        # 影响: ESP32-C3 的 GPIO 9 为 BOOT 键, 上电时按住会进入下载模式
+        # 建议: 9
+        "pin": 9,
+        # 描述: 软件消抖时间, 单位为毫秒; 距上次有效按下不足该时长的边沿被丢弃
+        # 影响: 过短会把一次按下记为多次, 过长会漏掉快速连按
+        # 建议: 30-100 毫秒
+        "debounce_ms": 50,
+    },
+    "jobs": {
+        # 周期作业: interval_ms 周期, jitter_ms 每次叠加的随机延后上限, priority 同时到期时大者先执行,
+        # budget_ms 单次耗时预算(超出计为 overrun 并告警, 随 state/diag/sched 上报)
+        # 同时到期的作业每轮主循环只执行一个, 其间让出事件循环, 不再集中在同一节拍
+        # 描述: 空闲垃圾回收作业, 提出回收请求并在事件队列为空时立即执行
+        # 影响: 周期越短堆碎片越少, 但回收本身会阻塞主循环数毫秒
+        # 建议: 30000-120000 毫秒
+        "gc.idle": {"interval_ms": 60000, "jitter_ms": 3000, "priority": 3, "budget_ms": 30},
+        # 描述: 传感器采样作业, 读取 MCU 温度与 SHT40 温湿度并发布温湿度保留主题
+        # 影响: 决定温湿度上报的时间分辨率; SHT40 高精度测量约阻塞 10ms
+        # 建议: 10000-300000 毫秒
+        "sensor.sample": {"interval_ms": 60000, "jitter_ms": 2000, "priority": 2, "budget_ms": 50},
+        # 描述: 指标上报作业, 输出系统状态日志并发布聚合指标(及事件剖析报告)
+        # 影响: 周期越短诊断越及时, 但 JSON 编码与 MQTT 发布占用更多 CPU 与流量
+        # 建议: 30000-300000 毫秒
+        "metrics.publish": {"interval_ms": 60000, "jitter_ms": 5000, "priority": 1, "budget_ms": 100},
+        # 描述: 子系统诊断上报作业, 每次轮流发布一项(link/warm/sched/gc/fsm/loop)到 state/diag/<名称>
+        # 影响: 每项的上报周期为 interval_ms * 项数; 单条报文较小, 避免周期指标携带全部诊断造成大块堆分配
+        # 建议: 60000-600000 毫秒
+        "diag.publish": {"interval_ms": 120000, "jitter_ms": 10000, "priority": 0, "budget_ms": 100},
+        # 描述: 热启动快照刷新作业
+        # 影响: 须明显短于 warm_boot.max_age_s, 否则复位时快照可能已过期
+        # 建议: 60000-600000 毫秒
+        "warm.save": {"interval_ms": 60000, "jitter_ms": 5000, "priority": 0, "budget_ms": 10},
     },
     "wifi": {
         # 描述: 可用的WiFi网络列表
@@ -97,6 +161,69 @@ CONFIG = {
         # 建议: 生产环境 False; 调试按需开启 True
         "enable_log_forward": False,
     },
+    "link": {
+        # 描述: 链路稳定窗口, 单位毫秒。WiFi+MQTT 连通后需持续该时长才视为"已连接"(发布连接事件、online 与 HA Discovery)
+        # 影响: 窗口内断开的连接不会让状态机进入 RUNNING, 也不会重复发布 Discovery; 值越大确认越慢
+        # 建议: 3000-10000 毫秒; 0 表示关闭迟滞, 连通即确认
+        "stable_ms": 5000,
+        # 描述: 抖动判定窗口, 单位毫秒。链路连通后在该时长内断开记为一次抖动(flap)
+        # 影响: 连续抖动达到阈值后进入共享退避; 连通超过该时长后断开会清零连续抖动计数
+        # 建议: 30000-120000 毫秒
+        "flap_window_ms": 60000,
+        # 描述: 触发共享退避的连续抖动次数
+        # 影响: 达到后 WiFi 与 MQTT 重连共同暂停, 每多一次抖动退避时间翻倍
+        # 建议: 2-5 次
+        "flap_threshold": 3,
+        # 描述: 共享退避基础时长, 单位毫秒
+        # 影响: 达到抖动阈值时 WiFi+MQTT 一起暂停重连的起始时长(叠加 ±20% 抖动)
+        # 建议: 10000-60000 毫秒
+        "flap_backoff_ms": 30000,
+        # 描述: 共享退避最大时长, 单位毫秒
+        # 影响: 限制持续抖动时的最长暂停
+        # 建议: 300000-900000 毫秒
+        "flap_backoff_max_ms": 600000,
+    },
+    "warm_boot": {
+        # 描述: 是否启用热启动快照(RTC 内存保存上次的 AP/IP/NTP/Discovery 状态, 不可用时退回 Flash /warm.bin)
+        # 影响: 看门狗/错误复位后直连上次的 AP、复用 IP、跳过 NTP 与未变化的 Discovery, 到达 RUNNING 从数秒缩短到约 1 秒
+        # 建议: 生产环境 True
+        "enabled": True,
+        # 描述: 快照有效期, 单位秒。复位时快照保存时间超过该值则按冷启动处理
+        # 影响: warm.save 作业定期刷新保存时间, 正常运行中复位时快照总是有效
+        # 建议: 600-3600 秒
+        "max_age_s": 3600,
+        # 描述: 复用 IP 配置的最长时间, 单位秒(自 DHCP 获取起), 超过后重新走 DHCP
+        # 影响: 应小于路由器 DHCP 租期, 否则可能与其他设备地址冲突
+        # 建议: 路由器租期的一半, 通常 1800-43200 秒
+        "lease_s": 1800,
+        # 描述: 沿用上次 NTP 同步的最长时间, 单位秒
+        # 影响: 复位后 RTC 保持走时, 在该时间内跳过 NTP; 超过后重新同步以校正漂移
+        # 建议: 3600-86400 秒
+        "ntp_max_age_s": 21600,
+        # 描述: 热启动后首次链路确认的稳定窗口, 单位毫秒(替代 link.stable_ms, 仅首次生效)
+        # 影响: 上次运行已验证的链路可更快确认并进入 RUNNING
+        # 建议: 500-2000 毫秒
+        "stable_ms": 1000,
+    },
+    "duty_cycle": {
+        # 描述: 是否启用深睡眠占空比模式(电池供电节点)
+        # 影响: 开启后每次唤醒只采样、快速联网、发布一条合并载荷到 state/telemetry 后 machine.deepsleep;
+        #       不运行主循环/FSM, 不保持 MQTT 连接, 不发布 HA Discovery 与温湿度分离主题
+        # 建议: 市电供电 False; 电池供电 True, 并保持 warm_boot.enabled
+        "enabled": False,
+        # 描述: 采样周期, 单位秒(从本次唤醒到下次唤醒)
+        # 影响: 决定数据分辨率与电池寿命; 应小于 warm_boot.max_age_s, 否则每次都按冷启动联网
+        # 建议: 60-1800 秒
+        "interval_s": 300,
+        # 描述: 单次唤醒联网(WiFi+NTP+MQTT)的最长时间, 单位毫秒
+        # 影响: 超时即放弃本次发送, 读数保留到下次唤醒; 同时决定看门狗超时(另加 10 秒余量)
+        # 建议: 8000-20000 毫秒
+        "connect_timeout_ms": 15000,
+        # 描述: RTC 内存中最多保留的未发送读数条数(上限 64)
+        # 影响: 超出时丢弃最旧读数并计数(载荷 dropped 字段); 每条占 8 字节 RTC 内存
+        # 建议: 16-64
+        "max_backlog": 32,
+    },
     "ntp": {
         # 描述: NTP服务器地址
         # 影响: 设备将从此服务器同步时间
@@ -0,0 +1,139 @@
+# app/duty_cycle.py
+"""
+深睡眠占空比遥测模式(电池供电节点)
+职责:
+- 每次唤醒即一个周期: 读取 SHT40 与 MCU 温度 → 快速联网(热启动快照中的 BSSID/信道、IP 与 NTP)
+  → 发布一条合并载荷(本次与积压的读数) → 断开 → machine.deepsleep 到下一周期
+- 发送失败的读数保存在 RTC 内存(lib.warm_boot 读数积压), 随下次唤醒一起发送
+- 载荷以 QoS 0 发布(lib.umqtt_lock 不支持 QoS 1 确认), 完整写入套接字即视为已发送,
+  随后的 MQTT DISCONNECT 使 broker 在关闭连接前处理完该报文
+- 测量每周期空口时间(开始联网到断开), 载荷携带上一周期的完整空口时间, 用于估算电池寿命
+
+设计边界:
+- 由 CONFIG["duty_cycle"]["enabled"] 选择; 不装配 MainController/FSM, 不启动网络后台任务
+- 联网整体受 connect_timeout_ms 限制; 看门狗兜底, 卡死时复位即进入下一周期
+- 任何异常都以深睡眠结束, 不在唤醒状态下重试耗电
+- 依赖 warm_boot.enabled; warm_boot.max_age_s 应大于 interval_s, 否则每次唤醒都按冷启动扫描 + DHCP + NTP
+"""
+
+import utime as time
+import machine
+import uasyncio as asyncio
+from lib.logger import info, warning, error
+from lib.event_bus_lock import EventBus
+from lib.warm_boot import get_warm_boot
+from utils import get_temperature, get_epoch_unix_s
+
+MIN_SLEEP_MS = 1000  # 本周期已超出间隔时的最短休眠
+WDT_MARGIN_MS = 10000  # 看门狗超时 = 联网超时 + 该余量(采样、发布与断开)
+
+
+class DutyCycle:
+    """深睡眠占空比: run() 完成一个周期并以 deepsleep 结束"""
+
+    def __init__(self, config):
+        self.config = config
+        duty_cfg = config.get("duty_cycle", {})
+        self.interval_ms = int(duty_cfg.get("interval_s", 300)) * 1000
+        self.connect_timeout_ms = int(duty_cfg.get("connect_timeout_ms", 15000))
+        self.max_backlog = int(duty_cfg.get("max_backlog", 32))
+
+        self.warm = get_warm_boot(config.get("warm_boot", {}))
+        self.wdt = None
+        try:
+            if config.get("daemon", {}).get("wdt_enabled", True) and hasattr(machine, "WDT"):
+                self.wdt = machine.WDT(timeout=self.connect_timeout_ms + WDT_MARGIN_MS)
+        except Exception:
+            self.wdt = None
+
+        from net.network_manager import NetworkManager
+        self.network_manager = NetworkManager(config, EventBus(), autostart=False)
+
+    def _sample(self):
+        """读取环境温湿度与 MCU 温度, 读取失败的值为 None"""
+        env_temp = env_hum = None
+        try:
+            from hw.sht40 import read
+            env_data = read()
+            if isinstance(env_data, dict):
+                env_temp = env_data["temperature"]
+                env_hum = env_data["humidity"]
+        except Exception as e:
+            warning("SHT40 读取失败: {}", e, module="DUTY")
+        return env_temp, env_hum, get_temperature()
+
+    async def _connect(self):
+        """WiFi -> NTP -> MQTT, 整体不超过 connect_timeout_ms"""
+        try:
+            return await asyncio.wait_for_ms(self.network_manager.connect_once(), self.connect_timeout_ms)
+        except asyncio.TimeoutError:
+            warning("联网超时({} ms)", self.connect_timeout_ms, module="DUTY")
+        except Exception as e:
+            error("联网异常: {}", e, module="DUTY")
+        return False
+
+    def _time_valid(self):
+        """RTC 时间可信: 本周期已同步 NTP, 或上次同步仍在有效期内"""
+        return self.network_manager.ntp_synced or self.warm.ntp_valid()
+
+    def _publish(self, mcu_temp, connect_ms):
+        """发布合并载荷: 积压读数(含本次)与周期统计"""
+        readings = []
+        for ts, temp, hum in self.warm.get_readings():
+            readings.append({
+                "ts": get_epoch_unix_s(ts) if ts else None,
+                "temperature": temp,
+                "humidity": hum,
+            })
+        payload = {
+            "readings": readings,
+            "mcu_temp_c": mcu_temp,
+            "connect_ms": connect_ms,
+            "air_ms_prev": self.warm.air_ms,
+            "cycles": self.warm.cycles,
+            "failed_cycles": self.warm.failed_cycles,
+            "dropped": self.warm.dropped,
+            "warm": self.warm.warm,
+            "interval_s": self.interval_ms // 1000,
+        }
+        nm = self.network_manager
+        return nm.mqtt_publish(nm.get_state_topic("telemetry"), payload, retain=False, qos=0)
+
+    async def _cycle(self, start):
+        env_temp, env_hum, mcu_temp = self._sample()
+
+        air_start = time.ticks_ms()
+        connected = await self._connect()
+        connect_ms = time.ticks_diff(time.ticks_ms(), air_start)
+
+        # 采样发生在联网之前: 冷启动时先同步 NTP 再回推采样时刻
+        ts = time.time() - connect_ms // 1000 if self._time_valid() else 0
+        self.warm.push_reading(ts, env_temp, env_hum, self.max_backlog)
+        pending = len(self.warm.readings)
+
+        sent = False
+        if connected:
+            sent = self._publish(mcu_temp, connect_ms)
+            if sent:
+                self.warm.clear_readings()
+        self.network_manager.disconnect(offline=False)
+        air_ms = time.ticks_diff(time.ticks_ms(), air_start)
+
+        self.warm.record_cycle(air_ms, sent)
+        self.warm.save()
+        info("占空比周期: {} 条读数{}, 空口 {} ms(联网 {} ms), 唤醒 {} ms",
+             pending, "已发送" if sent else "保留待发", air_ms, connect_ms,
+             time.ticks_diff(time.ticks_ms(), start), module="DUTY")
+
+    async def run(self):
+        """完成一个周期后深睡眠到下一周期(按唤醒时刻对齐间隔)"""
+        start = time.ticks_ms()
+        try:
+            await self._cycle(start)
+        except Exception as e:
+            error("占空比周期异常: {}", e, module="DUTY")
+        awake_ms = time.ticks_diff(time.ticks_ms(), start)
+        sleep_ms = self.interval_ms - awake_ms
+        if sleep_ms < MIN_SLEEP_MS:
+            sleep_ms = MIN_SLEEP_MS
+        machine.deepsleep(sleep_ms)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+按键中断模块
+
+设计目标:
+- 引脚下降沿 IRQ 经 EventBus.publish_from_isr 发布 button.press, 中断中不分配堆内存
+- 软件消抖: 距上次有效按下不足 debounce_ms 的边沿直接丢弃
+- 单例模式: attach() 后生效, cleanup() 解除中断
+
+默认接线(ESP32-C3):
+- BOOT 键 -> GPIO 9, 按下接地(启用内部上拉)
+"""
+
+import machine
+import utime as time
+from lib.logger import info, error
+from lib.event_bus_lock import EVENTS, register_event
+
+# =============================================================================
+# 常量定义
+# =============================================================================
+MODULE_NAME = "BUTTON"
+DEFAULT_PIN = 9  # ESP32-C3 开发板 BOOT 键
+DEFAULT_DEBOUNCE_MS = 50  # 机械按键抖动通常在 5-30ms 内结束
+
+
+class _Button:
+    """单个按键: 中断回调只做消抖判断与槽位写入"""
+
+    def __init__(self, event_bus, pin=DEFAULT_PIN, debounce_ms=DEFAULT_DEBOUNCE_MS):
+        self.pin_id = pin
+        self.debounce_ms = debounce_ms
+        self.presses = 0
+        self._bus = event_bus
+        # 事件 ID 与绑定方法须在中断外取得, 中断中查表/绑定都会分配内存
+        self._eid = register_event(EVENTS["BUTTON_PRESS"])
+        self._last_ms = time.ticks_ms()
+        self._handler = self._irq
+        self._pin = machine.Pin(pin, machine.Pin.IN, machine.Pin.PULL_UP)
+        try:
+            self._pin.irq(handler=self._handler, trigger=machine.Pin.IRQ_FALLING, hard=True)
+        except TypeError:
+            # 固件不支持 hard 参数时退化为软中断(同样经 schedule 运行, 仍可安全调用)
+            self._pin.irq(handler=self._handler, trigger=machine.Pin.IRQ_FALLING)
+
+    def _irq(self, pin):
+        """中断回调: 不分配内存, 不记录日志"""
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._last_ms) < self.debounce_ms:
+            return
+        self._last_ms = now
+        self.presses += 1
+        self._bus.publish_from_isr(self._eid, self.pin_id)
+
+    def cleanup(self):
+        try:
+            self._pin.irq(handler=None)
+        except Exception:
+            pass
+
+
+# =============================================================================
+# 模块级单例与公共辅助方法
+# =============================================================================
+_instance = None
+
+
+def attach(event_bus, pin=DEFAULT_PIN, debounce_ms=DEFAULT_DEBOUNCE_MS):
+    """在 pin 上挂载按键中断, 按下时向 event_bus 发布 button.press; 成功返回 True"""
+    global _instance
+    cleanup()
+    try:
+        _instance = _Button(event_bus, pin, debounce_ms)
+        info("按键中断已挂载: GPIO{} 消抖 {}ms", pin, debounce_ms, module=MODULE_NAME)
+        return True
+    except Exception as e:
+        error("按键中断挂载失败: {}", e, module=MODULE_NAME)
+        _instance = None
+        return False
+
+
+def get_stats():
+    """有效按下次数(消抖后), 未挂载时返回 None"""
+    if _instance is None:
+        return None
+    return {"pin": _instance.pin_id, "presses": _instance.presses}
+
+
+def cleanup():
+    global _instance
+    if _instance:
+        _instance.cleanup()
+        _instance = None
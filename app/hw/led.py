@@ -65,6 +65,7 @@ class _LEDPatternController:
         # 模式和状态变量
         self.current_pattern_id = "off"
         self.pattern_state = {}
+        self._paused_pattern_id = None  # pause() 暂停前的模式
 
         # 硬件定时器相关
         self._timer = None
@@ -132,6 +133,7 @@ class _LEDPatternController:
 
         self.current_pattern_id = pattern_id
         self.pattern_state = {"step": 0, "last_update": time.ticks_ms()}
+        self._paused_pattern_id = None
 
         # 立即设置初始状态
         if pattern_id == "off":
@@ -140,6 +142,21 @@ class _LEDPatternController:
             # 大多数模式以"亮"开始
             self._set_all_leds(1)
 
+    def pause(self):
+        """暂停动画并熄灭LED, 记住当前模式供 resume() 恢复; 已熄灭或已暂停时无操作"""
+        if self._paused_pattern_id is not None or self.current_pattern_id == "off":
+            return
+        self._paused_pattern_id = self.current_pattern_id
+        self.current_pattern_id = "off"
+        self._set_all_leds(0)
+
+    def resume(self):
+        """恢复 pause() 前的模式(从序列开头播放); 暂停期间调用过 play() 则以其为准"""
+        pattern_id = self._paused_pattern_id
+        self._paused_pattern_id = None
+        if pattern_id is not None and self.current_pattern_id == "off":
+            self.play(pattern_id)
+
     def _set_all_leds(self, value: int):
         """辅助函数, 设置所有LED的状态。"""
         for led in self.leds:
@@ -208,6 +225,27 @@ def play(pattern_id: str):
     controller.play(pattern_id)
 
 
+def pause():
+    """
+    暂停当前动画并熄灭LED(不初始化控制器)。
+    lightsleep 期间硬件定时器停摆, 主循环在进入前暂停动画, 醒来后 resume() 恢复。
+    """
+    try:
+        if _instance is not None:
+            _instance.pause()
+    except Exception:
+        pass
+
+
+def resume():
+    """恢复 pause() 暂停的动画。"""
+    try:
+        if _instance is not None:
+            _instance.resume()
+    except Exception:
+        pass
+
+
 def cleanup():
     """
     清理LED资源。
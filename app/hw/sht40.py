@@ -25,6 +25,7 @@ SHT40 温湿度传感器辅助模块(独立模块)
 import utime as time
 import machine
 from lib.logger import info, warning, error
+from lib.gc_scheduler import get_gc_scheduler
 
 # =============================================================================
 # 常量定义
@@ -198,7 +199,9 @@ def read(precision: str = "high"):
     """
     inst = _get_instance()
     cmd = CMD_MEASURE_HIGH if precision == "high" else (CMD_MEASURE_MED if precision == "med" else CMD_MEASURE_LOW)
-    return inst.read(cmd)
+    # 测量等待与 I2C 读取期间不进行垃圾回收
+    with get_gc_scheduler().busy():
+        return inst.read(cmd)
 
 
 def exists() -> bool:
@@ -6,7 +6,12 @@ lib模块 - 核心库模块集合
 __all__ = [
     "async_runtime",
     "event_bus_lock",
+    "event_trace",
+    "gc_scheduler",
     "logger",
+    "loop_profiler",
+    "scheduler",
     "ulogging_lock",
     "umqtt_lock",
+    "warm_boot",
 ]
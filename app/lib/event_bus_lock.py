@@ -7,13 +7,24 @@
 - 文件由 lock/event_bus.py 移动并重命名为 lib/event_bus_lock.py
 """
 
-import gc
 try:
     import utime as time
 except Exception:
     import time
+try:
+    import uasyncio as asyncio
+except Exception:
+    import asyncio
+try:
+    import micropython
+except ImportError:
+    micropython = None
+from array import array
 
 from lib.logger import debug, info, warning, error
+from lib.gc_scheduler import get_gc_scheduler
+from lib.event_trace import KIND_PUBLISH, KIND_DISPATCH, DEFAULT_PATH, state_code
+from lib.loop_profiler import P_BUS
 
 
 # 简单的安全日志装饰器
@@ -64,56 +75,502 @@ EVENTS = {
     "NTP_STATE_CHANGE": "ntp.state_change",  # data: (state, info) e.g., success, failed, syncing
     # 传感器数据事件
     "SENSOR_DATA": "sensor.data",  # data: (sensor_id, value)
+    # 按键事件(由引脚 IRQ 经 publish_from_isr 发布)
+    "BUTTON_PRESS": "button.press",  # data: (pin,)
 }
+
+# 事件 ID 注册表: 事件名驻留为小整数, 队列与分发表均以 ID 索引
+EVENT_IDS = {}  # {event_name: event_id}
+EVENT_NAMES = []  # event_id -> event_name
+
+
+def register_event(event_name):
+    """注册事件名并返回其整数 ID(已注册则直接返回)"""
+    eid = EVENT_IDS.get(event_name)
+    if eid is None:
+        eid = len(EVENT_NAMES)
+        EVENT_IDS[event_name] = eid
+        EVENT_NAMES.append(event_name)
+    return eid
+
+
+def event_id(event):
+    """事件名或 ID 统一转换为 ID, 未注册的事件名自动注册"""
+    if isinstance(event, int):
+        return event
+    eid = EVENT_IDS.get(event)
+    return register_event(event) if eid is None else eid
+
+
+for _name in EVENTS.values():
+    register_event(_name)
+_SYSTEM_STATE_CHANGE_ID = EVENT_IDS[EVENTS["SYSTEM_STATE_CHANGE"]]
 # ======================================================
 
 
+# 队列丢弃策略
+DROP_OLDEST = "drop_oldest"  # 满时丢弃最旧事件, 保留最新
+DROP_NEWEST = "drop_newest"  # 满时拒绝新事件, 保留最早
+COALESCE = "coalesce"  # 满时覆盖同名待处理事件, 无同名则丢弃最旧
+
+# publish() 准入结果
+ACCEPTED = "accepted"  # 已入队
+COALESCED = "coalesced"  # 覆盖了同键待处理事件
+REJECTED = "rejected"  # 超出配额或通道已满, 事件未入队
+
+# 记录回收后的占位载荷, 回调收到的 **kwargs 为副本, 共享空字典是安全的
+_NO_ARGS = ()
+_NO_KWARGS = {}
+
+
+class EventRecord:
+    """可复用的事件记录, 由 EventRecordPool 统一分配与回收"""
+
+    __slots__ = ("eid", "args", "kwargs")
+
+    def __init__(self):
+        self.eid = 0
+        self.args = _NO_ARGS
+        self.kwargs = _NO_KWARGS
+
+
+class TokenBucket:
+    """令牌桶配额: 以千分之一令牌为单位做整数运算, 热路径不产生浮点对象"""
+
+    __slots__ = ("rate", "capacity", "tokens", "last_ms", "admitted", "rejected")
+
+    def __init__(self, rate, burst):
+        self.rate = rate  # 每秒补充的令牌数
+        self.capacity = burst * 1000
+        self.tokens = self.capacity
+        self.last_ms = time.ticks_ms()
+        self.admitted = 0
+        self.rejected = 0
+
+    def _refill(self, now_ms):
+        elapsed = time.ticks_diff(now_ms, self.last_ms)
+        if elapsed > 0:
+            tokens = self.tokens + elapsed * self.rate
+            self.tokens = tokens if tokens < self.capacity else self.capacity
+            self.last_ms = now_ms
+
+    def take(self, now_ms):
+        """取一个令牌, 不足时计入拒绝并返回 False"""
+        self._refill(now_ms)
+        if self.tokens >= 1000:
+            self.tokens -= 1000
+            self.admitted += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def wait_ms(self, now_ms):
+        """距离下一个可用令牌的毫秒数, 0 表示当前可取"""
+        self._refill(now_ms)
+        missing = 1000 - self.tokens
+        if missing <= 0:
+            return 0
+        if self.rate <= 0:
+            return EventBusConfig.WAIT_POLL_MS
+        return (missing + self.rate - 1) // self.rate
+
+
+# 订阅者断路器状态
+BREAKER_CLOSED = "closed"  # 正常调用
+BREAKER_OPEN = "open"  # 冷却期内跳过回调
+BREAKER_HALF_OPEN = "half_open"  # 冷却结束, 放行探测调用
+
+
+class CircuitBreaker:
+    """单个订阅者的断路器: 窗口内连续失败达阈值即打开, 冷却后半开探测"""
+
+    __slots__ = ("state", "failures", "window_start_ms", "opened_ms", "successes",
+                 "trips", "skipped")
+
+    def __init__(self, now_ms):
+        self.state = BREAKER_CLOSED
+        self.failures = 0  # 当前窗口内失败次数
+        self.window_start_ms = now_ms
+        self.opened_ms = 0
+        self.successes = 0  # 半开状态下成功的探测次数
+        self.trips = 0  # 累计打开次数
+        self.skipped = 0  # 打开期间跳过的调用次数
+
+
+class EventRecordPool:
+    """定长事件记录池 - 发布时取出, 分发或丢弃后归还, 稳态下不分配新记录"""
+
+    def __init__(self, size):
+        self.size = size
+        self._free = [EventRecord() for _ in range(size)]
+        self._misses = 0  # 池耗尽时临时分配的次数
+
+    def acquire(self):
+        free = self._free
+        if free:
+            return free.pop()
+        self._misses += 1
+        return EventRecord()
+
+    def release(self, record):
+        """归还记录并断开载荷引用; 超出池容量的临时记录交给 GC"""
+        record.args = _NO_ARGS
+        record.kwargs = _NO_KWARGS
+        if len(self._free) < self.size:
+            self._free.append(record)
+
+    def get_stats(self):
+        return {"size": self.size, "free": len(self._free), "misses": self._misses}
+
+
 class EventQueue:
-    """简化的事件队列 - 单队列模式"""
+    """定长环形事件队列 - 预分配槽位, 入队/出队/丢弃最旧均为 O(1)"""
 
-    def __init__(self, max_size):
-        self.queue = []
+    def __init__(self, max_size, policy=DROP_OLDEST, release=None):
+        """
+        Args:
+            max_size: 容量
+            policy: 丢弃策略
+            release: 被丢弃记录的回收函数(通常为 EventRecordPool.release)
+        """
         self.max_size = max_size
+        self.policy = policy
+        self._release = release
+        # 预分配槽位, 运行期不再扩容或搬移内存
+        self._slots = [None] * max_size
+        self._head = 0  # 下一个出队位置
+        self._tail = 0  # 下一个入队位置
+        self._count = 0
         self._drops = 0
+        self._coalesced = 0
 
-    def enqueue(self, event_item):
-        """入队事件"""
-        if len(self.queue) >= self.max_size:
-            # 队列满时删除最旧的事件
-            self.queue.pop(0)
+    def __len__(self):
+        return self._count
+
+    def _discard(self, record):
+        if self._release is not None:
+            self._release(record)
+
+    def enqueue(self, record):
+        """入队事件记录, 队列满时按丢弃策略处理; 新事件被丢弃时返回 False"""
+        if self.max_size <= 0:
+            self._drops += 1
+            self._discard(record)
+            return False
+
+        if self._count >= self.max_size:
+            if self.policy == DROP_NEWEST:
+                self._drops += 1
+                self._discard(record)
+                return False
+            if self.policy == COALESCE and self._replace_pending(
+                record.eid, record.args, record.kwargs
+            ):
+                self._coalesced += 1
+                self._discard(record)
+                return True
+            # 丢弃最旧的事件: 头指针前移, 尾部槽位随后被覆盖
+            head = self._head
+            self._discard(self._slots[head])
+            self._slots[head] = None
+            head += 1
+            self._head = 0 if head == self.max_size else head
+            self._count -= 1
             self._drops += 1
 
-        self.queue.append(event_item)
+        tail = self._tail
+        self._slots[tail] = record
+        tail += 1
+        self._tail = 0 if tail == self.max_size else tail
+        self._count += 1
         return True
 
+    def coalesce(self, eid, args, kwargs, key_field=None):
+        """合并入队: 存在同键的待处理事件时原地覆盖其载荷, 否则返回 False 由调用方正常入队
+
+        键为事件 ID, 若指定 key_field 则再加上 kwargs[key_field]
+        """
+        if self._replace_pending(eid, args, kwargs, key_field):
+            self._coalesced += 1
+            return True
+        return False
+
+    def _replace_pending(self, eid, args, kwargs, key_field=None):
+        """用新载荷原地覆盖同键的最新待处理事件, 保持其在队列中的位置"""
+        key = kwargs.get(key_field) if key_field else None
+        idx = self._tail
+        for _ in range(self._count):
+            idx = (idx or self.max_size) - 1
+            pending = self._slots[idx]
+            if pending is not None and pending.eid == eid:
+                if key_field and pending.kwargs.get(key_field) != key:
+                    continue
+                pending.args = args
+                pending.kwargs = kwargs
+                return True
+        return False
+
     def dequeue(self):
-        """出队事件"""
-        if self.queue:
-            return self.queue.pop(0)
-        return None
+        """出队事件记录, 由调用方在使用后归还记录池"""
+        if self._count == 0:
+            return None
+        head = self._head
+        record = self._slots[head]
+        # 释放槽位引用
+        self._slots[head] = None
+        head += 1
+        self._head = 0 if head == self.max_size else head
+        self._count -= 1
+        return record
 
     def is_empty(self):
-        return len(self.queue) == 0
+        return self._count == 0
 
     def get_stats(self):
         return {
-            "total_length": len(self.queue),
+            "total_length": self._count,
             "max_size": self.max_size,
-            "usage_ratio": len(self.queue) / self.max_size if self.max_size > 0 else 0,
+            "usage_ratio": self._count / self.max_size if self.max_size > 0 else 0,
             "drops": self._drops,
+            "coalesced": self._coalesced,
+            "policy": self.policy,
         }
 
     def clear(self):
-        """清空队列"""
-        self.queue.clear()
+        """清空队列(保留预分配槽位), 待处理记录归还记录池"""
+        for i in range(self.max_size):
+            if self._slots[i] is not None:
+                self._discard(self._slots[i])
+            self._slots[i] = None
+        self._head = 0
+        self._tail = 0
+        self._count = 0
+
+
+class PriorityEventQueue:
+    """优先级分道队列 - 每条通道独立容量与丢弃策略, 出队时高优先级通道优先"""
+
+    def __init__(self, lanes, default_lane, release=None):
+        """
+        Args:
+            lanes: ((名称, 容量, 丢弃策略), ...), 按优先级从高到低排列
+            default_lane: 未声明事件所用的通道下标
+            release: 被丢弃记录的回收函数
+        """
+        self.lane_names = tuple(lane[0] for lane in lanes)
+        self.lanes = tuple(EventQueue(lane[1], lane[2], release) for lane in lanes)
+        self.default_lane = default_lane
+        self._lane_table = []  # event_id -> 通道下标
+        self.max_size = sum(q.max_size for q in self.lanes)
+
+    def __len__(self):
+        total = 0
+        for q in self.lanes:
+            total += q._count
+        return total
+
+    def set_lane(self, eid, lane):
+        """声明事件 ID 所属通道"""
+        table = self._lane_table
+        while len(table) <= eid:
+            table.append(self.default_lane)
+        table[eid] = lane
+
+    def lane_of(self, eid):
+        """返回事件 ID 所属通道下标"""
+        table = self._lane_table
+        return table[eid] if eid < len(table) else self.default_lane
+
+    def enqueue(self, record):
+        """按事件 ID 路由到对应通道"""
+        return self.lanes[self.lane_of(record.eid)].enqueue(record)
+
+    def coalesce(self, eid, args, kwargs, key_field=None):
+        """在事件所属通道内尝试合并同键待处理事件"""
+        return self.lanes[self.lane_of(eid)].coalesce(eid, args, kwargs, key_field)
+
+    def has_room(self, eid):
+        """事件所属通道是否还有空位"""
+        q = self.lanes[self.lane_of(eid)]
+        return q._count < q.max_size
+
+    def peak_usage(self):
+        """各通道使用率的最大值, 单条通道积压即可反映出来"""
+        peak = 0
+        for q in self.lanes:
+            if q.max_size and q._count / q.max_size > peak:
+                peak = q._count / q.max_size
+        return peak
+
+    def dequeue(self):
+        """从最高优先级的非空通道出队"""
+        for q in self.lanes:
+            if q._count:
+                return q.dequeue()
+        return None
+
+    def is_empty(self):
+        for q in self.lanes:
+            if q._count:
+                return False
+        return True
+
+    def get_stats(self):
+        lanes = {}
+        drops = 0
+        coalesced = 0
+        for name, q in zip(self.lane_names, self.lanes):
+            st = q.get_stats()
+            lanes[name] = st
+            drops += st["drops"]
+            coalesced += st["coalesced"]
+        total = len(self)
+        return {
+            "total_length": total,
+            "max_size": self.max_size,
+            "usage_ratio": total / self.max_size if self.max_size > 0 else 0,
+            "drops": drops,
+            "coalesced": coalesced,
+            "lanes": lanes,
+        }
+
+    def clear(self):
+        for q in self.lanes:
+            q.clear()
+
+
+WILDCARD = "*"  # 通配段: 匹配事件名中任意一段, 如 "wifi.*"、"*.state_change"
+
+
+class _TrieNode:
+    __slots__ = ("children", "callbacks")
+
+    def __init__(self):
+        self.children = {}  # {segment: _TrieNode}
+        self.callbacks = ()  # 不可变元组, 增删时整体替换
+
+
+class TopicTrie:
+    """按 "." 分段的通配订阅前缀树
+
+    仅在订阅变化或首次出现新事件名时查询, 结果写入 EventBus 分发表缓存,
+    因此不影响常规分发的 O(1) 查表。
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self.size = 0  # 已注册的 (模式, 回调) 数
+
+    @staticmethod
+    def is_pattern(name):
+        return WILDCARD in name
+
+    def add(self, pattern, callback):
+        node = self._root
+        for seg in pattern.split("."):
+            child = node.children.get(seg)
+            if child is None:
+                child = _TrieNode()
+                node.children[seg] = child
+            node = child
+        node.callbacks = node.callbacks + (callback,)
+        self.size += 1
+
+    def remove(self, pattern, callback):
+        """移除订阅, 存在并移除时返回 True"""
+        node = self._root
+        for seg in pattern.split("."):
+            node = node.children.get(seg)
+            if node is None:
+                return False
+        if callback in node.callbacks:
+            i = node.callbacks.index(callback)
+            node.callbacks = node.callbacks[:i] + node.callbacks[i + 1:]
+            self.size -= 1
+            return True
+        return False
+
+    def contains(self, callback, node=None):
+        """回调是否仍订阅了任一模式"""
+        node = node or self._root
+        if callback in node.callbacks:
+            return True
+        for child in node.children.values():
+            if self.contains(callback, child):
+                return True
+        return False
+
+    def match(self, name):
+        """返回匹配事件名的全部回调(精确段优先于通配段)"""
+        result = []
+        if self.size:
+            self._collect(self._root, name.split("."), 0, result)
+        return result
+
+    def _collect(self, node, segs, depth, result):
+        if depth == len(segs):
+            for cb in node.callbacks:
+                if cb not in result:
+                    result.append(cb)
+            return
+        child = node.children.get(segs[depth])
+        if child is not None:
+            self._collect(child, segs, depth + 1, result)
+        child = node.children.get(WILDCARD)
+        if child is not None:
+            self._collect(child, segs, depth + 1, result)
 
 
 class EventBusConfig:
     """事件总线配置"""
     TIMER_TICK_MS = 25  # 定时器间隔, 平衡响应性和性能
-    MAX_QUEUE_SIZE = 64  # 总队列大小, 降低内存占用
-    BATCH_PROCESS_COUNT = 5  # 批处理数量
-    GC_THRESHOLD = 100  # 垃圾回收阈值
+    MAX_QUEUE_SIZE = 64  # 总队列大小, 降低内存占用(各通道容量之和)
+    GC_THRESHOLD = 100  # 每处理该数量事件向回收调度器请求一次回收
+    # 自适应批处理: 每批排空队列直到预算耗尽, 预算随积压伸缩
+    BUDGET_MIN_US = 2000  # 空闲时的单批预算
+    BUDGET_MAX_US = 20000  # 积压时的单批预算上限, 避免饿死主循环其他任务
+    BUDGET_GROW_USAGE = 0.5  # 批后任一通道使用率高于此值时预算翻倍
+    BUDGET_SHRINK_USAGE = 0.1  # 批后各通道使用率均低于此值时预算回落
+    POOL_SPARE = 4  # 记录池在队列容量之外的余量(分发中的记录、回调内嵌套发布)
+    ISR_SLOTS = 16  # 中断发布槽位数(可用 ISR_SLOTS-1 个)
+    SLOW_CALLBACK_US = 20000  # 回调剖析: 超过该耗时记为慢回调
+    PROFILE_BUCKETS_US = (100, 500, 2000, 10000, 50000)  # 回调耗时直方图桶上界
+
+    # 优先级通道: (名称, 容量, 丢弃策略), 按优先级从高到低
+    LANE_CRITICAL = 0
+    LANE_STATE = 1
+    LANE_DATA = 2
+    LANES = (
+        ("critical", 16, DROP_NEWEST),  # 错误风暴时保留最早的根因事件
+        ("state", 16, COALESCE),  # 状态变化只需最新值
+        ("data", 32, DROP_OLDEST),  # 遥测数据保留最新
+    )
+    # 事件 -> 通道, 未列出的事件进入 DEFAULT_LANE
+    EVENT_LANES = {
+        EVENTS["SYSTEM_ERROR"]: LANE_CRITICAL,
+        EVENTS["SYSTEM_STATE_CHANGE"]: LANE_CRITICAL,
+        EVENTS["WIFI_STATE_CHANGE"]: LANE_STATE,
+        EVENTS["MQTT_STATE_CHANGE"]: LANE_STATE,
+        EVENTS["NTP_STATE_CHANGE"]: LANE_STATE,
+        EVENTS["BUTTON_PRESS"]: LANE_STATE,
+        EVENTS["MQTT_MESSAGE"]: LANE_DATA,
+        EVENTS["SENSOR_DATA"]: LANE_DATA,
+    }
+    DEFAULT_LANE = LANE_DATA
+
+    # 令牌桶配额: 事件 -> (每秒速率, 突发容量), 未列出的事件不限流
+    EVENT_QUOTAS = {
+        EVENTS["MQTT_MESSAGE"]: (20, 40),
+        EVENTS["SENSOR_DATA"]: (10, 20),
+    }
+    STATUS_WINDOW_MS = 1000  # 系统状态评估窗口
+    QUOTA_CRITICAL_RATIO = 0.5  # 窗口内配额拒绝占比达到该值时进入 CRITICAL
+    WAIT_POLL_MS = TIMER_TICK_MS  # publish_or_wait 等待通道空位的轮询间隔
+    # 订阅者断路器
+    BREAKER_FAILURES = 3  # 窗口内失败达到该次数即打开
+    BREAKER_WINDOW_MS = 10000  # 失败计数窗口
+    BREAKER_COOLDOWN_MS = 30000  # 打开后的冷却期, 期间跳过该回调
+    BREAKER_PROBES = 2  # 半开状态下连续成功该次数后闭合
 
     @classmethod
     def get_dict(cls):
@@ -121,13 +578,15 @@ class EventBusConfig:
         return {
             "MAX_QUEUE_SIZE": cls.MAX_QUEUE_SIZE,
             "TIMER_TICK_MS": cls.TIMER_TICK_MS,
-            "BATCH_PROCESS_COUNT": cls.BATCH_PROCESS_COUNT,
             "GC_THRESHOLD": cls.GC_THRESHOLD,
+            "BUDGET_MIN_US": cls.BUDGET_MIN_US,
+            "BUDGET_MAX_US": cls.BUDGET_MAX_US,
+            "LANES": cls.LANES,
         }
 
 
 class EventBus:
-    """简化的事件总线 - 单队列模式"""
+    """简化的事件总线 - 优先级分道队列"""
 
     _instance = None
     _initialized = False
@@ -145,15 +604,73 @@ class EventBus:
 
     def _init_once(self):
         """单次初始化"""
-        self.subscribers = {}  # {event_name: [callback1, callback2, ...]}
-        self.event_queue = EventQueue(EventBusConfig.MAX_QUEUE_SIZE)
+        # {event_name: (callback1, callback2, ...)}: 不可变元组, 订阅变化时整体替换(写时复制)
+        self.subscribers = {}
+        # 通配订阅: "wifi.*"、"*.state_change" 等模式
+        self._patterns = TopicTrie()
+        # 预编译分发表: event_id -> 回调元组(精确订阅 + 通配匹配), 仅在订阅变化时重建
+        self._dispatch = []
+        # 事件记录池: 队列容量 + 分发中/入队中的余量
+        self._pool = EventRecordPool(EventBusConfig.MAX_QUEUE_SIZE + EventBusConfig.POOL_SPARE)
+        self.event_queue = PriorityEventQueue(
+            EventBusConfig.LANES,
+            EventBusConfig.DEFAULT_LANE,
+            self._pool.release,
+        )
+        for name, lane in EventBusConfig.EVENT_LANES.items():
+            self.event_queue.set_lane(register_event(name), lane)
+        self._rebuild_dispatch()
+
+        # 最新值合并声明: {event_id: key_field 或 None}
+        self._coalesce_keys = {}
+
+        # 令牌桶配额: {event_id: TokenBucket}
+        self._quotas = {}
+        for name, (rate, burst) in EventBusConfig.EVENT_QUOTAS.items():
+            self._quotas[register_event(name)] = TokenBucket(rate, burst)
 
-        # 系统状态管理
+        # 系统状态管理: 按窗口统计受配额约束事件的准入/拒绝数
         self._system_status = SYSTEM_STATUS["NORMAL"]
+        self._window_start_ms = time.ticks_ms()
+        self._window_admits = 0
+        self._window_rejects = 0
+        self._rejected_count = 0  # 累计被拒绝的发布(配额 + 通道已满)
+
+        # 订阅者断路器: {callback: CircuitBreaker}, 首次失败时创建
+        self._breakers = {}
+        # 处于打开/半开状态的回调集合, 分发时仅对其中的回调做额外判断
+        self._tripped = set()
 
         # 性能计数器
         self._processed_count = 0
         self._error_count = 0
+        self._unhandled_count = 0  # 无订阅者的事件数
+
+        # 中断发布槽位: 预分配的单生产者/单消费者环, ISR 写 head, 主上下文读 tail
+        self._isr_ids = array("i", [0] * EventBusConfig.ISR_SLOTS)
+        self._isr_args = array("i", [0] * EventBusConfig.ISR_SLOTS)
+        self._isr_head = 0
+        self._isr_tail = 0
+        self._isr_drops = 0
+        self._isr_scheduled = False
+        # 预先绑定方法, ISR 中访问 self._drain_isr 会分配绑定方法对象
+        self._drain_isr_cb = self._drain_isr
+
+        # 自适应批处理: 当前时间预算与吞吐量窗口
+        self._budget_us = EventBusConfig.BUDGET_MIN_US
+        self._rate_start_ms = time.ticks_ms()
+        self._rate_count = 0
+        self._events_per_s = 0
+
+        # 回调耗时剖析: None 表示关闭, 否则 {(event_id, callback): entry}
+        self._profile = None
+        self._slow_threshold_us = EventBusConfig.SLOW_CALLBACK_US
+
+        # 二进制追踪记录器: None 表示关闭(见 lib.event_trace)
+        self._trace = None
+
+        # 主循环剖析器(见 lib.loop_profiler): None 表示不记录分发批次耗时
+        self._loop_profiler = None
 
         # 保存EVENTS引用到实例, 避免NameError
         self.EVENTS = EVENTS
@@ -161,6 +678,13 @@ class EventBus:
         # 手动处理时间记录
         self._last_process_time = 0
 
+        # 分发任务唤醒标志: 优先 ThreadSafeFlag(wait 返回即清除), 否则退化为 Event
+        # Event.set() 不可在中断中调用, 此时中断发布一律经 micropython.schedule 交接
+        tsf_cls = getattr(asyncio, "ThreadSafeFlag", None)
+        self._wake = (tsf_cls or asyncio.Event)()
+        self._wake_isr_safe = tsf_cls is not None
+        self._dispatcher_active = False
+
     def process_events(self):
         """手动处理事件 - 由主循环调用"""
         # 检查是否到了处理时间
@@ -176,28 +700,101 @@ class EventBus:
 
         self._last_process_time = current_time
 
+        self._dispatch_batch()
+
+    def _dispatch_batch(self):
+        """在当前时间预算内分发事件, 直到队列为空或预算耗尽; 高优先级通道先出队
+
+        Returns:
+            int: 本批处理的事件数
+        """
+        processed = 0
+        budget_us = self._budget_us
+        start_us = time.ticks_us()
         try:
-            # 批量处理事件
-            processed = 0
-            while (
-                processed < EventBusConfig.BATCH_PROCESS_COUNT
-                and not self.event_queue.is_empty()
-            ):
-                event_item = self.event_queue.dequeue()
-                if event_item:
-                    self._execute_event(event_item)
+            if self._isr_head != self._isr_tail:
+                self._drain_isr()
+            while not self.event_queue.is_empty():
+                record = self.event_queue.dequeue()
+                if record:
+                    self._execute_event(record)
                     processed += 1
                     self._processed_count += 1
+                if time.ticks_diff(time.ticks_us(), start_us) >= budget_us:
+                    break
+
+            self._adapt_budget(processed)
 
-            # 定期垃圾回收
-            if self._processed_count % EventBusConfig.GC_THRESHOLD == 0:
-                gc.collect()
+            # 本批跨过 GC_THRESHOLD 整数倍时请求回收, 由主循环空闲时执行
+            if processed and self._processed_count % EventBusConfig.GC_THRESHOLD < processed:
+                get_gc_scheduler().request("event_bus")
 
         except Exception as e:
             self._handle_processing_error(e)
         finally:
             # 轻量维护: 仅更新系统状态
             self._check_system_status()
+        return processed
+
+    async def run_dispatcher(self):
+        """事件分发任务 - 由 publish 唤醒, 在时间预算内排空队列后让出
+
+        取代主循环轮询 process_events: 空闲时挂起不占 CPU, 发布后下一次调度即分发。
+        每轮耗时受自适应预算约束, 积压时预算增大以尽快排空。
+        系统状态非 NORMAL 时空闲等待以状态窗口为限, 超时即重新评估状态,
+        避免总线静默后 WARNING/CRITICAL 一直保持到下一个事件。
+        """
+        self._dispatcher_active = True
+        try:
+            while True:
+                if self.event_queue.is_empty() and self._isr_head == self._isr_tail:
+                    if self._system_status != SYSTEM_STATUS["NORMAL"]:
+                        try:
+                            await asyncio.wait_for_ms(self._wake.wait(),
+                                                      EventBusConfig.STATUS_WINDOW_MS)
+                        except asyncio.TimeoutError:
+                            self._check_system_status()
+                            continue
+                    else:
+                        await self._wake.wait()
+                    # asyncio.Event 不会自动清除; ThreadSafeFlag 清除也无副作用
+                    self._wake.clear()
+                profiler = self._loop_profiler
+                if profiler is None:
+                    self._dispatch_batch()
+                else:
+                    t0 = time.ticks_us()
+                    self._dispatch_batch()
+                    profiler.record(P_BUS, time.ticks_diff(time.ticks_us(), t0))
+                # 让出给其他任务, 队列仍有积压时下一轮继续处理
+                await asyncio.sleep_ms(0)
+        finally:
+            self._dispatcher_active = False
+
+    def _adapt_budget(self, processed):
+        """按批后队列积压调整时间预算, 并滚动统计吞吐量
+
+        任一通道积压高于 BUDGET_GROW_USAGE 时预算翻倍(至 BUDGET_MAX_US),
+        低于 BUDGET_SHRINK_USAGE 时逐步回落(至 BUDGET_MIN_US)。
+        """
+        usage = self.event_queue.peak_usage()
+        budget = self._budget_us
+        if usage >= EventBusConfig.BUDGET_GROW_USAGE:
+            budget = min(budget * 2, EventBusConfig.BUDGET_MAX_US)
+        elif usage <= EventBusConfig.BUDGET_SHRINK_USAGE and budget > EventBusConfig.BUDGET_MIN_US:
+            budget = max(budget - (budget >> 2), EventBusConfig.BUDGET_MIN_US)
+        self._budget_us = budget
+
+        self._rate_count += processed
+        self._roll_rate(time.ticks_ms())
+
+    def _roll_rate(self, now_ms):
+        """每满 1 秒窗口计算一次 events/s"""
+        elapsed = time.ticks_diff(now_ms, self._rate_start_ms)
+        if elapsed >= 1000:
+            self._events_per_s = self._rate_count * 1000 // elapsed
+            self._rate_count = 0
+            self._rate_start_ms = now_ms
 
     def _handle_processing_error(self, exc):
         """处理事件处理错误"""
@@ -206,8 +803,7 @@ class EventBus:
         error("事件处理异常: {}", error_msg, module="EventBus")
         # 最小化副作用: 仅入队一个系统状态提示, 避免递归引用未定义变量
         try:
-            evt = (self.EVENTS["SYSTEM_STATE_CHANGE"], ("processing_error",), {"error": error_msg})
-            self.event_queue.enqueue(evt)
+            self._enqueue(_SYSTEM_STATE_CHANGE_ID, ("processing_error",), {"error": error_msg})
         except Exception:
             # 忽略二次错误, 避免形成异常风暴
             pass
@@ -215,99 +811,527 @@ class EventBus:
         # 系统错误事件发布由 _handle_callback_error 负责, 此处不再重复
 
     @safe_log("error")
-    def _execute_event(self, event_item):
-        """执行事件"""
-        event_name, args, kwargs = event_item
+    def _execute_event(self, record):
+        """执行事件: 取出载荷后立即归还记录, 回调内嵌套发布可复用该记录"""
+        eid = record.eid
+        args = record.args
+        kwargs = record.kwargs
+        self._pool.release(record)
+
+        trace = self._trace
+        if trace is None:
+            self._run_callbacks(eid, args, kwargs)
+            return
+        t0 = time.ticks_us()
+        self._run_callbacks(eid, args, kwargs)
+        trace.record(KIND_DISPATCH, eid, len(self.event_queue), state_code(args, kwargs),
+                     time.ticks_diff(time.ticks_us(), t0))
 
-        # 减少热路径日志, 降低串口IO与CPU占用
-        if event_name not in self.subscribers:
-            warning("事件 {} 没有订阅者", event_name, module="EventBus")
+    def _run_callbacks(self, eid, args, kwargs):
+        """按分发表依次调用回调"""
+        # 分发表为不可变元组, 回调中增删订阅会重建新表, 无需逐事件复制
+        callbacks = self._dispatch[eid] if eid < len(self._dispatch) else ()
+        if not callbacks:
+            # 热路径不打日志, 仅计数
+            self._unhandled_count += 1
             return
 
-        callbacks = self.subscribers[event_name][:]
+        event_name = EVENT_NAMES[eid]
+        if self._profile is not None:
+            self._execute_profiled(eid, event_name, callbacks, args, kwargs)
+            return
+        tripped = self._tripped
         for callback in callbacks:
+            if tripped and callback in tripped and not self._breaker_allows(callback):
+                continue
             try:
                 callback(event_name, *args, **kwargs)
             except Exception as e:
-                self._handle_callback_error(event_name, callback, e)
+                self._handle_callback_error(eid, callback, e)
+                continue
+            if tripped and callback in tripped:
+                self._breaker_success(callback)
+
+    def _execute_profiled(self, eid, event_name, callbacks, args, kwargs):
+        """带计时的分发路径, 仅在启用回调剖析时使用"""
+        tripped = self._tripped
+        for callback in callbacks:
+            if tripped and callback in tripped and not self._breaker_allows(callback):
+                continue
+            t0 = time.ticks_us()
+            failed = False
+            try:
+                callback(event_name, *args, **kwargs)
+            except Exception as e:
+                failed = True
+                self._handle_callback_error(eid, callback, e)
+            self._record_timing(eid, callback, time.ticks_diff(time.ticks_us(), t0))
+            if not failed and tripped and callback in tripped:
+                self._breaker_success(callback)
+
+    def _record_timing(self, eid, callback, dt_us):
+        """记录单次回调耗时: [次数, 总耗时, 最大耗时, 慢调用次数, 直方图...]"""
+        key = (eid, callback)
+        entry = self._profile.get(key)
+        if entry is None:
+            entry = [0, 0, 0, 0] + [0] * (len(EventBusConfig.PROFILE_BUCKETS_US) + 1)
+            self._profile[key] = entry
+        entry[0] += 1
+        entry[1] += dt_us
+        if dt_us > entry[2]:
+            entry[2] = dt_us
+        bucket = 0
+        for bound in EventBusConfig.PROFILE_BUCKETS_US:
+            if dt_us < bound:
+                break
+            bucket += 1
+        entry[4 + bucket] += 1
+        if dt_us >= self._slow_threshold_us:
+            entry[3] += 1
+            if entry[3] == 1:
+                warning("慢回调: {} -> {} 耗时 {}us", EVENT_NAMES[eid],
+                        getattr(callback, "__name__", "unknown"), dt_us, module="EventBus")
+
+    def enable_profiling(self, slow_threshold_us=None):
+        """启用按 (事件, 回调) 的耗时统计; 关闭时分发路径仅多一次属性判断"""
+        self._slow_threshold_us = slow_threshold_us or EventBusConfig.SLOW_CALLBACK_US
+        if self._profile is None:
+            self._profile = {}
+
+    def disable_profiling(self):
+        """关闭耗时统计并释放已记录数据"""
+        self._profile = None
+
+    def set_trace(self, trace):
+        """挂载追踪记录器(EventTrace 实例), 传入 None 关闭追踪"""
+        self._trace = trace
+
+    def set_loop_profiler(self, profiler):
+        """挂载主循环剖析器(LoopProfiler 实例), 记录每个分发批次占用事件循环的时长; None 关闭"""
+        self._loop_profiler = profiler
+
+    def flush_trace(self, path=DEFAULT_PATH):
+        """将追踪缓冲写入 Flash, 未启用追踪时返回 0"""
+        if self._trace is None:
+            return 0
+        try:
+            count = self._trace.flush(EVENT_NAMES, path)
+            info("事件追踪已写入 {} ({} 条)", path, count, module="EventBus")
+            return count
+        except Exception as e:
+            error("事件追踪写入失败: {}", e, module="EventBus")
+            return 0
+
+    def get_profile_report(self, top=8):
+        """紧凑的回调耗时报告(按总耗时降序), 适合通过 MQTT 上报
 
-    def _handle_callback_error(self, event_name, callback, exc):
-        """处理回调错误"""
+        每项: e=事件, cb=回调, n=次数, tot=总耗时us, max=最大耗时us, slow=慢调用次数,
+        h=直方图计数(桶边界见 EventBusConfig.PROFILE_BUCKETS_US, 末桶为超出上界)
+        """
+        if self._profile is None:
+            return None
+        items = sorted(self._profile.items(), key=lambda kv: kv[1][1], reverse=True)
+        report = []
+        for (eid, callback), entry in items[:top]:
+            report.append({
+                "e": EVENT_NAMES[eid],
+                "cb": getattr(callback, "__name__", "unknown"),
+                "n": entry[0],
+                "tot": entry[1],
+                "max": entry[2],
+                "slow": entry[3],
+                "h": entry[4:],
+            })
+        return {
+            "slow_us": self._slow_threshold_us,
+            "buckets_us": EventBusConfig.PROFILE_BUCKETS_US,
+            "callbacks": report,
+        }
+
+    def _handle_callback_error(self, eid, callback, exc):
+        """处理回调错误: 计入该订阅者的断路器, 仅在断路器打开时发布系统错误事件"""
         self._error_count += 1
+        event_name = EVENT_NAMES[eid]
+        now = time.ticks_ms()
+        breaker = self._breakers.get(callback)
+        if breaker is None:
+            breaker = self._breakers[callback] = CircuitBreaker(now)
+
+        if breaker.state == BREAKER_HALF_OPEN:
+            # 探测失败: 重新打开并开始新的冷却期
+            self._open_breaker(eid, callback, breaker, now, exc)
+            return
+
+        if time.ticks_diff(now, breaker.window_start_ms) > EventBusConfig.BREAKER_WINDOW_MS:
+            breaker.window_start_ms = now
+            breaker.failures = 0
+        breaker.failures += 1
         error("回调失败: {} - {}", event_name, str(exc), module="EventBus")
+        if breaker.failures >= EventBusConfig.BREAKER_FAILURES:
+            self._open_breaker(eid, callback, breaker, now, exc)
 
-        # 发布系统错误事件
-        if event_name != EVENTS["SYSTEM_STATE_CHANGE"]:
-            error_event = (
-                EVENTS["SYSTEM_STATE_CHANGE"],
+    def _open_breaker(self, eid, callback, breaker, now, exc):
+        """打开断路器并发布一次系统错误事件"""
+        breaker.state = BREAKER_OPEN
+        breaker.opened_ms = now
+        breaker.successes = 0
+        breaker.trips += 1
+        self._tripped.add(callback)
+        callback_name = getattr(callback, "__name__", "unknown")
+        warning("回调断路器打开: {} ({} 次), 冷却 {}ms", callback_name, breaker.trips,
+                EventBusConfig.BREAKER_COOLDOWN_MS, module="EventBus")
+
+        if eid != _SYSTEM_STATE_CHANGE_ID:
+            # 直接入队避免递归调用publish
+            self._enqueue(
+                _SYSTEM_STATE_CHANGE_ID,
                 ("callback_error",),
                 {
                     "error": str(exc),
-                    "event": event_name,
-                    "callback_name": getattr(callback, "__name__", "unknown"),
+                    "event": EVENT_NAMES[eid],
+                    "callback_name": callback_name,
+                    "breaker": BREAKER_OPEN,
                 },
             )
-            # 直接入队避免递归调用publish
-            self.event_queue.enqueue(error_event)
+
+    def _breaker_allows(self, callback):
+        """打开状态在冷却期内跳过回调, 冷却结束转为半开并放行探测调用"""
+        breaker = self._breakers[callback]
+        if breaker.state == BREAKER_OPEN:
+            if time.ticks_diff(time.ticks_ms(), breaker.opened_ms) < EventBusConfig.BREAKER_COOLDOWN_MS:
+                breaker.skipped += 1
+                return False
+            breaker.state = BREAKER_HALF_OPEN
+            info("回调断路器半开, 开始探测: {}", getattr(callback, "__name__", "unknown"),
+                 module="EventBus")
+        return True
+
+    def _breaker_success(self, callback):
+        """半开状态下累计成功探测, 达到次数后闭合"""
+        breaker = self._breakers[callback]
+        breaker.successes += 1
+        if breaker.successes >= EventBusConfig.BREAKER_PROBES:
+            breaker.state = BREAKER_CLOSED
+            breaker.failures = 0
+            breaker.window_start_ms = time.ticks_ms()
+            self._tripped.discard(callback)
+            info("回调断路器闭合: {}", getattr(callback, "__name__", "unknown"), module="EventBus")
 
     def _check_system_status(self):
-        """检查并更新系统状态"""
-        queue_stats = self.event_queue.get_stats()
+        """按窗口评估系统状态
+
+        - CRITICAL: 窗口内配额拒绝占比达到 QUOTA_CRITICAL_RATIO(生产者远超配额)
+        - WARNING: 窗口内出现配额拒绝, 或任一通道使用率高于 0.8
+        - NORMAL: 无配额拒绝且各通道使用率低于 0.3
+        """
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._window_start_ms) < EventBusConfig.STATUS_WINDOW_MS:
+            return
+        admits = self._window_admits
+        rejects = self._window_rejects
+        self._window_start_ms = now
+        self._window_admits = 0
+        self._window_rejects = 0
+
+        usage = self.event_queue.peak_usage()
         old_status = self._system_status
+        if rejects and rejects >= (admits + rejects) * EventBusConfig.QUOTA_CRITICAL_RATIO:
+            new_status = SYSTEM_STATUS["CRITICAL"]
+        elif rejects or usage > 0.8:
+            new_status = SYSTEM_STATUS["WARNING"]
+        elif usage < 0.3:
+            new_status = SYSTEM_STATUS["NORMAL"]
+        else:
+            new_status = old_status
 
-        # 检查队列使用率
-        if queue_stats["usage_ratio"] > 0.8:
-            self._system_status = SYSTEM_STATUS["WARNING"]
-            if old_status == SYSTEM_STATUS["NORMAL"]:
-                self._publish_direct_system_event(
-                    "warning",
-                    {
-                        # 简化信息载荷, 避免过多日志
-                        "queue_usage": queue_stats["usage_ratio"],
-                        "drops": queue_stats["drops"],
-                    },
-                )
-        elif queue_stats["usage_ratio"] < 0.3 and old_status != SYSTEM_STATUS["NORMAL"]:
-            self._system_status = SYSTEM_STATUS["NORMAL"]
+        if new_status != old_status:
+            self._system_status = new_status
             self._publish_direct_system_event(
-                "normal",
+                new_status,
                 {
-                    "queue_usage": queue_stats["usage_ratio"],
+                    # 简化信息载荷, 避免过多日志
+                    "queue_usage": usage,
+                    "admitted": admits,
+                    "throttled": rejects,
                 },
             )
 
     def _publish_direct_system_event(self, state, info):
         """直接入队系统事件, 避免递归发布"""
         try:
-            evt = (EVENTS["SYSTEM_STATE_CHANGE"], (state,), info or {})
-            self.event_queue.enqueue(evt)
+            self._enqueue(_SYSTEM_STATE_CHANGE_ID, (state,), info or {})
         except Exception as e:
             warning("系统事件入队失败: {}", str(e), module="EventBus")
 
+    def _resolve_callbacks(self, name):
+        """计算事件名的完整回调元组: 精确订阅在前, 通配匹配在后"""
+        callbacks = list(self.subscribers.get(name, ()))
+        if self._patterns.size:
+            for cb in self._patterns.match(name):
+                if cb not in callbacks:
+                    callbacks.append(cb)
+        return tuple(callbacks)
+
+    def _rebuild_dispatch(self):
+        """按已注册事件重建分发表(仅在订阅变化时调用)"""
+        self._dispatch = [self._resolve_callbacks(name) for name in EVENT_NAMES]
+
+    def _resolve(self, event):
+        """事件名或 ID -> ID; 首次出现的事件名注册后只为新事件补齐分发表"""
+        eid = event_id(event)
+        dispatch = self._dispatch
+        while len(dispatch) <= eid:
+            dispatch.append(self._resolve_callbacks(EVENT_NAMES[len(dispatch)]))
+        return eid
+
     @safe_log("error")
     def subscribe(self, event_name, callback):
-        if event_name not in self.subscribers:
-            self.subscribers[event_name] = []
-        self.subscribers[event_name].append(callback)
+        """订阅事件; 事件名可含通配段 "*", 如 wifi.* 或 *.state_change"""
+        if isinstance(event_name, int):
+            event_name = EVENT_NAMES[event_name]
+        if TopicTrie.is_pattern(event_name):
+            self._patterns.add(event_name, callback)
+        else:
+            self.subscribers[event_name] = self.subscribers.get(event_name, ()) + (callback,)
+            register_event(event_name)
+        self._rebuild_dispatch()
 
     def unsubscribe(self, event_name, callback):
-        if event_name in self.subscribers and callback in self.subscribers[event_name]:
-            self.subscribers[event_name].remove(callback)
+        """取消订阅; 回调不再订阅任何事件时一并释放其断路器"""
+        if isinstance(event_name, int):
+            event_name = EVENT_NAMES[event_name]
+        if TopicTrie.is_pattern(event_name):
+            if not self._patterns.remove(event_name, callback):
+                return
+        elif callback in self.subscribers.get(event_name, ()):
+            subs = self.subscribers[event_name]
+            i = subs.index(callback)
+            remaining = subs[:i] + subs[i + 1:]
+            if remaining:
+                self.subscribers[event_name] = remaining
+            else:
+                del self.subscribers[event_name]
+        else:
+            return
+        self._rebuild_dispatch()
+        if callback in self._breakers and not self._is_subscribed(callback):
+            del self._breakers[callback]
+            self._tripped.discard(callback)
+
+    def _is_subscribed(self, callback):
+        """回调是否仍有精确或通配订阅"""
+        for subs in self.subscribers.values():
+            if callback in subs:
+                return True
+        return self._patterns.contains(callback)
+
+    def set_coalesce(self, event_name, key_field=None, enabled=True):
+        """声明事件采用最新值合并模式
+
+        同键事件尚未分发时, 新事件原地覆盖旧事件而非追加。
+        键为事件名; 指定 key_field 时再按 kwargs[key_field] 区分(如按 sensor_id)。
+        """
+        eid = self._resolve(event_name)
+        if enabled:
+            self._coalesce_keys[eid] = key_field
+        else:
+            self._coalesce_keys.pop(eid, None)
+
+    def set_quota(self, event_name, rate_per_s, burst=None):
+        """设置事件的令牌桶配额, rate_per_s 为 None 时取消限流
+
+        Args:
+            rate_per_s: 每秒允许发布的事件数
+            burst: 突发容量, 默认等于 rate_per_s
+        """
+        eid = self._resolve(event_name)
+        if rate_per_s is None:
+            self._quotas.pop(eid, None)
+        else:
+            self._quotas[eid] = TokenBucket(rate_per_s, burst or rate_per_s)
+
+    def _enqueue(self, eid, args, kwargs):
+        """从记录池取出记录填充载荷后入队"""
+        record = self._pool.acquire()
+        record.eid = eid
+        record.args = args
+        record.kwargs = kwargs
+        return self.event_queue.enqueue(record)
 
     @safe_log("error")
     def publish(self, event_name, *args, **kwargs):
-        # 松耦合: 仅入队, 由 process_events 批处理
-        self.event_queue.enqueue((event_name, args, kwargs))
+        """发布事件(事件名或事件 ID), 仅入队, 由分发任务批处理
+
+        Returns:
+            ACCEPTED: 已入队(DROP_OLDEST 通道满时会挤出最旧事件)
+            COALESCED: 覆盖了同键待处理事件
+            REJECTED: 超出事件配额或通道已满(DROP_NEWEST), 事件未入队
+        """
+        eid = self._resolve(event_name)
+        if self._trace is not None:
+            self._trace.record(KIND_PUBLISH, eid, len(self.event_queue), state_code(args, kwargs))
+        coalesce_keys = self._coalesce_keys
+        if eid in coalesce_keys and self.event_queue.coalesce(
+            eid, args, kwargs, coalesce_keys[eid]
+        ):
+            return COALESCED
+
+        # 合并不占队列容量, 配额只约束真正入队的事件
+        bucket = self._quotas.get(eid)
+        if bucket is not None:
+            if not bucket.take(time.ticks_ms()):
+                self._window_rejects += 1
+                self._rejected_count += 1
+                return REJECTED
+            self._window_admits += 1
+
+        admitted = self._enqueue(eid, args, kwargs)
+        if self._dispatcher_active:
+            self._wake.set()
+        if admitted:
+            return ACCEPTED
+        self._rejected_count += 1
+        return REJECTED
+
+    def _admission_wait_ms(self, eid, now_ms):
+        """发布前需等待的毫秒数: 配额令牌或通道空位不足时大于 0"""
+        bucket = self._quotas.get(eid)
+        if bucket is not None:
+            wait = bucket.wait_ms(now_ms)
+            if wait:
+                return wait
+        if eid not in self._coalesce_keys and not self.event_queue.has_room(eid):
+            return EventBusConfig.WAIT_POLL_MS
+        return 0
+
+    async def publish_or_wait(self, event_name, *args, timeout_ms=None, **kwargs):
+        """发布事件, 配额或通道容量不足时等待而不是被拒绝/挤出旧事件
+
+        生产者(如 MQTT 接收循环)借此随总线处理速度自然降速。
+        注意: timeout_ms 为本方法参数, 不会作为事件载荷传给回调。
+
+        Returns:
+            同 publish(); 等待超过 timeout_ms 仍无法准入时返回 REJECTED
+        """
+        eid = self._resolve(event_name)
+        start = time.ticks_ms()
+        while True:
+            now = time.ticks_ms()
+            wait = self._admission_wait_ms(eid, now)
+            if not wait:
+                return self.publish(eid, *args, **kwargs)
+            if timeout_ms is not None:
+                left = timeout_ms - time.ticks_diff(now, start)
+                if left <= 0:
+                    self._rejected_count += 1
+                    return REJECTED
+                if wait > left:
+                    wait = left
+            await asyncio.sleep_ms(wait)
+
+    def publish_from_isr(self, eid, int_arg=0):
+        """中断上下文发布(硬件定时器/引脚 IRQ 回调中使用), 全程不分配堆内存
+
+        Args:
+            eid: 事件 ID, 须在中断外通过 EVENT_IDS/register_event() 预先取得
+            int_arg: 小整数载荷, 分发时作为回调的第一个位置参数
+        Returns:
+            bool: 槽位已满时丢弃并返回 False
+        """
+        head = self._isr_head
+        nxt = head + 1
+        if nxt == EventBusConfig.ISR_SLOTS:
+            nxt = 0
+        if nxt == self._isr_tail:
+            self._isr_drops += 1
+            return False
+        self._isr_ids[head] = eid
+        self._isr_args[head] = int_arg
+        self._isr_head = nxt
+
+        # 交接给主上下文: 分发任务运行且唤醒标志为 ThreadSafeFlag 时直接置位, 否则经 schedule 搬运
+        if self._dispatcher_active and self._wake_isr_safe:
+            self._wake.set()
+        elif not self._isr_scheduled and micropython is not None:
+            self._isr_scheduled = True
+            try:
+                micropython.schedule(self._drain_isr_cb, 0)
+            except Exception:
+                # 调度队列满: 留待下一批分发时搬运
+                self._isr_scheduled = False
+        return True
+
+    def _drain_isr(self, _arg=None):
+        """主上下文: 将中断槽位中的事件搬入常规队列"""
+        self._isr_scheduled = False
+        tail = self._isr_tail
+        while tail != self._isr_head:
+            eid = self._isr_ids[tail]
+            int_arg = self._isr_args[tail]
+            tail += 1
+            if tail == EventBusConfig.ISR_SLOTS:
+                tail = 0
+            self._isr_tail = tail
+            self.publish(eid, int_arg)
 
     def has_subscribers(self, event_name):
-        return event_name in self.subscribers and len(self.subscribers[event_name]) > 0
+        """事件是否有订阅者, 精确订阅与通配订阅均计入(不注册未出现过的事件名)"""
+        if isinstance(event_name, int):
+            if event_name >= len(EVENT_NAMES):
+                return False
+            event_name = EVENT_NAMES[event_name]
+        eid = EVENT_IDS.get(event_name)
+        if eid is not None and eid < len(self._dispatch):
+            # 分发表已含通配匹配结果, 订阅变化时整体重建
+            return len(self._dispatch[eid]) > 0
+        if self.subscribers.get(event_name):
+            return True
+        return self._patterns.size > 0 and len(self._patterns.match(event_name)) > 0
 
     def get_stats(self):
-        return {
+        self._roll_rate(time.ticks_ms())
+        queue_stats = self.event_queue.get_stats()
+        stats = {
             "processed": self._processed_count,
             "errors": self._error_count,
-            "queue": self.event_queue.get_stats(),
+            "unhandled": self._unhandled_count,
+            "rejected": self._rejected_count,
+            "status": self._system_status,
+            "coalesced": queue_stats["coalesced"],
+            "budget_us": self._budget_us,
+            "pool": self._pool.get_stats(),
+            "isr": {
+                "pending": (self._isr_head - self._isr_tail) % EventBusConfig.ISR_SLOTS,
+                "drops": self._isr_drops,
+            },
+            "events_per_s": self._events_per_s,
+            "queue": queue_stats,
         }
+        if self._breakers:
+            # 断路器以回调对象为键; 同名回调(如多个 lambda)各占一项, 名称仅作显示
+            stats["breakers"] = [
+                {
+                    "cb": getattr(cb, "__name__", "unknown"),
+                    "state": b.state,
+                    "failures": b.failures,
+                    "trips": b.trips,
+                    "skipped": b.skipped,
+                }
+                for cb, b in self._breakers.items()
+            ]
+        if self._quotas:
+            stats["quotas"] = {
+                EVENT_NAMES[eid]: {
+                    "rate": b.rate,
+                    "burst": b.capacity // 1000,
+                    "admitted": b.admitted,
+                    "rejected": b.rejected,
+                }
+                for eid, b in self._quotas.items()
+            }
+        if self._profile is not None:
+            stats["profile"] = self.get_profile_report()
+        return stats
 
     def _print_stats(self):
         stats = self.get_stats()
@@ -317,6 +1341,10 @@ class EventBus:
     def cleanup(self):
         # 清理资源
         self.subscribers.clear()
+        self._patterns = TopicTrie()
+        self._breakers.clear()
+        self._tripped.clear()
+        self._rebuild_dispatch()
         self.event_queue.clear()
 
     def get_system_status(self):
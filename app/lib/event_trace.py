@@ -0,0 +1,118 @@
+# app/lib/event_trace.py
+"""
+事件总线二进制追踪记录器
+职责:
+- 在 RAM 环形缓冲中记录每次发布与分发: 时间戳、事件 ID、队列深度、状态码、分发耗时
+- 按需落盘到 Flash, 供主机端 tools/trace_replay.py 解码与回放
+
+设计边界:
+- 记录路径仅 struct.pack_into 写入预分配 bytearray, 不分配堆内存
+- 缓冲满后覆盖最旧记录, 只保留最近 capacity 条
+- ticks_us 每 2^30 微秒回绕, 主机端按相邻记录差值展开
+
+文件格式(小端):
+- 头: b"EVTR", 版本 u8, 记录长度 u8, 事件名数 u16, 每个事件名 (长度 u8 + utf-8)
+- 状态码表: 数量 u8, 每个状态 (长度 u8 + utf-8)
+- 记录数 u32, 随后按时间顺序排列的定长记录 ENTRY_FMT
+"""
+
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+try:
+    import utime as time
+except ImportError:
+    import time
+
+MAGIC = b"EVTR"
+VERSION = 1
+
+# 记录: ticks_us u32, 类型 u8, 事件 ID u8, 队列深度 u8, 状态码 u8, 分发耗时 us u32
+ENTRY_FMT = "<IBBBBI"
+ENTRY_SIZE = 12
+
+KIND_PUBLISH = 0
+KIND_DISPATCH = 1
+
+# 事件载荷 state 的编码表, 未列出的状态记为 0
+STATE_CODES = (
+    "",
+    "connected",
+    "disconnected",
+    "running",
+    "normal",
+    "warning",
+    "critical",
+    "callback_error",
+    "processing_error",
+)
+_STATE_INDEX = {s: i for i, s in enumerate(STATE_CODES)}
+
+DEFAULT_PATH = "/trace.bin"
+
+
+def state_code(args, kwargs):
+    """取载荷中的状态(kwargs["state"] 或首个字符串位置参数)并编码"""
+    state = kwargs.get("state")
+    if state is None and args and isinstance(args[0], str):
+        state = args[0]
+    return _STATE_INDEX.get(state, 0) if state is not None else 0
+
+
+class EventTrace:
+    """定长 RAM 环形追踪缓冲"""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._buf = bytearray(capacity * ENTRY_SIZE)
+        self._next = 0  # 下一条写入位置
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def record(self, kind, eid, depth, code=0, dur_us=0):
+        """写入一条记录, 缓冲满时覆盖最旧记录"""
+        if depth > 255:
+            depth = 255
+        struct.pack_into(
+            ENTRY_FMT, self._buf, self._next * ENTRY_SIZE,
+            time.ticks_us(), kind, eid & 0xFF, depth, code, dur_us,
+        )
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+
+    def _ordered_chunks(self):
+        """按时间顺序返回缓冲片段(memoryview, 不复制)"""
+        mv = memoryview(self._buf)
+        if self._count < self.capacity:
+            return (mv[: self._count * ENTRY_SIZE],)
+        split = self._next * ENTRY_SIZE
+        return (mv[split:], mv[:split])
+
+    def flush(self, event_names, path=DEFAULT_PATH):
+        """将当前缓冲按时间顺序写入文件, 返回写入的记录数"""
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<BBH", VERSION, ENTRY_SIZE, len(event_names)))
+            for name in event_names:
+                raw = name.encode("utf-8")
+                f.write(struct.pack("<B", len(raw)))
+                f.write(raw)
+            f.write(struct.pack("<B", len(STATE_CODES)))
+            for state in STATE_CODES:
+                raw = state.encode("utf-8")
+                f.write(struct.pack("<B", len(raw)))
+                f.write(raw)
+            f.write(struct.pack("<I", self._count))
+            for chunk in self._ordered_chunks():
+                f.write(chunk)
+        return self._count
@@ -0,0 +1,210 @@
+# app/lib/gc_scheduler.py
+"""
+垃圾回收调度器
+职责:
+- 统一各处的 gc.collect(): 调用方只提出回收请求, 由主循环在空闲间隙执行
+- 按实测堆使用量设置 gc.threshold(), 作为空闲回收之外的兜底自动回收
+- 记录最近若干次回收的时间、耗时与释放量
+
+设计边界:
+- 延迟敏感操作(MQTT 发布、传感器读取)期间通过 busy() 守卫跳过回收
+- 历史记录为预分配 array 环, 记录时不分配堆内存
+- 不支持 mem_free/threshold 的端口(主机 CPython)上自动降级为按请求/间隔回收
+"""
+
+import gc
+from array import array
+try:
+    import utime as time
+except ImportError:
+    import time
+
+from lib.logger import debug
+
+
+class GCConfig:
+    """垃圾回收调度配置"""
+    IDLE_ALLOC_RATIO = 0.25  # 自上次回收新分配量超过空闲堆的该比例时, 在空闲间隙回收
+    THRESHOLD_RATIO = 0.6  # gc.threshold = 回收后空闲堆 * 该比例, 正常情况下空闲回收先于自动回收
+    MIN_THRESHOLD = 4096  # gc.threshold 下限(字节)
+    MAX_INTERVAL_MS = 60000  # 最长回收间隔, 即使分配量很小也定期整理碎片
+    HISTORY = 8  # 保留的回收记录数
+
+
+class _BusyGuard:
+    """延迟敏感区守卫, 支持嵌套"""
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    def __enter__(self):
+        self._scheduler._busy += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._scheduler._busy -= 1
+        return False
+
+
+class GCScheduler:
+    """垃圾回收调度器"""
+
+    def __init__(self):
+        self._has_mem = hasattr(gc, "mem_free") and hasattr(gc, "mem_alloc")
+        self._has_threshold = hasattr(gc, "threshold")
+        self._busy = 0
+        self._guard = _BusyGuard(self)
+
+        self._pending = None  # 待执行请求的原因, None 表示无请求
+        self._last_ms = time.ticks_ms()
+        self._alloc_after = gc.mem_alloc() if self._has_mem else 0
+        self._idle_trigger = 0  # 触发空闲回收的新分配字节数, 0 表示未测量
+        self._threshold = -1
+        self._on_request = None  # 新请求到达时的回调(主循环用于提前结束休眠)
+
+        # 统计
+        self._count = 0
+        self._requests = 0
+        self._skipped_busy = 0
+        self._total_us = 0
+        self._max_us = 0
+
+        # 回收历史环: 时间戳 ms、耗时 us、释放字节数、原因
+        n = GCConfig.HISTORY
+        self._hist_at = array("i", [0] * n)
+        self._hist_us = array("i", [0] * n)
+        self._hist_freed = array("i", [0] * n)
+        self._hist_why = [""] * n
+        self._hist_next = 0
+
+    def busy(self):
+        """延迟敏感区守卫: with get_gc_scheduler().busy(): ..."""
+        return self._guard
+
+    def is_busy(self):
+        return self._busy > 0
+
+    def request(self, reason="request"):
+        """请求在下一个空闲间隙回收(替代直接调用 gc.collect())"""
+        self._requests += 1
+        if self._pending is None:
+            self._pending = reason
+            if self._on_request is not None:
+                self._on_request()
+
+    def set_wake(self, callback):
+        """设置新请求到达时的回调, 主循环据此提前醒来执行空闲回收"""
+        self._on_request = callback
+
+    def next_due_ms(self):
+        """距下一次应回收的毫秒数: 有待执行请求时为 0, 否则为最长回收间隔的剩余时间
+
+        分配量触发无法预知时间点, 由主循环每次醒来时 run_idle() 检查
+        """
+        if self._pending is not None:
+            return 0
+        remaining = GCConfig.MAX_INTERVAL_MS - time.ticks_diff(time.ticks_ms(), self._last_ms)
+        return remaining if remaining > 0 else 0
+
+    def _due_reason(self, now_ms):
+        """返回应回收的原因, 无需回收时返回 None"""
+        if self._pending is not None:
+            return self._pending
+        if self._has_mem and self._idle_trigger:
+            if gc.mem_alloc() - self._alloc_after >= self._idle_trigger:
+                return "alloc"
+        if time.ticks_diff(now_ms, self._last_ms) >= GCConfig.MAX_INTERVAL_MS:
+            return "interval"
+        return None
+
+    def run_idle(self):
+        """主循环空闲间隙调用: 有请求或达到分配/间隔条件时回收
+
+        Returns:
+            bool: 本次是否执行了回收
+        """
+        reason = self._due_reason(time.ticks_ms())
+        if reason is None:
+            return False
+        if self._busy:
+            self._skipped_busy += 1
+            return False
+        self.collect_now(reason)
+        return True
+
+    def collect_now(self, reason="forced"):
+        """立即回收并记录, 随后按实测空闲堆重设阈值"""
+        before = gc.mem_alloc() if self._has_mem else 0
+        t0 = time.ticks_us()
+        gc.collect()
+        dt = time.ticks_diff(time.ticks_us(), t0)
+        now = time.ticks_ms()
+
+        freed = 0
+        if self._has_mem:
+            after = gc.mem_alloc()
+            freed = before - after
+            self._alloc_after = after
+            self._retune(gc.mem_free())
+
+        self._pending = None
+        self._last_ms = now
+        self._count += 1
+        self._total_us += dt
+        if dt > self._max_us:
+            self._max_us = dt
+
+        i = self._hist_next
+        self._hist_at[i] = now
+        self._hist_us[i] = dt
+        self._hist_freed[i] = freed
+        self._hist_why[i] = reason
+        self._hist_next = 0 if i + 1 == GCConfig.HISTORY else i + 1
+        return dt
+
+    def _retune(self, free):
+        """按回收后的空闲堆设置空闲回收触发量与 gc.threshold"""
+        self._idle_trigger = int(free * GCConfig.IDLE_ALLOC_RATIO)
+        threshold = int(free * GCConfig.THRESHOLD_RATIO)
+        if threshold < GCConfig.MIN_THRESHOLD:
+            threshold = GCConfig.MIN_THRESHOLD
+        # 变化不足 1/8 时不重设, 避免频繁调用
+        if self._has_threshold and abs(threshold - self._threshold) > self._threshold // 8:
+            gc.threshold(threshold)
+            self._threshold = threshold
+            debug("gc.threshold 调整为 {} 字节(空闲 {} 字节)", threshold, free, module="GC")
+
+    def get_stats(self):
+        """回收统计与最近历史(按时间顺序)"""
+        history = []
+        n = GCConfig.HISTORY
+        for k in range(n):
+            i = (self._hist_next + k) % n
+            if self._hist_why[i]:
+                history.append({
+                    "at_ms": self._hist_at[i],
+                    "us": self._hist_us[i],
+                    "freed": self._hist_freed[i],
+                    "why": self._hist_why[i],
+                })
+        return {
+            "count": self._count,
+            "requests": self._requests,
+            "skipped_busy": self._skipped_busy,
+            "avg_us": self._total_us // self._count if self._count else 0,
+            "max_us": self._max_us,
+            "threshold": self._threshold,
+            "history": history,
+        }
+
+
+# 全局垃圾回收调度器实例
+_gc_scheduler = None
+
+
+def get_gc_scheduler():
+    """获取全局垃圾回收调度器实例"""
+    global _gc_scheduler
+    if _gc_scheduler is None:
+        _gc_scheduler = GCScheduler()
+    return _gc_scheduler
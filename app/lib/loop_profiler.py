@@ -0,0 +1,140 @@
+# app/lib/loop_profiler.py
+"""
+主循环剖析器
+职责:
+- 以 ticks_us 测量主循环每轮耗时、各阶段耗时(事件分发、FSM、喂狗、其他截止时间任务、作业、GC)
+  与休眠超时(实际醒来晚于截止时间的微秒数, 反映 WiFi 扫描、MQTT 连接等阻塞事件循环的时长)
+- 固定分桶直方图累计, 附最大值及其发生时刻, 便于在现场定位卡住主循环的环节
+- dump() 一次调用输出全部统计(可选打印日志), 随子系统诊断上报(state/diag/loop)
+
+设计边界:
+- 计数存放在预分配 array 中, record() 只做分桶查找与计数, 不分配堆内存, 可常态开启
+- 阶段以整数常量标识; 截止时间任务按键前缀("fsm."/"wdt.")归类
+- 只在主循环/协程中调用, 不支持 ISR 或多线程
+"""
+
+from array import array
+try:
+    import utime as time
+except ImportError:
+    import time
+
+from lib.logger import info
+
+# 阶段
+P_ITER = 0  # 主循环一轮(不含休眠)
+P_BUS = 1  # 事件分发批次
+P_FSM = 2  # FSM 超时与周期动作
+P_WDT = 3  # 喂狗
+P_TIMER = 4  # 其他截止时间任务
+P_JOB = 5  # 周期作业
+P_GC = 6  # 空闲垃圾回收
+P_OVERSHOOT = 7  # 休眠超时
+PHASES = ("iter", "bus", "fsm", "wdt", "timer", "job", "gc", "overshoot")
+
+# 直方图桶上界(us), 最后一个桶收纳超出 BUCKETS_US[-1] 的样本
+BUCKETS_US = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+_NBUCKETS = len(BUCKETS_US) + 1
+
+
+class LoopProfiler:
+    """主循环剖析器"""
+
+    def __init__(self):
+        n = len(PHASES)
+        self._hist = array("I", [0] * (n * _NBUCKETS))
+        self._count = array("I", [0] * n)
+        self._max_us = array("I", [0] * n)
+        self._max_at = array("i", [0] * n)  # 最大值出现时的 ticks_ms
+        self._last_us = array("I", [0] * n)
+        self._since_ms = time.ticks_ms()
+
+    def record(self, phase, us):
+        """记录一个阶段样本(us 为负时按 0 计)"""
+        if us < 0:
+            us = 0
+        i = 0
+        for bound in BUCKETS_US:
+            if us <= bound:
+                break
+            i += 1
+        self._hist[phase * _NBUCKETS + i] += 1
+        self._count[phase] += 1
+        self._last_us[phase] = us
+        if us > self._max_us[phase] or self._count[phase] == 1:
+            self._max_us[phase] = us
+            self._max_at[phase] = time.ticks_ms()
+
+    def task(self, key, us):
+        """记录截止时间任务耗时, 按键前缀归类"""
+        if key.startswith("fsm."):
+            self.record(P_FSM, us)
+        elif key.startswith("wdt."):
+            self.record(P_WDT, us)
+        else:
+            self.record(P_TIMER, us)
+
+    def reset(self):
+        for i in range(len(self._hist)):
+            self._hist[i] = 0
+        for i in range(len(PHASES)):
+            self._count[i] = 0
+            self._max_us[i] = 0
+            self._max_at[i] = 0
+            self._last_us[i] = 0
+        self._since_ms = time.ticks_ms()
+
+    def _percentile(self, phase, q):
+        """按直方图估算分位数: 返回所在桶上界, 落在溢出桶时返回最大值"""
+        n = self._count[phase]
+        if not n:
+            return 0
+        target = (n * q + 99) // 100
+        base = phase * _NBUCKETS
+        seen = 0
+        for i in range(len(BUCKETS_US)):
+            seen += self._hist[base + i]
+            if seen >= target:
+                return BUCKETS_US[i]
+        return self._max_us[phase]
+
+    def dump(self, log=False):
+        """全部统计(仅含有样本的阶段); log 为 True 时每阶段打印一行"""
+        now = time.ticks_ms()
+        phases = {}
+        for p, name in enumerate(PHASES):
+            n = self._count[p]
+            if not n:
+                continue
+            base = p * _NBUCKETS
+            entry = {
+                "n": n,
+                "p50_us": self._percentile(p, 50),
+                "p99_us": self._percentile(p, 99),
+                "max_us": self._max_us[p],
+                "max_ago_ms": time.ticks_diff(now, self._max_at[p]),
+                "last_us": self._last_us[p],
+                "hist": list(self._hist[base:base + _NBUCKETS]),
+            }
+            phases[name] = entry
+            if log:
+                info("{}: n={} p50<={}us p99<={}us max={}us({}ms前)",
+                     name, n, entry["p50_us"], entry["p99_us"], entry["max_us"],
+                     entry["max_ago_ms"], module="LOOP")
+        return {
+            "since_ms": time.ticks_diff(now, self._since_ms),
+            "buckets_us": BUCKETS_US,
+            "phases": phases,
+        }
+
+
+# 全局剖析器实例
+_loop_profiler = None
+
+
+def get_loop_profiler():
+    """获取全局主循环剖析器实例"""
+    global _loop_profiler
+    if _loop_profiler is None:
+        _loop_profiler = LoopProfiler()
+    return _loop_profiler
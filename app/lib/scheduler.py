@@ -0,0 +1,339 @@
+# app/lib/scheduler.py
+"""
+截止时间调度器
+职责:
+- 各模块登记明确的截止时间(一次性超时或固定周期任务), 替代每个主循环节拍的轮询
+- 主循环执行到期任务, 并通过 sleep() 休眠到最近截止时间
+- 休眠期间登记了更早的截止时间(或调用 wake())时提前唤醒, 无需固定节拍轮询
+- 协作式周期作业(add_job): 带周期、随机抖动、优先级与耗时预算; 同时到期的作业
+  每次 run_due() 只执行优先级最高的一个, 其余顺延到下一轮(其间让出事件循环), 超出预算计为 overrun
+
+设计边界:
+- 任务以键标识, 同键重复登记即改期; 任务数量很少(个位数), 线性扫描即可
+- 截止时间任务(超时、喂狗)到期即全部执行; 作业用于可以错峰的维护工作(采样、上报、回收)
+- 查找与执行到期任务不分配内存; 任务回调异常被捕获并记录, 不影响其他任务
+- 只在主循环/协程中调用, 不支持 ISR 或多线程
+"""
+
+try:
+    import utime as time
+except ImportError:
+    import time
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+try:
+    from urandom import getrandbits
+except ImportError:
+    from random import getrandbits
+
+from lib.logger import error, warning
+from lib.loop_profiler import P_JOB, P_OVERSHOOT
+
+
+class _Deadline:
+    """单个截止时间任务"""
+    __slots__ = ("due_ms", "period_ms", "callback", "runs")
+
+    def __init__(self, due_ms, period_ms, callback):
+        self.due_ms = due_ms
+        self.period_ms = period_ms
+        self.callback = callback
+        self.runs = 0
+
+
+class _Job:
+    """协作式周期作业"""
+    __slots__ = ("interval_ms", "jitter_ms", "priority", "budget_ms", "callback",
+                 "base_ms", "due_ms", "runs", "overruns", "last_ms", "max_ms", "max_late_ms")
+
+    def __init__(self, callback, interval_ms, jitter_ms, priority, budget_ms):
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.jitter_ms = jitter_ms
+        self.priority = priority
+        self.budget_ms = budget_ms
+        self.base_ms = 0  # 不含抖动的名义到期时间, 周期按它推进, 抖动不累积
+        self.due_ms = 0
+        self.runs = 0
+        self.overruns = 0
+        self.last_ms = 0
+        self.max_ms = 0
+        self.max_late_ms = 0  # 到期后被顺延执行的最长时间
+
+
+def _jitter(jitter_ms):
+    """0 ~ jitter_ms 的随机延后"""
+    if jitter_ms <= 0:
+        return 0
+    return getrandbits(16) * jitter_ms // 65535
+
+
+class DeadlineScheduler:
+    """截止时间调度器"""
+
+    def __init__(self):
+        self._tasks = {}
+        self._jobs = {}
+        self._fired = 0
+
+        # 休眠与唤醒
+        self._wake_event = None  # 首次 sleep() 时创建, 需在事件循环内
+        self._sleep_until = None  # 当前休眠的目标时刻, None 表示未在休眠
+        self._wakeups = 0
+        self._early_wakeups = 0
+        self._slept_ms = 0
+        self._light_sleeps = 0
+
+        # 主循环剖析器(lib.loop_profiler): None 表示关闭
+        self._profiler = None
+
+    def schedule(self, key, delay_ms, callback, period_ms=0):
+        """登记(或改期)任务: delay_ms 后执行 callback(), period_ms > 0 时按该周期重复"""
+        now = time.ticks_ms()
+        due = time.ticks_add(now, delay_ms)
+        task = self._tasks.get(key)
+        if task is None:
+            self._tasks[key] = _Deadline(due, period_ms, callback)
+        else:
+            task.due_ms = due
+            task.period_ms = period_ms
+            task.callback = callback
+        self._wake_before(due)
+
+    def add_job(self, name, callback, interval_ms, jitter_ms=0, priority=0, budget_ms=0, delay_ms=0):
+        """登记(或替换)周期作业
+
+        Args:
+            name: 作业名, 如 "sensor.sample"
+            callback: 无参回调
+            interval_ms: 执行周期
+            jitter_ms: 每次到期时间叠加 0~jitter_ms 的随机延后, 避免多个作业长期对齐
+            priority: 同时到期时数值大者先执行
+            budget_ms: 单次耗时预算, 0 表示不检查
+            delay_ms: 首次执行前的延迟(同样叠加抖动)
+        """
+        job = _Job(callback, interval_ms, jitter_ms, priority, budget_ms)
+        job.base_ms = time.ticks_add(time.ticks_ms(), delay_ms)
+        job.due_ms = time.ticks_add(job.base_ms, _jitter(jitter_ms))
+        self._jobs[name] = job
+        self._wake_before(job.due_ms)
+
+    def remove_job(self, name):
+        """移除作业, 不存在时忽略"""
+        self._jobs.pop(name, None)
+
+    def _wake_before(self, due):
+        # 新截止时间早于当前休眠目标: 唤醒主循环重新计算
+        if self._sleep_until is not None and time.ticks_diff(due, self._sleep_until) < 0:
+            self.wake()
+
+    def wake(self):
+        """提前结束当前 sleep()(如有新的空闲工作), 未在休眠时无操作"""
+        if self._sleep_until is not None and self._wake_event is not None:
+            self._wake_event.set()
+
+    def set_profiler(self, profiler):
+        """挂载主循环剖析器, 记录任务/作业耗时与休眠超时; 传入 None 关闭"""
+        self._profiler = profiler
+
+    def cancel(self, key):
+        """取消任务, 不存在时忽略"""
+        self._tasks.pop(key, None)
+
+    def pending(self, key):
+        return key in self._tasks
+
+    def _earliest(self):
+        """返回最早到期的 (键, 任务), 无任务时返回 (None, None)"""
+        best_key = None
+        best = None
+        for key, task in self._tasks.items():
+            if best is None or time.ticks_diff(task.due_ms, best.due_ms) < 0:
+                best_key = key
+                best = task
+        return best_key, best
+
+    def run_due(self):
+        """执行所有已到期任务, 以及至多一个已到期作业
+
+        Returns:
+            int: 本次执行的任务与作业数
+        """
+        # 每个任务本轮最多执行一次, 避免零周期任务或回调内改期造成死循环
+        limit = len(self._tasks)
+        count = 0
+        while count < limit:
+            key, task = self._earliest()
+            if task is None:
+                break
+            now = time.ticks_ms()
+            if time.ticks_diff(task.due_ms, now) > 0:
+                break
+            if task.period_ms:
+                # 周期任务按原节拍推进; 落后超过一个周期时从当前时刻重新计时
+                due = time.ticks_add(task.due_ms, task.period_ms)
+                if time.ticks_diff(due, now) <= 0:
+                    due = time.ticks_add(now, task.period_ms)
+                task.due_ms = due
+            else:
+                del self._tasks[key]
+            task.runs += 1
+            count += 1
+            self._fired += 1
+            profiler = self._profiler
+            t0 = time.ticks_us() if profiler is not None else 0
+            try:
+                task.callback()
+            except Exception as e:
+                error("调度任务 {} 执行失败: {}", key, e, module="SCHED")
+            if profiler is not None:
+                profiler.task(key, time.ticks_diff(time.ticks_us(), t0))
+
+        # 作业: 每轮最多一个, 其余到期作业留给下一轮, 避免同一节拍集中执行
+        name, job = self._due_job(time.ticks_ms())
+        if job is not None:
+            self._run_job(name, job)
+            count += 1
+        return count
+
+    def _due_job(self, now):
+        """返回已到期作业中优先级最高(同级取最早到期)的 (名称, 作业)"""
+        best_name = None
+        best = None
+        for name, job in self._jobs.items():
+            if time.ticks_diff(job.due_ms, now) > 0:
+                continue
+            if (best is None or job.priority > best.priority
+                    or (job.priority == best.priority and time.ticks_diff(job.due_ms, best.due_ms) < 0)):
+                best_name = name
+                best = job
+        return best_name, best
+
+    def _run_job(self, name, job):
+        start = time.ticks_ms()
+        late = time.ticks_diff(start, job.due_ms)
+        if late > job.max_late_ms:
+            job.max_late_ms = late
+        # 名义时间按周期推进; 落后超过一个周期时从当前时刻重新计时
+        base = time.ticks_add(job.base_ms, job.interval_ms)
+        if time.ticks_diff(base, start) <= 0:
+            base = time.ticks_add(start, job.interval_ms)
+        job.base_ms = base
+        job.due_ms = time.ticks_add(base, _jitter(job.jitter_ms))
+        job.runs += 1
+        self._fired += 1
+        profiler = self._profiler
+        t0 = time.ticks_us() if profiler is not None else 0
+        try:
+            job.callback()
+        except Exception as e:
+            error("作业 {} 执行失败: {}", name, e, module="SCHED")
+        if profiler is not None:
+            profiler.record(P_JOB, time.ticks_diff(time.ticks_us(), t0))
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        job.last_ms = elapsed
+        if elapsed > job.max_ms:
+            job.max_ms = elapsed
+        if job.budget_ms and elapsed > job.budget_ms:
+            job.overruns += 1
+            warning("作业 {} 超出预算: {}ms > {}ms(累计 {} 次)",
+                    name, elapsed, job.budget_ms, job.overruns, module="SCHED")
+
+    def next_delay_ms(self, max_ms=None):
+        """距最近截止时间(任务或作业)的毫秒数(已到期为 0); 无任务时返回 max_ms"""
+        _key, task = self._earliest()
+        due = task.due_ms if task is not None else None
+        for job in self._jobs.values():
+            if due is None or time.ticks_diff(job.due_ms, due) < 0:
+                due = job.due_ms
+        if due is None:
+            return max_ms
+        delay = time.ticks_diff(due, time.ticks_ms())
+        if delay < 0:
+            delay = 0
+        if max_ms is not None and delay > max_ms:
+            delay = max_ms
+        return delay
+
+    async def sleep(self, max_ms):
+        """休眠到最近截止时间(不超过 max_ms), 期间可被 wake() 或更早的截止时间提前唤醒
+
+        Returns:
+            int: 实际休眠毫秒数
+        """
+        delay = self.next_delay_ms(max_ms)
+        start = time.ticks_ms()
+        if delay is None or delay <= 0:
+            await asyncio.sleep_ms(0)
+            return 0
+        if self._wake_event is None:
+            self._wake_event = asyncio.Event()
+        self._wake_event.clear()
+        self._sleep_until = time.ticks_add(start, delay)
+        start_us = time.ticks_us()
+        try:
+            await asyncio.wait_for_ms(self._wake_event.wait(), delay)
+            self._early_wakeups += 1
+        except asyncio.TimeoutError:
+            # 按时醒来: 超出截止时间的部分即其他任务阻塞事件循环的时长
+            if self._profiler is not None:
+                over = time.ticks_diff(time.ticks_us(), start_us) - delay * 1000
+                self._profiler.record(P_OVERSHOOT, over)
+        finally:
+            self._sleep_until = None
+        slept = time.ticks_diff(time.ticks_ms(), start)
+        self._wakeups += 1
+        self._slept_ms += slept
+        return slept
+
+    def note_sleep(self, slept_ms, light=False):
+        """记录在 sleep() 之外完成的休眠; light 表示 machine.lightsleep"""
+        self._wakeups += 1
+        self._slept_ms += slept_ms
+        if light:
+            self._light_sleeps += 1
+
+    def get_stats(self):
+        """任务与作业列表、累计执行数与休眠唤醒统计"""
+        now = time.ticks_ms()
+        tasks = {}
+        for key, task in self._tasks.items():
+            tasks[key] = {
+                "in_ms": time.ticks_diff(task.due_ms, now),
+                "period_ms": task.period_ms,
+                "runs": task.runs,
+            }
+        jobs = {}
+        for name, job in self._jobs.items():
+            jobs[name] = {
+                "in_ms": time.ticks_diff(job.due_ms, now),
+                "interval_ms": job.interval_ms,
+                "runs": job.runs,
+                "last_ms": job.last_ms,
+                "max_ms": job.max_ms,
+                "max_late_ms": job.max_late_ms,
+                "overruns": job.overruns,
+            }
+        return {
+            "fired": self._fired,
+            "wakeups": self._wakeups,
+            "early_wakeups": self._early_wakeups,
+            "slept_ms": self._slept_ms,
+            "light_sleeps": self._light_sleeps,
+            "tasks": tasks,
+            "jobs": jobs,
+        }
+
+
+# 全局调度器实例
+_scheduler = None
+
+
+def get_scheduler():
+    """获取全局截止时间调度器实例"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = DeadlineScheduler()
+    return _scheduler
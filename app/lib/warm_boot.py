@@ -0,0 +1,364 @@
+# app/lib/warm_boot.py
+"""
+热启动快照
+职责:
+- 在 RTC 内存(不可用时退回 Flash 小文件)保存最近一次可用的连接状态:
+  SSID/BSSID/信道、IP 配置与获取时间、NTP 同步时间、HA Discovery 摘要、启动与错误计数
+- 看门狗/软件复位后读取快照, 供 NetworkManager 跳过仍然有效的步骤:
+  直连上次的 AP(不扫描)、复用 IP 配置(不走 DHCP)、跳过 NTP、跳过未变化的 Discovery 发布
+- 深睡眠占空比模式下保存未发出的读数积压与上一周期的空口时间(见 duty_cycle)
+
+设计边界:
+- 快照带 CRC32 校验, 版本或校验不符即视为冷启动
+- 有效性以 RTC 墙钟判断(软复位后 RTC 时间保持): 快照过旧或时间倒退(断电后 RTC 归零)均视为冷启动
+- 冷启动时 WiFi 先于 NTP 连通, IP 获取时间按未校准的时钟记录; NTP 校时后按墙钟与 ticks_ms 的偏差
+  平移已记录的时间, 否则首次热复位会把刚获取的 IP 判为过期
+- RTC 内存每次保存都写入(刷新保存时间); Flash 退化路径下内容未变化时最多每 max_age_s/2 重写一次, 避免磨损
+- 快照只加速连接, 任一步骤失败即回退到完整流程并作废对应字段
+- 读数积压不受快照有效期影响(过期只作废连接字段), 超过 MAX_READINGS 时丢弃最旧的读数
+
+格式(小端): HEADER_FMT 定长部分 + SSID(长度 u8 + utf-8)
+          + BACKLOG_FMT 积压头 + 读数 READING_FMT * n + CRC32 u32
+"""
+
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+try:
+    import utime as time
+except ImportError:
+    import time
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+from lib.logger import info, warning, debug
+
+MAGIC = b"WB"
+VERSION = 2
+FLASH_PATH = "/warm.bin"
+
+# magic, 版本, 标志, 保存时间 s, 启动次数, 错误复位次数, 复位前错误计数, 信道,
+# BSSID, IP, 掩码, 网关, DNS, IP 获取时间 s, NTP 同步时间 s, Discovery 摘要
+HEADER_FMT = "<2sBBIHHBB6s4s4s4s4sIII"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+
+# 上一周期空口时间 ms, 周期数, 发送失败周期数, 丢弃读数数, 积压读数条数
+BACKLOG_FMT = "<IHHHB"
+BACKLOG_SIZE = struct.calcsize(BACKLOG_FMT)
+# 读数: 时间 s(time.time(), 0 表示未同步), 温度 0.01°C, 湿度 0.01%
+READING_FMT = "<IhH"
+READING_SIZE = struct.calcsize(READING_FMT)
+MAX_READINGS = 64  # RTC 内存容量有限(约 2KB)
+_NO_TEMP = -32768
+_NO_HUM = 0xFFFF
+
+# 标志位
+F_WIFI = 0x01
+F_IP = 0x02
+F_NTP = 0x04
+F_DISCOVERY = 0x08
+
+CLOCK_JUMP_S = 2  # 墙钟相对 ticks_ms 的偏差超过该值视为被校时
+
+
+def _ip_pack(ip):
+    try:
+        return bytes(int(x) for x in ip.split("."))
+    except Exception:
+        return b"\x00\x00\x00\x00"
+
+
+def _ip_unpack(raw):
+    return "{}.{}.{}.{}".format(raw[0], raw[1], raw[2], raw[3])
+
+
+def checksum(data):
+    """CRC32(固件无 binascii.crc32 时退化为简单滚动哈希)"""
+    if crc32 is not None:
+        return crc32(data) & 0xFFFFFFFF
+    total = 0
+    for b in data:
+        total = (total * 31 + b) & 0xFFFFFFFF
+    return total
+
+
+class WarmBoot:
+    """热启动快照: 启动时读取一次, 各步骤成功后更新并写回"""
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.max_age_s = int(config.get("max_age_s", 3600))
+        self.lease_s = int(config.get("lease_s", 1800))
+        self.ntp_max_age_s = int(config.get("ntp_max_age_s", 21600))
+
+        self._rtc = None
+        try:
+            import machine
+            self._rtc = machine.RTC()
+            self._rtc.memory()
+        except Exception:
+            self._rtc = None
+
+        # 快照字段
+        self.flags = 0
+        self.saved_s = 0
+        self.boot_count = 0
+        self.error_resets = 0
+        self.last_error_count = 0
+        self.ssid = ""
+        self.bssid = b"\x00" * 6
+        self.channel = 0
+        self.ifconfig = None
+        self.ip_at = 0
+        self.ntp_at = 0
+        self.discovery_hash = 0
+
+        # 深睡眠占空比: 读数积压与周期统计
+        self.readings = []  # [(ts, 温度 0.01°C, 湿度 0.01%)]
+        self.air_ms = 0
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.dropped = 0
+
+        self.warm = False  # 本次启动是否拿到有效快照
+        self._last_key = b""  # 上次写入内容(不含保存时间与校验)
+        self._written_s = 0
+        # 墙钟参考点: 与 ticks_ms 对照检测 NTP 校时造成的跳变
+        self._ref_s = time.time()
+        self._ref_ms = time.ticks_ms()
+
+        if self.enabled:
+            self._load()
+            self.boot_count = (self.boot_count + 1) & 0xFFFF
+            self.save()
+
+    # ---- 存储 ----
+    def _read_raw(self):
+        if self._rtc is not None:
+            return bytes(self._rtc.memory())
+        try:
+            with open(FLASH_PATH, "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+
+    def _write_raw(self, raw):
+        if self._rtc is not None:
+            self._rtc.memory(raw)
+            return
+        with open(FLASH_PATH, "wb") as f:
+            f.write(raw)
+
+    def _encode(self):
+        ifc = self.ifconfig or ("0.0.0.0",) * 4
+        ssid = self.ssid.encode("utf-8")[:32]
+        body = struct.pack(
+            HEADER_FMT, MAGIC, VERSION, self.flags, self.saved_s,
+            self.boot_count, self.error_resets, self.last_error_count, self.channel,
+            self.bssid, _ip_pack(ifc[0]), _ip_pack(ifc[1]), _ip_pack(ifc[2]), _ip_pack(ifc[3]),
+            self.ip_at, self.ntp_at, self.discovery_hash,
+        ) + struct.pack("<B", len(ssid)) + ssid
+        body += struct.pack(BACKLOG_FMT, self.air_ms, self.cycles, self.failed_cycles,
+                            self.dropped, len(self.readings))
+        for r in self.readings:
+            body += struct.pack(READING_FMT, *r)
+        return body + struct.pack("<I", checksum(body))
+
+    def _decode(self, raw):
+        """解码快照, 格式或校验不符返回 False"""
+        if len(raw) < HEADER_SIZE + 1 + BACKLOG_SIZE + 4 or raw[:2] != MAGIC or raw[2] != VERSION:
+            return False
+        ssid_end = HEADER_SIZE + 1 + raw[HEADER_SIZE]
+        if len(raw) < ssid_end + BACKLOG_SIZE + 4:
+            return False
+        count = raw[ssid_end + BACKLOG_SIZE - 1]
+        end = ssid_end + BACKLOG_SIZE + count * READING_SIZE
+        if len(raw) < end + 4:
+            return False
+        if struct.unpack_from("<I", raw, end)[0] != checksum(raw[:end]):
+            return False
+        (_magic, _version, self.flags, self.saved_s, self.boot_count, self.error_resets,
+         self.last_error_count, self.channel, self.bssid, ip, mask, gw, dns,
+         self.ip_at, self.ntp_at, self.discovery_hash) = struct.unpack_from(HEADER_FMT, raw, 0)
+        self.ifconfig = (_ip_unpack(ip), _ip_unpack(mask), _ip_unpack(gw), _ip_unpack(dns))
+        self.ssid = raw[HEADER_SIZE + 1:ssid_end].decode("utf-8")
+        (self.air_ms, self.cycles, self.failed_cycles, self.dropped,
+         _count) = struct.unpack_from(BACKLOG_FMT, raw, ssid_end)
+        pos = ssid_end + BACKLOG_SIZE
+        self.readings = [struct.unpack_from(READING_FMT, raw, pos + i * READING_SIZE)
+                         for i in range(count)]
+        return True
+
+    def _load(self):
+        try:
+            raw = self._read_raw()
+            if not raw or not self._decode(raw):
+                debug("无有效热启动快照, 冷启动", module="WARM")
+                return
+            age = self._age(self.saved_s)
+            if age is None or age > self.max_age_s:
+                info("热启动快照已过期(age={}s), 冷启动", age, module="WARM")
+                self.flags = 0
+                return
+            self.warm = True
+            info("热启动: 快照 {}s 前保存, SSID={} 信道={} 标志=0x{:02x}",
+                 age, self.ssid, self.channel, self.flags, module="WARM")
+        except Exception as e:
+            warning("读取热启动快照失败: {}", e, module="WARM")
+            self.flags = 0
+
+    def save(self):
+        """写回快照, 同时刷新保存时间; 由周期维护定期调用以保持快照新鲜"""
+        if not self.enabled:
+            return False
+        try:
+            now = time.time()
+            self.saved_s = now
+            raw = self._encode()
+            key = raw[:4] + raw[8:-4]
+            if self._rtc is None and key == self._last_key and now - self._written_s < self.max_age_s // 2:
+                return False
+            self._write_raw(raw)
+            self._last_key = key
+            self._written_s = now
+            return True
+        except Exception as e:
+            warning("保存热启动快照失败: {}", e, module="WARM")
+            return False
+
+    def _age(self, at_s):
+        """距 at_s 的秒数; RTC 时间倒退(断电复位)时返回 None"""
+        age = time.time() - at_s
+        return age if age >= 0 else None
+
+    def _valid(self, flag, at_s=None, max_age_s=None):
+        if not (self.warm and self.flags & flag):
+            return False
+        if at_s is None:
+            return True
+        age = self._age(at_s)
+        return age is not None and age <= max_age_s
+
+    # ---- 查询: 仅热启动且字段有效时返回 ----
+    def wifi_hint(self):
+        """上次连接的 (ssid, bssid, channel), 无效时返回 None"""
+        if self._valid(F_WIFI):
+            return self.ssid, self.bssid, self.channel
+        return None
+
+    def ip_hint(self):
+        """仍在租期内的 IP 配置 (ip, mask, gw, dns), 无效时返回 None"""
+        if self._valid(F_IP, self.ip_at, self.lease_s):
+            return self.ifconfig
+        return None
+
+    def ntp_valid(self):
+        """上次 NTP 同步仍可信(RTC 保持走时)"""
+        return self._valid(F_NTP, self.ntp_at, self.ntp_max_age_s)
+
+    def discovery_valid(self, digest):
+        """Discovery 内容与上次发布一致(broker 上保留消息仍有效)"""
+        return self._valid(F_DISCOVERY) and self.discovery_hash == digest
+
+    # ---- 更新: 步骤成功后记录 ----
+    def remember_wifi(self, ssid, bssid, channel, ifconfig=None, renewed=True):
+        """记录连接成功的 AP; renewed 为 True 表示 IP 经 DHCP 新获取"""
+        raw = bytes(bssid or b"")[:6]
+        self.ssid = ssid or ""
+        self.bssid = raw + b"\x00" * (6 - len(raw))
+        self.channel = channel or 0
+        self.flags |= F_WIFI
+        if ifconfig:
+            self.ifconfig = tuple(ifconfig)
+            if renewed or not (self.flags & F_IP):
+                self.ip_at = time.time()
+            self.flags |= F_IP
+        self.save()
+
+    def forget_wifi(self):
+        """快速连接失败: 作废 AP 与 IP 字段, 回退到扫描 + DHCP"""
+        self.flags &= ~(F_WIFI | F_IP)
+        self.save()
+
+    def remember_ntp(self):
+        """NTP 同步成功: 墙钟被校正时先平移按旧时钟记录的 IP 获取时间, 再记录同步时间"""
+        self._rebase_clock()
+        self.ntp_at = time.time()
+        self.flags |= F_NTP
+        self.save()
+
+    def _rebase_clock(self):
+        """按墙钟相对 ticks_ms 的跳变量平移已记录的时间(保存时间由 save() 刷新)"""
+        now = time.time()
+        expected = self._ref_s + time.ticks_diff(time.ticks_ms(), self._ref_ms) // 1000
+        jump = now - expected
+        self._ref_s = now
+        self._ref_ms = time.ticks_ms()
+        if -CLOCK_JUMP_S <= jump <= CLOCK_JUMP_S:
+            return
+        if self.flags & F_IP:
+            self.ip_at = max(0, self.ip_at + jump)
+        debug("墙钟校正 {}s, 已平移快照时间", jump, module="WARM")
+
+    def remember_discovery(self, digest):
+        self.discovery_hash = digest & 0xFFFFFFFF
+        self.flags |= F_DISCOVERY
+        self.save()
+
+    def record_error_reset(self, error_count):
+        """FSM 因错误过多即将复位: 累计错误复位次数"""
+        self.error_resets = (self.error_resets + 1) & 0xFFFF
+        self.last_error_count = min(error_count, 255)
+        self.save()
+
+    # ---- 深睡眠占空比: 读数积压 ----
+    def push_reading(self, ts, temperature, humidity, limit=MAX_READINGS):
+        """追加一条读数(值为 None 表示读取失败), 超过 limit 时丢弃最旧的读数"""
+        t = _NO_TEMP if temperature is None else int(round(temperature * 100))
+        h = _NO_HUM if humidity is None else int(round(humidity * 100))
+        self.readings.append((ts or 0, t, h))
+        limit = min(limit, MAX_READINGS)
+        while len(self.readings) > limit:
+            self.readings.pop(0)
+            self.dropped = (self.dropped + 1) & 0xFFFF
+
+    def get_readings(self):
+        """积压读数 [(ts, 温度°C, 湿度%)], 从旧到新; ts 为 0 表示采样时时间未同步"""
+        return [(ts, None if t == _NO_TEMP else t / 100, None if h == _NO_HUM else h / 100)
+                for ts, t, h in self.readings]
+
+    def clear_readings(self):
+        self.readings = []
+
+    def record_cycle(self, air_ms, sent):
+        """记录一个占空比周期的空口时间与发送结果(由调用方随后 save())"""
+        self.air_ms = min(air_ms, 0xFFFFFFFF)
+        self.cycles = (self.cycles + 1) & 0xFFFF
+        if not sent:
+            self.failed_cycles = (self.failed_cycles + 1) & 0xFFFF
+
+    def get_stats(self):
+        return {
+            "warm": self.warm,
+            "boots": self.boot_count,
+            "error_resets": self.error_resets,
+            "last_error_count": self.last_error_count,
+            "flags": self.flags,
+            "store": "rtc" if self._rtc is not None else "flash",
+        }
+
+
+# 全局热启动快照实例
+_warm_boot = None
+
+
+def get_warm_boot(config=None):
+    """获取全局热启动快照实例(首次调用时读取快照, config 为 CONFIG["warm_boot"])"""
+    global _warm_boot
+    if _warm_boot is None:
+        _warm_boot = WarmBoot(config)
+    return _warm_boot
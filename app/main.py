@@ -3,7 +3,10 @@
 ESP32C3 IoT 设备主程序
 职责: 
 - 统一完成配置加载、日志初始化、看门狗初始化、事件总线、网络管理器与状态机的装配
-- 驱动主循环: 事件分发 → FSM 更新 → 网络循环 → 看门狗喂狗 → 周期性维护
+- 启动事件分发任务(由 publish 唤醒), 驱动无节拍主循环: 执行到期截止时间任务 → 空闲回收 → 休眠到下一截止时间
+- 各子系统声明自己的截止时间: FSM 超时/健康检查、看门狗喂狗、GC 最长间隔;
+- 周期维护拆分为协作式作业(gc.idle/sensor.sample/metrics.publish/warm.save), 周期与预算来自 CONFIG["jobs"], 错峰执行;
+  事件分发与网络任务由事件唤醒, 不占用主循环节拍; 条件满足时以 machine.lightsleep 休眠
 
 架构关系: 
 - EventBus 作为系统消息中枢, FSM/NetworkManager/其他模块通过事件解耦合
@@ -12,14 +15,20 @@ ESP32C3 IoT 设备主程序
 """
 
 import utime as time
-import gc
 import machine
 import uasyncio as asyncio
 from lib.logger import info, error, debug
 from config import get_config
 from lib.event_bus_lock import EventBus, EVENTS
+from lib.async_runtime import get_async_runtime
+from lib.gc_scheduler import get_gc_scheduler
+from lib.scheduler import get_scheduler
+from lib.loop_profiler import get_loop_profiler, P_ITER, P_GC
+from lib.warm_boot import get_warm_boot
 from utils import check_memory, get_temperature
 
+DEFAULT_JOB_INTERVAL_MS = 60000  # CONFIG["jobs"] 未配置某作业时的周期
+LIGHTSLEEP_MIN_MS = 100  # 短于该时长的休眠不值得进入 lightsleep
 
 
 
@@ -27,7 +36,14 @@ class MainController:
     """主控制器"""
     def __init__(self):
         self.config = get_config()
+        self.gc = get_gc_scheduler()
         self.event_bus = EventBus()
+        sys_cfg = self.config.get("system", {})
+        if sys_cfg.get("event_profiling", False):
+            self.event_bus.enable_profiling(sys_cfg.get("slow_callback_us"))
+        if sys_cfg.get("event_trace", False):
+            from lib.event_trace import EventTrace
+            self.event_bus.set_trace(EventTrace(sys_cfg.get("trace_entries", 256)))
         from net.network_manager import NetworkManager
         self.network_manager = NetworkManager(self.config, self.event_bus)
         
@@ -38,8 +54,28 @@ class MainController:
         except Exception:
             self.state_machine = None
         
-        # 系统状态
-        self.last_stats_time = 0
+        # 截止时间调度器: FSM 超时/周期动作与周期维护共用, 主循环休眠到最近截止时间
+        self.scheduler = get_scheduler()
+        self.max_sleep_ms = sys_cfg.get("loop_max_sleep_ms", 30000)
+        self.lightsleep = sys_cfg.get("lightsleep", False)
+        # 看门狗: 按超时的 1/4 周期登记喂狗任务, 主循环休眠总会在喂狗截止时间前醒来
+        daemon_cfg = self.config.get("daemon", {})
+        self.wdt_enabled = daemon_cfg.get("wdt_enabled", True)
+        self.wdt_timeout_ms = int(daemon_cfg.get("wdt_timeout", 60000))
+        # 新的回收请求提前结束主循环休眠
+        self.gc.set_wake(self.scheduler.wake)
+        
+        # 主循环剖析器: 每轮/各阶段耗时与休眠超时直方图, 开销很小可常态开启
+        self.profiler = None
+        if sys_cfg.get("loop_profiling", True):
+            self.profiler = get_loop_profiler()
+            self.scheduler.set_profiler(self.profiler)
+            self.event_bus.set_loop_profiler(self.profiler)
+        
+        # 最近一次传感器采样, 供指标上报使用
+        self._sample = {"mcu_temp_c": None, "temperature": None, "humidity": None}
+        # 子系统诊断: 每次 diag.publish 轮流发布其中一项, 避免单条大报文
+        self._diag_index = 0
         
         # 注册事件监听
         self._register_event_handlers()
@@ -62,8 +98,8 @@ class MainController:
     def _init_watchdog(self):
         """看门狗初始化(如存在)"""
         try:
-            if hasattr(machine, "WDT"):
-                self.wdt = machine.WDT(timeout=20000)
+            if self.wdt_enabled and hasattr(machine, "WDT"):
+                self.wdt = machine.WDT(timeout=self.wdt_timeout_ms)
             else:
                 self.wdt = None
         except Exception:
@@ -77,6 +113,30 @@ class MainController:
             debug("MQTT_STATE_CHANGE: {}", state, module="MAIN")
         self.event_bus.subscribe(EVENTS["WIFI_STATE_CHANGE"], on_wifi_change)
         self.event_bus.subscribe(EVENTS["MQTT_STATE_CHANGE"], on_mqtt_change)
+        self.event_bus.subscribe(EVENTS["BUTTON_PRESS"], self._on_button_press)
+
+    def _init_button(self):
+        """按键中断(如配置启用): 中断经 publish_from_isr 发布 button.press"""
+        btn_cfg = self.config.get("button", {})
+        if not btn_cfg.get("enabled", False):
+            return
+        from hw.button import attach, DEFAULT_PIN, DEFAULT_DEBOUNCE_MS
+        attach(self.event_bus, btn_cfg.get("pin", DEFAULT_PIN),
+               btn_cfg.get("debounce_ms", DEFAULT_DEBOUNCE_MS))
+
+    def _on_button_press(self, event_name, pin=None, **kwargs):
+        """按键按下: 记录日志并上报 device/<id>/state/button (不保留)"""
+        info("按键按下: GPIO{}", pin, module="MAIN")
+        try:
+            if self.network_manager:
+                self.network_manager.mqtt_publish(
+                    self.network_manager.get_state_topic("button"),
+                    {"pin": pin, "uptime_ms": time.ticks_ms()},
+                    retain=False,
+                    qos=0,
+                )
+        except Exception:
+            pass
 
     async def run(self):
         """运行主循环"""
@@ -84,113 +144,241 @@ class MainController:
             # 初始化
             self._init_led()
             self._init_watchdog()
+            self._init_button()
+
+            # 事件分发任务: 由 publish 唤醒, 不再由主循环轮询
+            get_async_runtime().create_task(self.event_bus.run_dispatcher(), "event_dispatch")
+
+            # 周期作业: 启动后各自在抖动范围内首次执行, 之后按配置周期错峰执行
+            self._register_jobs()
+            # 看门狗喂狗: 作为截止时间任务, 不再每个循环执行
+            if getattr(self, "wdt", None):
+                self.scheduler.schedule("wdt.feed", 0, self._feed_watchdog,
+                                        self.wdt_timeout_ms // 4)
             
-            # 主循环
+            # 无节拍主循环: 状态机与网络由事件驱动, 这里只处理截止时间
+            profiler = self.profiler
             while True:
-                current_time = time.ticks_ms()
-                
-                # 事件分发与状态机更新
+                t_iter = time.ticks_us()
+                # 到期任务: FSM 超时/健康检查、喂狗; 以及至多一个到期作业
                 try:
-                    if self.event_bus:
-                        self.event_bus.process_events()
-                    if self.state_machine:
-                        self.state_machine.update()
+                    self.scheduler.run_due()
                 except Exception:
                     pass
                 
-                # 看门狗喂狗
-                try:
-                    if getattr(self, "wdt", None):
-                        self.wdt.feed()
-                except Exception:
-                    pass
+                # 空闲间隙: 事件已排空时执行待处理的垃圾回收
+                if self.event_bus.event_queue.is_empty():
+                    t_gc = time.ticks_us()
+                    if self.gc.run_idle() and profiler is not None:
+                        profiler.record(P_GC, time.ticks_diff(time.ticks_us(), t_gc))
                 
-                # 定期维护
-                self._periodic_maintenance(current_time)
+                if profiler is not None:
+                    profiler.record(P_ITER, time.ticks_diff(time.ticks_us(), t_iter))
                 
-                await asyncio.sleep_ms(50)
+                # 休眠到最近截止时间(含 GC 最长间隔), 期间新的截止时间或回收请求会提前唤醒
+                cap = min(self.max_sleep_ms, self.gc.next_due_ms())
+                delay = self.scheduler.next_delay_ms(cap)
+                light_ms = self._lightsleep_ms(delay)
+                if light_ms:
+                    self._lightsleep(light_ms)
+                    await asyncio.sleep_ms(0)
+                else:
+                    await self.scheduler.sleep(cap)
         except Exception as e:
             self._emit_system_error("main.run", e)
 
-    def _periodic_maintenance(self, current_time):
-        """定期维护任务"""
-        # 每60秒执行一次
-        if time.ticks_diff(current_time, self.last_stats_time) >= 60000 or self.last_stats_time == 0:
-            self.last_stats_time = current_time
-            
-            # 垃圾回收
-            gc.collect()
-            
-            # 输出统计信息(移除性能显示)
-            mem = check_memory()
-            free_kb = mem.get("free_kb", gc.mem_free() // 1024)
-            percent_used = mem.get("percent", 0)
-            
-            # 读取MCU内部温度
-            temp_mcu = get_temperature()
-            
-            # 读取环境温湿度
-            from hw.sht40 import read
-            env_data = read()
-            env_temp = env_data["temperature"] if isinstance(env_data, dict) else None
-            env_hum = env_data["humidity"] if isinstance(env_data, dict) else None
-            
-            state = self.state_machine.get_current_state() if self.state_machine else "INIT"
-            net_status = self.network_manager.get_status()
-            
-            info("系统状态 - 状态:{}, 内存:{}KB({:.0f}%), MCU温度:{}, 环境:{}°C/{}%, WiFi:{}, MQTT:{}", 
-                 state, free_kb, percent_used, temp_mcu,
-                 env_temp if env_temp is not None else "N/A",
-                 env_hum if env_hum is not None else "N/A",
-                 net_status['wifi'], net_status['mqtt'], 
-                 module="MAIN")
-            
-            # 上报周期性指标到 MQTT
-            try:
-                metrics = {
-                    "uptime_ms": current_time,
-                    "unix_s": self.network_manager.get_epoch_unix_s() if self.network_manager else None,
-                    "state": state,
-                    "mem": {
-                        "free_kb": free_kb,
-                        "percent": percent_used,
-                    },
-                    "mcu_temp_c": temp_mcu,
-                    "env": {
-                        "temperature": env_temp,
-                        "humidity": env_hum,
-                    },
-                    "net": net_status,
-                }
-                if self.network_manager:
-                    # 1) 聚合指标: device/<id>/state/metrics (不保留)
+    def _feed_watchdog(self):
+        try:
+            self.wdt.feed()
+        except Exception:
+            pass
+
+    def _lightsleep_ms(self, delay):
+        """可以 lightsleep 的时长, 0 表示只能协程休眠
+
+        lightsleep 会暂停整个事件循环与硬件定时器, 仅在以下条件全部满足时使用:
+        配置开启、无待分发事件、无 GC 守卫、网络离线且处于共享退避(idle_ms);
+        LED 动画在休眠期间暂停(见 _lightsleep)
+        """
+        if not self.lightsleep or delay < LIGHTSLEEP_MIN_MS:
+            return 0
+        if not self.event_bus.event_queue.is_empty() or self.gc.is_busy():
+            return 0
+        idle = self.network_manager.idle_ms() if self.network_manager else delay
+        if idle < LIGHTSLEEP_MIN_MS:
+            return 0
+        return delay if delay < idle else idle
+
+    def _lightsleep(self, ms):
+        """以 machine.lightsleep 休眠; 硬件定时器停摆期间 LED 动画暂停并熄灭, 醒来后恢复"""
+        try:
+            from hw.led import pause as led_pause, resume as led_resume
+        except ImportError:
+            led_pause = led_resume = None
+        if led_pause is not None:
+            led_pause()
+        t0 = time.ticks_ms()
+        try:
+            machine.lightsleep(ms)
+        finally:
+            self.scheduler.note_sleep(time.ticks_diff(time.ticks_ms(), t0), light=True)
+            if led_resume is not None:
+                led_resume()
+
+    def _register_jobs(self):
+        """登记周期作业, 周期/抖动/优先级/预算取自 CONFIG["jobs"]"""
+        jobs_cfg = self.config.get("jobs", {})
+        jobs = (
+            ("gc.idle", self._job_gc_idle),
+            ("sensor.sample", self._job_sensor_sample),
+            ("metrics.publish", self._job_metrics_publish),
+            ("diag.publish", self._job_diag_publish),
+            ("warm.save", get_warm_boot().save),
+        )
+        for name, callback in jobs:
+            cfg = jobs_cfg.get(name, {})
+            self.scheduler.add_job(
+                name, callback,
+                cfg.get("interval_ms", DEFAULT_JOB_INTERVAL_MS),
+                jitter_ms=cfg.get("jitter_ms", 0),
+                priority=cfg.get("priority", 0),
+                budget_ms=cfg.get("budget_ms", 0),
+            )
+
+    def _job_gc_idle(self):
+        """空闲回收: 事件队列为空时立即回收, 否则留给主循环的下一个空闲间隙"""
+        self.gc.request("idle")
+        if self.event_bus.event_queue.is_empty():
+            self.gc.run_idle()
+
+    def _job_sensor_sample(self):
+        """采样 MCU 温度与环境温湿度, 发布温湿度保留主题"""
+        from hw.sht40 import read
+        env_data = read()
+        env_temp = env_data["temperature"] if isinstance(env_data, dict) else None
+        env_hum = env_data["humidity"] if isinstance(env_data, dict) else None
+        self._sample["mcu_temp_c"] = get_temperature()
+        self._sample["temperature"] = env_temp
+        self._sample["humidity"] = env_hum
+
+        # 分离的温湿度主题, 便于 HA 直接订阅
+        try:
+            if self.network_manager:
+                if env_temp is not None:
+                    self.network_manager.mqtt_publish(
+                        self.network_manager.get_state_topic("temperature"),
+                        env_temp,
+                        retain=True,
+                        qos=0,
+                    )
+                if env_hum is not None:
+                    self.network_manager.mqtt_publish(
+                        self.network_manager.get_state_topic("humidity"),
+                        env_hum,
+                        retain=True,
+                        qos=0,
+                    )
+        except Exception:
+            # 上报失败不影响主流程
+            pass
+
+    def _job_metrics_publish(self):
+        """输出系统状态并上报聚合指标"""
+        mem = check_memory()
+        free_kb = mem.get("free_kb", 0)
+        percent_used = mem.get("percent", 0)
+        sample = self._sample
+        env_temp = sample["temperature"]
+        env_hum = sample["humidity"]
+        
+        state = self.state_machine.get_current_state() if self.state_machine else "INIT"
+        net_status = self.network_manager.get_status()
+        
+        info("系统状态 - 状态:{}, 内存:{}KB({:.0f}%), MCU温度:{}, 环境:{}°C/{}%, WiFi:{}, MQTT:{}", 
+             state, free_kb, percent_used, sample["mcu_temp_c"],
+             env_temp if env_temp is not None else "N/A",
+             env_hum if env_hum is not None else "N/A",
+             net_status['wifi'], net_status['mqtt'], 
+             module="MAIN")
+        
+        # 上报周期性指标到 MQTT
+        try:
+            metrics = {
+                "uptime_ms": time.ticks_ms(),
+                "unix_s": self.network_manager.get_epoch_unix_s() if self.network_manager else None,
+                "state": state,
+                "mem": {
+                    "free_kb": free_kb,
+                    "percent": percent_used,
+                },
+                "mcu_temp_c": sample["mcu_temp_c"],
+                "env": {
+                    "temperature": env_temp,
+                    "humidity": env_hum,
+                },
+                "net": net_status,
+            }
+            if self.network_manager:
+                # 1) 聚合指标: device/<id>/state/metrics (不保留)
+                self.network_manager.mqtt_publish(
+                    self.network_manager.get_state_topic("metrics"),
+                    metrics,
+                    retain=False,
+                    qos=0,
+                )
+                # 2) 事件回调耗时报告(仅在启用剖析时)
+                profile = self.event_bus.get_profile_report()
+                if profile is not None:
                     self.network_manager.mqtt_publish(
-                        self.network_manager.get_state_topic("metrics"),
-                        metrics,
+                        self.network_manager.get_state_topic("bus_profile"),
+                        profile,
                         retain=False,
                         qos=0,
                     )
-                    # 2) 分离的温湿度主题, 便于 HA 直接订阅
-                    if env_temp is not None:
-                        self.network_manager.mqtt_publish(
-                            self.network_manager.get_state_topic("temperature"),
-                            env_temp,
-                            retain=True,
-                            qos=0,
-                        )
-                    if env_hum is not None:
-                        self.network_manager.mqtt_publish(
-                            self.network_manager.get_state_topic("humidity"),
-                            env_hum,
-                            retain=True,
-                            qos=0,
-                        )
-            except Exception:
-                # 指标上报失败不影响主流程
-                pass
+        except Exception:
+            # 指标上报失败不影响主流程
+            pass
+
+    def _diag_sources(self):
+        """子系统诊断 (名称, 取值函数), 名称即子主题 state/diag/<名称>"""
+        sources = [
+            ("link", self.network_manager.get_link_stats),
+            ("warm", get_warm_boot().get_stats),
+            ("sched", self.scheduler.get_stats),
+            ("gc", self.gc.get_stats),
+        ]
+        if self.state_machine:
+            sources.append(("fsm", self.state_machine.get_metrics))
+        if self.profiler:
+            sources.append(("loop", self.profiler.dump))
+        return sources
+
+    def _job_diag_publish(self):
+        """轮流发布一项子系统诊断到 device/<id>/state/diag/<名称>, 每次只构造一个小载荷"""
+        try:
+            if not self.network_manager:
+                return
+            sources = self._diag_sources()
+            name, getter = sources[self._diag_index % len(sources)]
+            self._diag_index = (self._diag_index + 1) % len(sources)
+            self.network_manager.mqtt_publish(
+                self.network_manager.get_state_topic("diag/" + name),
+                getter(),
+                retain=False,
+                qos=0,
+            )
+        except Exception:
+            # 诊断上报失败不影响主流程
+            pass
 
 def main():
     """主函数"""
+    config = get_config()
+    if config.get("duty_cycle", {}).get("enabled", False):
+        # 电池节点: 每次唤醒完成一个采样上报周期后深睡眠, 不运行主循环
+        from duty_cycle import DutyCycle
+        asyncio.run(DutyCycle(config).run())
+        return
     controller = MainController()
     asyncio.run(controller.run())
 
@@ -8,6 +8,24 @@
 事件:
 - WIFI_STATE_CHANGE: {"connected" | "disconnected"}
 - MQTT_STATE_CHANGE: {"connected" | "disconnected"}
+- 两者均声明为最新值合并事件, 未分发的旧状态会被新状态覆盖
+- MQTT_MESSAGE: (topic, message), 订阅消息经总线配额准入; 被拒绝的消息计数并限频告警, 见 get_link_stats()
+- MQTT "connected" 仅在链路(WiFi+MQTT)持续连通 link.stable_ms 后发布, online/HA Discovery 随之发布
+
+链路迟滞:
+- 连通后未满 link.flap_window_ms 即断开记为一次抖动(flap)
+- 连续抖动达到 link.flap_threshold 后进入 WiFi+MQTT 共享退避, 每多一次抖动翻倍, 上限 link.flap_backoff_max_ms
+- 抖动次数与近一小时抖动率见 get_link_stats()
+
+热启动(lib.warm_boot):
+- 复位后快照有效时: 直连上次的 AP(BSSID/信道, 不扫描)、租期内复用 IP 配置、跳过 NTP、
+  Discovery 内容未变化时不重发, 首次链路确认使用较短的 warm_boot.stable_ms
+- 快速连接失败即作废快照中的 AP/IP 字段, 回退到扫描 + DHCP
+
+调度:
+- 已连通时 WiFi/MQTT 连接任务挂起等待链路变化事件, 不再每 2 秒轮询
+- 状态检查仅在 WiFi 连通时按 link.check_ms 运行; 离线时同样等待链路变化
+- 共享退避期间各任务休眠到退避结束, idle_ms() 供主循环判断可否 lightsleep
 
 约束:
 - 支持指数退避(由 mqtt.base_delay_ms/max_delay_ms/max_retries 控制)
@@ -18,23 +36,41 @@
 
 import utime as time
 import uasyncio as asyncio
+from array import array
 from lib.logger import info, warning, error, debug
-from lib.event_bus_lock import EVENTS
+from lib.event_bus_lock import EVENTS, REJECTED
 from lib.async_runtime import get_async_runtime
+from lib.gc_scheduler import get_gc_scheduler
+from lib.warm_boot import get_warm_boot, checksum
 from utils import json_dumps, get_epoch_unix_s as util_get_epoch_unix_s
 
+FLAP_HISTORY = 16  # 保留的抖动时间戳数量, 用于计算近一小时抖动率
+FLAP_RATE_WINDOW_MS = 3600000
+LINK_IDLE_WAIT_MS = 60000  # 等待链路变化的最长时间(兜底)
+RETRY_POLL_MS = 2000  # 未连通时连接任务的重试检查间隔
+RX_WARN_INTERVAL_MS = 10000  # 订阅消息被配额拒绝时告警的最小间隔
+
 class NetworkManager:
     """网络管理器: 负责 WiFi -> NTP -> MQTT 连接流程与状态维护"""
     
-    def __init__(self, config, event_bus):
-        """初始化"""
+    def __init__(self, config, event_bus, autostart=True):
+        """初始化
+
+        Args:
+            autostart: 是否启动后台连接/状态检查任务; 深睡眠占空比模式传 False, 改用 connect_once()
+        """
         self.config = config or {}
         self.event_bus = event_bus
+
+        # 状态事件只关心最新值: 重连风暴中未分发的旧状态被原地覆盖
+        self.event_bus.set_coalesce(EVENTS["WIFI_STATE_CHANGE"])
+        self.event_bus.set_coalesce(EVENTS["MQTT_STATE_CHANGE"])
         
         # 子配置
         self.wifi_config = (self.config or {}).get("wifi", {})
         self.ntp_config = (self.config or {}).get("ntp", {})
         self.mqtt_config = (self.config or {}).get("mqtt", {})
+        self.link_config = (self.config or {}).get("link", {})
         
         # 组件
         self.wifi_manager = None
@@ -62,6 +98,35 @@ class NetworkManager:
         self.wifi_last_attempt = 0
         self.wifi_max_retries = int(self.wifi_config.get("max_retries", -1))
         self.wifi_retry_attempts = 0
+
+        # 链路迟滞: 稳定窗口与抖动退避
+        self.link_stable_ms = int(self.link_config.get("stable_ms", 5000))
+        self.flap_window_ms = int(self.link_config.get("flap_window_ms", 60000))
+        self.flap_threshold = int(self.link_config.get("flap_threshold", 3))
+        self.flap_backoff_ms = int(self.link_config.get("flap_backoff_ms", 30000))
+        self.flap_backoff_max_ms = int(self.link_config.get("flap_backoff_max_ms", 600000))
+        self._link_up_ms = None  # 链路连通时刻, None 表示未连通
+        self._link_stable = False
+        self._flap_streak = 0
+        self._flap_total = 0
+        self._flap_at = array("i", [0] * FLAP_HISTORY)
+        self._flap_next = 0
+        self._hold_until = None  # 共享退避截止时刻, None 表示无退避
+        self.link_check_ms = int(self.link_config.get("check_ms", 1000))
+        self._link_event = asyncio.Event()  # 连通/断开时置位, 唤醒等待中的连接任务
+
+        # 订阅消息接收统计: 总数 / 被总线配额拒绝数, 拒绝告警限频
+        self._rx_count = 0
+        self._rx_rejected = 0
+        self._rx_warn_at = None
+
+        # 热启动快照: 复位后跳过仍然有效的连接步骤
+        warm_config = (self.config or {}).get("warm_boot", {})
+        self.warm = get_warm_boot(warm_config)
+        self._warm_wifi_pending = self.warm.wifi_hint() is not None
+        self._warm_link = self.warm.warm
+        self._warm_stable_ms = int(warm_config.get("stable_ms", 1000))
+        self._stable_window_ms = self.link_stable_ms
         
         # 任务
         self._wifi_task = None
@@ -72,7 +137,8 @@ class NetworkManager:
         self._lwt_configured = False
         
         self._init_components()
-        self._register_async_tasks()
+        if autostart:
+            self._register_async_tasks()
 
     def _register_async_tasks(self):
         """注册异步任务"""
@@ -95,6 +161,7 @@ class NetworkManager:
             self.wifi_manager = WifiManager(self.wifi_config)
             self.ntp_manager = NtpManager(self.ntp_config)
             self.mqtt_controller = MqttController(self.mqtt_config)
+            self.mqtt_controller.set_callback(self._on_mqtt_message)
             
             debug("网络组件初始化完成", module="NET")
         except Exception as e:
@@ -132,7 +199,7 @@ class NetworkManager:
         return 0.8 + 0.4 * rnd
 
     def _calc_backoff_delay(self, base_delay, attempts, max_delay):
-        """计算指数退避延迟并叠加抖动"""
+        """计算指数退避延迟并叠加抖动, 结果不超过 max_delay(抖动后再钳制)"""
         try:
             if attempts > 0:
                 calc_delay = base_delay << (attempts - 1)
@@ -140,17 +207,162 @@ class NetworkManager:
             else:
                 delay = base_delay
             jitter_factor = self._get_jitter_factor()
-            return int(delay * jitter_factor)
+            delay = int(delay * jitter_factor)
+            return delay if delay < max_delay else int(max_delay)
         except Exception:
             # 异常降级: 返回基础延迟
             return int(base_delay)
 
+    # 链路迟滞: 稳定窗口、抖动计数与共享退避
+    def _link_up(self):
+        """WiFi+MQTT 刚连通: 开始稳定窗口计时, 窗口为 0 时立即确认"""
+        self._link_up_ms = time.ticks_ms()
+        self._link_stable = False
+        # 热启动后的首次连通: 上次运行已验证过该链路, 使用较短的稳定窗口
+        window = self.link_stable_ms
+        if self._warm_link and self._warm_stable_ms < window:
+            window = self._warm_stable_ms
+        self._stable_window_ms = window
+        if window <= 0:
+            self._confirm_link()
+        else:
+            debug("链路已连通, 等待稳定 {} ms", window, module="NET")
+
+    def _check_link_stability(self, now):
+        """连通已持续稳定窗口时确认链路"""
+        if self._link_stable or self._link_up_ms is None:
+            return
+        if not (self.wifi_connected and self.mqtt_connected):
+            return
+        if time.ticks_diff(now, self._link_up_ms) >= self._stable_window_ms:
+            self._confirm_link()
+
+    def _confirm_link(self):
+        """链路稳定: 发布连接事件, 并发布 online 与 HA Discovery"""
+        self._link_stable = True
+        self._warm_link = False
+        info("链路稳定, 确认已连接", module="NET")
+        self.event_bus.publish(EVENTS["MQTT_STATE_CHANGE"], state="connected")
+        try:
+            # HA 可用性: 连接成功后发布 retained 可用性为 online
+            self.mqtt_publish(self.get_availability_topic(), "online", retain=True, qos=0)
+            # 发布 Home Assistant Discovery 配置
+            self.publish_ha_discovery()
+            # 可选: 设备 announce
+            self.publish_announce()
+        except Exception:
+            pass
+
+    def _link_down(self, flap=True):
+        """链路断开: 连通未满抖动窗口记为抖动, 连续抖动达到阈值时进入共享退避"""
+        if self._link_up_ms is None:
+            return
+        now = time.ticks_ms()
+        up_for = time.ticks_diff(now, self._link_up_ms)
+        self._link_up_ms = None
+        self._link_stable = False
+        self._warm_link = False
+        if not flap:
+            return
+        if up_for >= self.flap_window_ms:
+            self._flap_streak = 0
+            return
+
+        self._flap_streak += 1
+        self._flap_total += 1
+        self._flap_at[self._flap_next] = now
+        self._flap_next = (self._flap_next + 1) % FLAP_HISTORY
+        if self._flap_streak >= self.flap_threshold:
+            hold = self._calc_backoff_delay(
+                self.flap_backoff_ms, self._flap_streak - self.flap_threshold + 1, self.flap_backoff_max_ms)
+            self._hold_until = time.ticks_add(now, hold)
+            warning("链路抖动 {} 次(连通 {} ms 即断开), WiFi/MQTT 暂停重连 {} ms",
+                    self._flap_streak, up_for, hold, module="NET")
+
+    def _hold_remaining_ms(self):
+        """共享退避剩余时间, 0 表示可以重连"""
+        if self._hold_until is None:
+            return 0
+        remaining = time.ticks_diff(self._hold_until, time.ticks_ms())
+        if remaining <= 0:
+            self._hold_until = None
+            return 0
+        return remaining
+
+    def _flaps_last_hour(self):
+        now = time.ticks_ms()
+        count = 0
+        for i in range(min(self._flap_total, FLAP_HISTORY)):
+            if time.ticks_diff(now, self._flap_at[i]) < FLAP_RATE_WINDOW_MS:
+                count += 1
+        return count
+
+    def get_link_stats(self):
+        """链路统计: 是否稳定、抖动总数/连续数/近一小时次数、共享退避剩余 ms、订阅消息接收/拒绝数"""
+        return {
+            "stable": self._link_stable,
+            "flaps": self._flap_total,
+            "flap_streak": self._flap_streak,
+            "flaps_1h": self._flaps_last_hour(),
+            "hold_ms": self._hold_remaining_ms(),
+            "rx": self._rx_count,
+            "rx_rejected": self._rx_rejected,
+        }
+
+    def _on_mqtt_message(self, topic, msg):
+        """订阅消息回调: 发布 MQTT_MESSAGE 事件, 被配额拒绝时计数并限频告警
+
+        在 process_once -> check_msg 中同步调用, 不能等待; 超额消息直接丢弃,
+        由 rx_rejected 反映丢弃量。
+        """
+        self._rx_count += 1
+        try:
+            if isinstance(topic, (bytes, bytearray)):
+                topic = topic.decode()
+            result = self.event_bus.publish(EVENTS["MQTT_MESSAGE"], topic, msg)
+        except Exception as e:
+            error("MQTT消息入队异常: {}", e, module="NET")
+            return
+        if result != REJECTED:
+            return
+        self._rx_rejected += 1
+        now = time.ticks_ms()
+        if self._rx_warn_at is None or time.ticks_diff(now, self._rx_warn_at) >= RX_WARN_INTERVAL_MS:
+            self._rx_warn_at = now
+            warning("MQTT消息超出总线配额被丢弃: {} (累计 {})", topic, self._rx_rejected, module="NET")
+
+    def _signal_link_change(self):
+        """链路连通/断开: 唤醒等待中的连接与状态检查任务"""
+        self._link_event.set()
+        self._link_event.clear()
+
+    async def _wait_link_change(self, timeout_ms):
+        """等待链路变化或超时"""
+        try:
+            await asyncio.wait_for_ms(self._link_event.wait(), timeout_ms)
+        except asyncio.TimeoutError:
+            pass
+
+    def _retry_wait_ms(self):
+        """未连通时下次重试前的等待: 共享退避期间等到退避结束"""
+        hold = self._hold_remaining_ms()
+        return hold if hold > RETRY_POLL_MS else RETRY_POLL_MS
+
+    def idle_ms(self):
+        """网络任务在多长时间内不需要 CPU: 仅在离线且处于共享退避时非零(主循环据此决定 lightsleep)"""
+        if self.wifi_connected or self._mqtt_connecting:
+            return 0
+        return self._hold_remaining_ms()
+
     async def _wifi_connection_loop(self):
         """WiFi 连接循环"""
         while True:
             try:
                 await self._async_connect_wifi()
-                await asyncio.sleep_ms(2000)
+                if self.wifi_connected:
+                    await self._wait_link_change(LINK_IDLE_WAIT_MS)
+                else:
+                    await asyncio.sleep_ms(self._retry_wait_ms())
             except asyncio.CancelledError:
                 debug("WiFi连接任务取消", module="NET")
                 break
@@ -163,7 +375,11 @@ class NetworkManager:
         while True:
             try:
                 await self._async_connect_mqtt()
-                await asyncio.sleep_ms(2000)
+                if self.mqtt_connected or not self.wifi_connected:
+                    # 已连通, 或等待 WiFi 连通
+                    await self._wait_link_change(LINK_IDLE_WAIT_MS)
+                else:
+                    await asyncio.sleep_ms(self._retry_wait_ms())
             except asyncio.CancelledError:
                 debug("MQTT连接任务取消", module="NET")
                 break
@@ -176,7 +392,10 @@ class NetworkManager:
         while True:
             try:
                 await self._async_check_status()
-                await asyncio.sleep_ms(500)
+                if self.wifi_connected:
+                    await asyncio.sleep_ms(self.link_check_ms)
+                else:
+                    await self._wait_link_change(LINK_IDLE_WAIT_MS)
             except asyncio.CancelledError:
                 debug("状态检查任务取消", module="NET")
                 break
@@ -191,6 +410,10 @@ class NetworkManager:
                 return True
         except Exception:
             pass
+
+        # 链路抖动共享退避
+        if self._hold_remaining_ms() > 0:
+            return False
         
         now = time.ticks_ms()
         
@@ -212,6 +435,12 @@ class NetworkManager:
                 else:
                     self._wifi_mark_failure()
                     return False
+
+            # 热启动: 先直连快照中的 AP, 跳过扫描(只尝试一次)
+            if self._warm_wifi_pending:
+                self._warm_wifi_pending = False
+                if await self._async_warm_connect_wifi(networks):
+                    return True
             
             available_networks = await self._async_scan_and_match_networks(networks)
             if not available_networks:
@@ -222,11 +451,8 @@ class NetworkManager:
                 ssid = network.get("ssid")
                 password = network.get("password", "")
                 if await self._async_attempt_wifi_connection(ssid, password):
-                    self.wifi_connected = True
-                    self.wifi_last_attempt = 0
-                    self.wifi_retry_attempts = 0
                     info("WiFi连接成功: {}", ssid, module="NET")
-                    self.event_bus.publish(EVENTS["WIFI_STATE_CHANGE"], state="connected")
+                    self._on_wifi_connected(ssid, network.get("bssid"), network.get("channel"), True)
                     return True
             
             self._wifi_mark_failure()
@@ -235,6 +461,42 @@ class NetworkManager:
             self._wifi_mark_failure()
             error("异步WiFi连接异常: {}", e, module="NET")
             return False
+
+    async def _async_warm_connect_wifi(self, networks):
+        """按热启动快照直连上次的 AP(BSSID/信道), 租期内复用 IP 配置; 失败时作废快照 AP/IP 字段"""
+        ssid, bssid, channel = self.warm.wifi_hint()
+        password = None
+        for net in networks:
+            if net.get("ssid") == ssid:
+                password = net.get("password", "")
+                break
+        if password is None:
+            # 快照中的网络已不在配置里
+            self.warm.forget_wifi()
+            return False
+        ifconfig = self.warm.ip_hint()
+        start_ms = time.ticks_ms()
+        if await self._async_attempt_wifi_connection(ssid, password, bssid, channel, ifconfig):
+            info("WiFi热启动直连成功: {} 信道 {}, 耗时 {} ms, {}", ssid, channel,
+                 time.ticks_diff(time.ticks_ms(), start_ms),
+                 "复用 IP" if ifconfig else "DHCP", module="NET")
+            self._on_wifi_connected(ssid, bssid, channel, ifconfig is None)
+            return True
+        warning("WiFi热启动直连失败, 回退到扫描", module="NET")
+        self.warm.forget_wifi()
+        return False
+
+    def _on_wifi_connected(self, ssid, bssid, channel, renewed):
+        """WiFi 连接成功: 重置退避, 记录到热启动快照并发布事件"""
+        self.wifi_connected = True
+        self.wifi_last_attempt = 0
+        self.wifi_retry_attempts = 0
+        try:
+            self.warm.remember_wifi(ssid, bssid, channel, self.wifi_manager.get_ifconfig(), renewed)
+        except Exception:
+            pass
+        self._signal_link_change()
+        self.event_bus.publish(EVENTS["WIFI_STATE_CHANGE"], state="connected")
             
     async def _async_scan_and_match_networks(self, configured_networks):
         """扫描并匹配配置的网络"""
@@ -254,7 +516,8 @@ class NetworkManager:
                             "ssid": config_ssid,
                             "password": config_net.get("password", ""),
                             "rssi": scanned_net.get("rssi", -100),
-                            "bssid": scanned_net.get("bssid", "")
+                            "bssid": scanned_net.get("bssid", ""),
+                            "channel": scanned_net.get("channel", 0),
                         })
                         break
             matched_networks.sort(key=lambda x: x["rssi"], reverse=True)
@@ -263,10 +526,10 @@ class NetworkManager:
             error("异步扫描和匹配网络失败: {}", e, module="NET")
             return []
     
-    async def _async_attempt_wifi_connection(self, ssid, password):
-        """尝试连接单个 WiFi"""
+    async def _async_attempt_wifi_connection(self, ssid, password, bssid=None, channel=None, ifconfig=None):
+        """尝试连接单个 WiFi(bssid/channel/ifconfig 用于热启动直连)"""
         try:
-            started = self.wifi_manager.connect(ssid, password)
+            started = self.wifi_manager.connect(ssid, password, bssid, channel, ifconfig)
             if not started:
                 return False
             timeout_ms = int(self.wifi_config.get("connect_timeout_ms", 10000))
@@ -290,6 +553,8 @@ class NetworkManager:
                 return True
             if self._mqtt_connecting:
                 return False
+            if self._hold_remaining_ms() > 0:
+                return False
 
             now = time.ticks_ms()
             # 退避 + 抖动
@@ -321,16 +586,9 @@ class NetworkManager:
                     self.mqtt_connected = True
                     self.mqtt_retry_attempts = 0
                     info("MQTT连接成功", module="NET")
-                    self.event_bus.publish(EVENTS["MQTT_STATE_CHANGE"], state="connected")
-                    try:
-                        # HA 可用性: 连接成功后发布 retained 可用性为 online
-                        self.mqtt_publish(self.get_availability_topic(), "online", retain=True, qos=0)
-                        # 发布 Home Assistant Discovery 配置
-                        self.publish_ha_discovery()
-                        # 可选: 设备 announce
-                        self.publish_announce()
-                    except Exception:
-                        pass
+                    # 连接事件与 online/Discovery 在链路稳定后发布
+                    self._link_up()
+                    self._signal_link_change()
                     return True
                 else:
                     self.mqtt_retry_attempts = self._inc_attempts(self.mqtt_retry_attempts, self.mqtt_max_retries)
@@ -347,9 +605,15 @@ class NetworkManager:
         try:
             if self.ntp_synced:
                 return True
+            # 热启动: RTC 在复位后保持走时, 上次同步仍可信时跳过
+            if self.warm.ntp_valid():
+                self.ntp_synced = True
+                info("热启动: 沿用上次 NTP 同步, 跳过", module="NET")
+                return True
             success = self.ntp_manager.sync_time()
             if success:
                 self.ntp_synced = True
+                self.warm.remember_ntp()
                 info("NTP时间同步成功", module="NET")
                 return True
             else:
@@ -381,27 +645,24 @@ class NetworkManager:
                         except Exception:
                             pass
                         self.mqtt_connected = False
+                        self._link_down()
                         self.event_bus.publish(EVENTS["MQTT_STATE_CHANGE"], state="disconnected")
+                    self._signal_link_change()
                     self.event_bus.publish(EVENTS["WIFI_STATE_CHANGE"], state="disconnected")
             if self.mqtt_controller:
                 mqtt_is_connected = self.mqtt_controller.is_connected()
                 if self.mqtt_connected and not mqtt_is_connected:
                     warning("MQTT连接丢失", module="NET")
                     self.mqtt_connected = False
+                    self._link_down()
+                    self._signal_link_change()
                     self.event_bus.publish(EVENTS["MQTT_STATE_CHANGE"], state="disconnected")
                 elif not self.mqtt_connected and mqtt_is_connected:
-                    # 处理控制器已连接但本地标志为 False 的情况: 发布事件并发送 online
+                    # 处理控制器已连接但本地标志为 False 的情况: 按新连通处理, 稳定后发布事件并发送 online
                     self.mqtt_connected = True
-                    self.event_bus.publish(EVENTS["MQTT_STATE_CHANGE"], state="connected")
-                    try:
-                        # HA 可用性: 连接成功后发布 retained 可用性为 online
-                        self.mqtt_publish(self.get_availability_topic(), "online", retain=True, qos=0)
-                        # 发布 Home Assistant Discovery 配置
-                        self.publish_ha_discovery()
-                        # 可选: 设备 announce
-                        self.publish_announce()
-                    except Exception:
-                        pass
+                    self._link_up()
+                    self._signal_link_change()
+                self._check_link_stability(time.ticks_ms())
                 if self.mqtt_connected:
                     try:
                         await self.mqtt_controller.process_once()
@@ -410,6 +671,15 @@ class NetworkManager:
         except Exception as e:
             error("异步状态检查异常: {}", e, module="NET")
 
+    async def connect_once(self):
+        """单次完成 WiFi -> NTP -> MQTT 连接, 不启动后台任务(深睡眠占空比模式)
+
+        热启动快照有效时直连上次的 AP 并复用 IP/NTP, 失败回退扫描; 不等待链路稳定窗口
+        """
+        if not await self._async_connect_wifi():
+            return False
+        return await self._async_connect_mqtt()
+
     def connect(self):
         """触发网络连接流程"""
         try:
@@ -419,31 +689,39 @@ class NetworkManager:
             error("网络连接异常: {}", e, module="NET")
             return False
             
-    def disconnect(self):
-        """断开网络连接"""
+    def disconnect(self, offline=True):
+        """断开网络连接
+
+        Args:
+            offline: 断开前是否发布 availability offline; 占空比模式周期性断开, 不视为离线
+        """
         debug("断开网络连接", module="NET")
         try:
             if self.mqtt_controller and self.mqtt_connected:
-                try:
-                    # 发布可用性为 offline (retained)
-                    self.mqtt_publish(self.get_availability_topic(), "offline", retain=True, qos=0)
-                except Exception:
-                    pass
+                if offline:
+                    try:
+                        # 发布可用性为 offline (retained)
+                        self.mqtt_publish(self.get_availability_topic(), "offline", retain=True, qos=0)
+                    except Exception:
+                        pass
                 self.mqtt_controller.disconnect()
                 self.mqtt_connected = False
+                # 主动断开不计为抖动
+                self._link_down(flap=False)
                 self.event_bus.publish(EVENTS["MQTT_STATE_CHANGE"], state="disconnected")
             if self.wifi_manager and self.wifi_connected:
                 self.wifi_manager.disconnect()
                 self.wifi_connected = False
                 self.event_bus.publish(EVENTS["WIFI_STATE_CHANGE"], state="disconnected")
             self.ntp_synced = False
+            self._signal_link_change()
             info("网络连接已断开", module="NET")
         except Exception as e:
             error("断开网络连接失败: {}", e, module="NET")
             
     def is_connected(self):
-        """整体连通状态"""
-        return self.wifi_connected and self.mqtt_connected
+        """整体连通状态: WiFi+MQTT 均连通且已通过稳定窗口"""
+        return self.wifi_connected and self.mqtt_connected and self._link_stable
         
     def get_status(self):
         """获取状态"""
@@ -458,7 +736,9 @@ class NetworkManager:
                 return False
             payload = data if isinstance(data, (bytes, bytearray, str)) else json_dumps(data)
             if self.mqtt_controller:
-                return self.mqtt_controller.publish(topic, payload, retain, qos)
+                # 发布期间不进行垃圾回收
+                with get_gc_scheduler().busy():
+                    return self.mqtt_controller.publish(topic, payload, retain, qos)
             return False
         except Exception as e:
             error("MQTT发布异常: {}", e, module="NET")
@@ -496,9 +776,10 @@ class NetworkManager:
         except Exception:
             return self.get_device_topic("state/unknown")
 
-    def publish_ha_discovery(self):
+    def publish_ha_discovery(self, force=False):
         """发布 Home Assistant Discovery 配置(temperature, humidity)
         注意: 不依赖 LWT, 通过 availability 主题指示在线/离线
+        热启动且内容摘要与上次发布一致时跳过(retained 配置仍在 broker 上), force=True 强制发布
         """
         try:
             cid = self.get_device_id()
@@ -561,8 +842,17 @@ class NetworkManager:
             base = discovery_prefix
             t_topic = "{}/sensor/{}/temperature/config".format(base, cid)
             h_topic = "{}/sensor/{}/humidity/config".format(base, cid)
-            self.mqtt_publish(t_topic, temp_cfg, retain=True, qos=0)
-            self.mqtt_publish(h_topic, hum_cfg, retain=True, qos=0)
+            t_payload = json_dumps(temp_cfg)
+            h_payload = json_dumps(hum_cfg)
+            digest = checksum("".join((t_topic, t_payload, h_topic, h_payload)).encode("utf-8"))
+            if not force and self.warm.discovery_valid(digest):
+                info("热启动: HA Discovery 未变化, 跳过发布", module="NET")
+                return
+            if not (self.mqtt_publish(t_topic, t_payload, retain=True, qos=0)
+                    and self.mqtt_publish(h_topic, h_payload, retain=True, qos=0)):
+                warning("HA Discovery 发布未完成", module="NET")
+                return
+            self.warm.remember_discovery(digest)
             info("已发布 Home Assistant Discovery 配置", module="NET")
             info("HA Discovery 详细: t_topic={} h_topic={} retain=True; t_payload={} h_payload={}", t_topic, h_topic, temp_cfg, hum_cfg, module="NET")
         except Exception as e:
@@ -37,6 +37,7 @@ class WifiManager:
         """
         self.config = config or {}
         self.wlan = network.WLAN(network.STA_IF)
+        self._static_ip = False  # 是否设置过静态 IP(热启动复用租约)
 
         # 激活 WLAN 接口
         if not self.wlan.active():
@@ -50,7 +51,7 @@ class WifiManager:
             timeout_ms: 扫描超时时间(毫秒)
 
         Returns:
-            list: 网络列表, 每个网络包含 {'ssid': str, 'rssi': int, 'bssid': bytes}
+            list: 网络列表, 每个网络包含 {'ssid': str, 'rssi': int, 'bssid': bytes, 'channel': int}
         """
         try:
             # 计算有效超时时间: 从配置读取, 否则回退到默认值
@@ -71,10 +72,10 @@ class WifiManager:
 
             for result in scan_results:
                 # scan_result 格式: (ssid, bssid, channel, RSSI, authmode, hidden)
-                ssid_bytes, bssid, _, rssi, _, _ = result
+                ssid_bytes, bssid, channel, rssi, _, _ = result
                 try:
                     ssid = ssid_bytes.decode("utf-8")
-                    networks.append({"ssid": ssid, "rssi": rssi, "bssid": bssid})
+                    networks.append({"ssid": ssid, "rssi": rssi, "bssid": bssid, "channel": channel})
                 except UnicodeError:
                     continue  # 忽略无法解码的 SSID
 
@@ -86,24 +87,48 @@ class WifiManager:
             error("WiFi扫描失败: {}", e, module="NET")
             return []
 
-    def connect(self, ssid, password):
+    def connect(self, ssid, password, bssid=None, channel=None, ifconfig=None):
         """
         连接到指定的 WiFi 网络
 
         Args:
             ssid (str): WiFi 网络名称
             password (str): WiFi 密码
+            bssid (bytes): 指定 AP 的 BSSID(热启动直连, 可选)
+            channel (int): AP 所在信道(热启动直连, 可选, 固件不支持时忽略)
+            ifconfig (tuple): 静态 IP 配置 (ip, mask, gw, dns), 为 None 时使用 DHCP
 
         Returns:
             bool: 发起连接成功返回 True, 最终连接状态请配合 get_is_connected() 判定
         """
         try:
-            self.wlan.connect(ssid, password)
+            self._set_ifconfig(ifconfig)
+            if channel:
+                try:
+                    self.wlan.config(channel=channel)
+                except Exception:
+                    pass
+            if bssid:
+                self.wlan.connect(ssid, password, bssid=bssid)
+            else:
+                self.wlan.connect(ssid, password)
             return True
         except Exception as e:
             error("WiFi连接失败: {}", e, module="NET")
             return False
 
+    def _set_ifconfig(self, ifconfig):
+        """设置静态 IP; 为 None 且之前设置过静态 IP 时恢复 DHCP(固件不支持时忽略)"""
+        try:
+            if ifconfig:
+                self.wlan.ifconfig(tuple(ifconfig))
+                self._static_ip = True
+            elif self._static_ip:
+                self.wlan.ifconfig("dhcp")
+                self._static_ip = False
+        except Exception:
+            pass
+
     def disconnect(self):
         """
         断开 WiFi 连接
@@ -132,6 +157,22 @@ class WifiManager:
             error("WiFi状态检查失败: {}", e, module="NET")
             return False
 
+    def get_ifconfig(self):
+        """
+        获取当前 IP 配置
+
+        Returns:
+            tuple: 已连接时返回 (ip, mask, gw, dns), 否则返回 None
+        """
+        try:
+            if self.wlan and self.wlan.isconnected():
+                cfg = self.wlan.ifconfig()
+                if cfg and len(cfg) == 4:
+                    return tuple(cfg)
+        except Exception:
+            pass
+        return None
+
     def get_ip(self):
         """
         获取当前 IPv4 地址
@@ -4,268 +4,440 @@
 Moved from app/fsm/core.py to app/state_machine.py
 简化状态模型为 4 个核心状态(INIT/CONNECTING/RUNNING/ERROR), 移除独立的 NetworkFSM 冗余
 
-职责: 
+职责:
 - 订阅网络/系统关键事件(WIFI_STATE_CHANGE, MQTT_STATE_CHANGE, SYSTEM_STATE_CHANGE)
 - 驱动系统从启动到运行的状态演进, 并在异常时进入 ERROR 并执行重试/重启策略
 - 统一控制 LED 指示
 
-状态与转换: 
-- INIT -> CONNECTING -> RUNNING
-- 运行中发生断链则回到 CONNECTING
+状态与转换:
+- 声明式转换表 TRANSITIONS: (状态, 事件, 载荷状态) -> (守卫, 目标状态, 动作)
+- 状态表 STATE_SPECS: 每个状态的进入动作、LED 模式、超时与周期动作
+- 两张表在 FSM 初始化时编译为扁平元组, 事件分发为一次下标查找, 不分配内存
+- 超时与周期动作在进入状态时登记到共享截止时间调度器(lib.scheduler), 不再逐节拍轮询
+- export_dot() 导出 Graphviz 状态图供评审
 
-设计边界: 
+指标(get_metrics, 随子系统诊断上报 state/diag/fsm):
+- 各状态累计驻留时间、各 (源, 目标) 转换次数
+- 到达 RUNNING 耗时的固定桶直方图: 启动后首次、每次掉线后恢复
+
+设计边界:
 - 具体网络连接流程委托给 NetworkManager
 - 退避/重试策略可后续在 FSM 或 NetworkManager 层统一引入
 """
 
 import utime as time
 import machine
-import gc
+from array import array
 from lib.logger import info, warning, error, debug
 from lib.event_bus_lock import EVENTS
+from lib.gc_scheduler import get_gc_scheduler
+from lib.scheduler import get_scheduler
+from lib.warm_boot import get_warm_boot
+
+try:
+    from hw.led import play as led_play
+except ImportError:
+    led_play = None
 
 # 状态常量定义
 STATE_INIT = 0  # 系统启动、初始化
 STATE_CONNECTING = 1  # 网络连接中
 STATE_RUNNING = 2  # 正常运行
 STATE_ERROR = 3  # 错误状态
+STATE_COUNT = 4
 
 STATE_NAMES = {
     STATE_INIT: "INIT",
     STATE_CONNECTING: "CONNECTING",
-    STATE_RUNNING: "RUNNING", 
+    STATE_RUNNING: "RUNNING",
     STATE_ERROR: "ERROR"
 }
 
+# 事件编码: 订阅的事件名 -> 转换表下标
+EV_WIFI = 0
+EV_MQTT = 1
+EV_SYSTEM = 2
+EV_COUNT = 3
+EVENT_CODES = {
+    EVENTS["WIFI_STATE_CHANGE"]: EV_WIFI,
+    EVENTS["MQTT_STATE_CHANGE"]: EV_MQTT,
+    EVENTS["SYSTEM_STATE_CHANGE"]: EV_SYSTEM,
+}
+
+# 载荷状态编码: kwargs["state"] -> 转换表下标, 未列出的状态归为 P_OTHER
+P_OTHER = 0
+P_CONNECTED = 1
+P_DISCONNECTED = 2
+P_RUNNING = 3
+P_COUNT = 4
+PAYLOAD_CODES = {
+    "connected": P_CONNECTED,
+    "disconnected": P_DISCONNECTED,
+    "running": P_RUNNING,
+}
+
+_CONNECTING_STATES = (STATE_INIT, STATE_CONNECTING)
+
+# 转换表: (源状态, 事件, 载荷状态, 守卫, 目标状态, 动作)
+# - 守卫/动作为 FSM 方法名, None 表示无; 动作先于守卫执行, 守卫返回 False 时不转换
+# - 目标状态为 None 表示只执行动作不转换
+TRANSITIONS = (
+    (_CONNECTING_STATES, EV_WIFI, P_CONNECTED, "_is_fully_connected", STATE_RUNNING, "_log_wifi_up"),
+    ((STATE_RUNNING,), EV_WIFI, P_DISCONNECTED, None, STATE_INIT, "_log_wifi_lost"),
+    (_CONNECTING_STATES, EV_WIFI, P_DISCONNECTED, None, None, "_led_sos"),
+    (_CONNECTING_STATES, EV_MQTT, P_CONNECTED, "_is_fully_connected", STATE_RUNNING, "_log_mqtt_up"),
+    ((STATE_RUNNING,), EV_MQTT, P_DISCONNECTED, None, STATE_INIT, "_log_mqtt_lost"),
+    (_CONNECTING_STATES, EV_MQTT, P_DISCONNECTED, None, None, "_led_sos"),
+    ((STATE_INIT,), EV_SYSTEM, P_RUNNING, None, STATE_RUNNING, None),
+)
+
+# 状态表: 状态 -> (进入动作, LED 模式, 超时 ms, 超时目标状态, 周期动作, 周期 ms)
+# 超时为 0 表示无超时; 超时与周期动作在进入状态时登记为截止时间, 离开状态时取消
+# INIT/CONNECTING 的周期检查只是兜底, 正常由连接事件经转换表进入 RUNNING
+STATE_SPECS = {
+    STATE_INIT: ("_on_enter_init", "blink", 0, None, "_try_enter_running", 5000),
+    STATE_CONNECTING: ("_on_enter_connecting", "pulse", 0, None, "_try_enter_running", 5000),
+    STATE_RUNNING: ("_on_enter_running", "cruise", 0, None, "_check_system_health", 30000),
+    STATE_ERROR: ("_on_enter_error", "blink", 10000, STATE_CONNECTING, None, 0),
+}
+
+# 调度器任务键
+_TIMEOUT_KEY = "fsm.timeout"
+_TICK_KEY = "fsm.tick"
+
+# LED 模式表(按状态下标), 模块加载时生成一次
+LED_MODES = tuple(STATE_SPECS[s][1] for s in range(STATE_COUNT))
+
+# 到达 RUNNING 耗时直方图桶上界(ms), 末桶为超出上界
+TTR_BUCKETS_MS = (1000, 2000, 5000, 10000, 30000, 60000, 300000)
+
+
+class _Histogram:
+    """固定桶直方图: 计数存于预分配 array, 记录时不分配内存"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = array("I", [0] * (len(bounds) + 1))
+        self.n = 0
+        self.max = 0
+        self.last = -1
+
+    def add(self, value):
+        i = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            i += 1
+        self.counts[i] += 1
+        self.n += 1
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self):
+        return {"n": self.n, "last": self.last, "max": self.max, "h": list(self.counts)}
+
+
+def export_dot():
+    """将转换表与超时导出为 Graphviz DOT 文本, 供评审状态图"""
+    payload_names = {v: k for k, v in PAYLOAD_CODES.items()}
+    event_names = {v: k for k, v in EVENT_CODES.items()}
+    lines = ["digraph FSM {", "  rankdir=LR;"]
+    for state in range(STATE_COUNT):
+        lines.append('  {} [label="{}\\nLED={}"];'.format(
+            STATE_NAMES[state], STATE_NAMES[state], LED_MODES[state]))
+    for sources, ev, payload, guard, target, action in TRANSITIONS:
+        label = "{}:{}".format(event_names[ev], payload_names.get(payload, "*"))
+        if guard:
+            label += " [{}]".format(guard.lstrip("_"))
+        for src in sources:
+            dst = STATE_NAMES[target] if target is not None else STATE_NAMES[src]
+            style = "" if target is not None else ", style=dashed"
+            lines.append('  {} -> {} [label="{}"{}];'.format(STATE_NAMES[src], dst, label, style))
+    for state, spec in STATE_SPECS.items():
+        if spec[2]:
+            lines.append('  {} -> {} [label="timeout {}ms", style=dotted];'.format(
+                STATE_NAMES[state], STATE_NAMES[spec[3]], spec[2]))
+    lines.append("}")
+    return "\n".join(lines)
+
 
 class FSM:
     """
     状态机类
     合并原有的FunctionalStateMachine功能, 消除冗余
     """
-    
+
     def __init__(self, event_bus, config, network_manager=None):
         """初始化状态机"""
         self.event_bus = event_bus
         self.config = config
         self.network_manager = network_manager
-        
+
         # 状态数据
         self.current_state = STATE_INIT
         self.state_start_time = time.ticks_ms()
         self.error_count = 0
         self.max_errors = config.get("daemon", {}).get("max_error_count", 5)
-        
+        self.scheduler = get_scheduler()
+
+        # 指标: 各状态累计驻留 ms、(源, 目标) 转换次数、到达 RUNNING 耗时直方图
+        self._boot_time = self.state_start_time
+        self._residency_ms = [0] * STATE_COUNT
+        self._transition_counts = array("I", [0] * (STATE_COUNT * STATE_COUNT))
+        self._ttr_boot = _Histogram(TTR_BUCKETS_MS)
+        self._ttr_reconnect = _Histogram(TTR_BUCKETS_MS)
+        self._down_since = None  # 离开 RUNNING 的时刻, None 表示尚未首次到达或正在运行
+
+        # 编译转换表与状态表
+        self._compile()
+
         # 订阅事件
         self._subscribe_events()
-        
+
         # 进入初始状态
         self._enter_state(STATE_INIT)
-        
+
+    def _compile(self):
+        """将声明式表编译为按下标访问的扁平元组, 方法名解析为绑定方法"""
+        def bind(name):
+            return getattr(self, name) if name else None
+
+        table = [None] * (STATE_COUNT * EV_COUNT * P_COUNT)
+        for sources, ev, payload, guard, target, action in TRANSITIONS:
+            entry = (bind(guard), target, bind(action))
+            for src in sources:
+                table[(src * EV_COUNT + ev) * P_COUNT + payload] = entry
+        self._table = tuple(table)
+
+        self._on_enter = tuple(bind(STATE_SPECS[s][0]) for s in range(STATE_COUNT))
+        self._timeouts = tuple(STATE_SPECS[s][2] for s in range(STATE_COUNT))
+        self._timeout_targets = tuple(STATE_SPECS[s][3] for s in range(STATE_COUNT))
+        self._on_tick = tuple(bind(STATE_SPECS[s][4]) for s in range(STATE_COUNT))
+        self._periods = tuple(STATE_SPECS[s][5] for s in range(STATE_COUNT))
+
     def _subscribe_events(self):
         """订阅必要的事件"""
-        events_to_subscribe = [
-            EVENTS["WIFI_STATE_CHANGE"],
-            EVENTS["MQTT_STATE_CHANGE"], 
-            EVENTS["SYSTEM_STATE_CHANGE"]
-        ]
-        
-        for event in events_to_subscribe:
+        for event in EVENT_CODES:
             self.event_bus.subscribe(event, self._handle_event)
             debug("状态机订阅事件: {}", event, module="FSM")
-            
+
     def _enter_state(self, new_state):
         """进入新状态"""
         old_state = self.current_state
+        now = time.ticks_ms()
+        self._record_transition(old_state, new_state, now)
         self.current_state = new_state
-        self.state_start_time = time.ticks_ms()
-        
-        debug("状态转换: {} -> {}", 
+        self.state_start_time = now
+
+        debug("状态转换: {} -> {}",
              STATE_NAMES.get(old_state, "UNKNOWN"),
-             STATE_NAMES.get(new_state, "UNKNOWN"), 
+             STATE_NAMES.get(new_state, "UNKNOWN"),
              module="FSM")
-             
+
+        # 登记本状态的截止时间(先于进入动作, 进入动作内再次转换时会被覆盖)
+        self._arm_deadlines(new_state)
+
         # 执行状态进入逻辑
-        self._handle_state_enter(new_state)
-        
+        self._on_enter[new_state]()
+
         # 更新LED状态
         self._update_led()
-        
-    def _handle_state_enter(self, state):
-        """处理状态进入逻辑"""
-        if state == STATE_INIT:
-            debug("系统启动、初始化并连接网络中...", module="FSM")
-            self._init_and_connect_system()
-            
-        elif state == STATE_RUNNING:
-            info("进入 RUNNING 状态", module="FSM")
-            self.error_count = 0  # 重置错误计数
-            
-        elif state == STATE_ERROR:
-            info("系统错误状态", module="FSM")
-            self.error_count += 1
-            
-        elif state == STATE_CONNECTING:
-            # 进入重连流程
-            info("开始网络连接流程", module="FSM")
-            try:
-                if self.network_manager:
-                    self.network_manager.connect()
-                else:
-                    error("网络管理器不可用", module="FSM")
-                    self._transition_to_error()
-            except Exception as e:
-                error("启动网络连接流程失败: {}", e, module="FSM")
+
+    def _arm_deadlines(self, state):
+        """按状态表登记超时与周期动作, 无则取消上一状态遗留的任务"""
+        timeout = self._timeouts[state]
+        if timeout:
+            self.scheduler.schedule(_TIMEOUT_KEY, timeout, self._on_state_timeout)
+        else:
+            self.scheduler.cancel(_TIMEOUT_KEY)
+        tick = self._on_tick[state]
+        if tick is not None:
+            period = self._periods[state]
+            self.scheduler.schedule(_TICK_KEY, period, tick, period)
+        else:
+            self.scheduler.cancel(_TICK_KEY)
+
+    def _on_state_timeout(self):
+        """状态超时截止时间到达: 转入状态表中的超时目标状态"""
+        state = self.current_state
+        target = self._timeout_targets[state]
+        if target is None:
+            return
+        info("{} 状态超时({} ms), 转入 {}", STATE_NAMES[state],
+             time.ticks_diff(time.ticks_ms(), self.state_start_time),
+             STATE_NAMES[target], module="FSM")
+        self._enter_state(target)
+
+    def _record_transition(self, old_state, new_state, now):
+        """更新驻留时间、转换计数与到达 RUNNING 耗时"""
+        self._residency_ms[old_state] += time.ticks_diff(now, self.state_start_time)
+        if old_state != new_state:
+            self._transition_counts[old_state * STATE_COUNT + new_state] += 1
+        if new_state == STATE_RUNNING and old_state != STATE_RUNNING:
+            if self._ttr_boot.n == 0:
+                self._ttr_boot.add(time.ticks_diff(now, self._boot_time))
+            elif self._down_since is not None:
+                self._ttr_reconnect.add(time.ticks_diff(now, self._down_since))
+            self._down_since = None
+        elif old_state == STATE_RUNNING and new_state != STATE_RUNNING:
+            self._down_since = now
+
+    def get_metrics(self):
+        """连接性指标: 累计驻留(含当前状态已停留时间)、转换计数、到达 RUNNING 耗时直方图
+
+        直方图桶边界见 TTR_BUCKETS_MS; ttr_boot 自 FSM 创建(启动装配完成)起计时,
+        ttr_reconnect 自每次离开 RUNNING 起计时
+        """
+        residency = {}
+        elapsed = time.ticks_diff(time.ticks_ms(), self.state_start_time)
+        for s in range(STATE_COUNT):
+            ms = self._residency_ms[s]
+            if s == self.current_state:
+                ms += elapsed
+            residency[STATE_NAMES[s]] = ms
+        transitions = {}
+        for i, n in enumerate(self._transition_counts):
+            if n:
+                transitions["{}>{}".format(STATE_NAMES[i // STATE_COUNT], STATE_NAMES[i % STATE_COUNT])] = n
+        return {
+            "state": STATE_NAMES[self.current_state],
+            "residency_ms": residency,
+            "transitions": transitions,
+            "ttr_buckets_ms": TTR_BUCKETS_MS,
+            "ttr_boot": self._ttr_boot.to_dict(),
+            "ttr_reconnect": self._ttr_reconnect.to_dict(),
+        }
+
+    # ---- 进入动作 ----
+    def _on_enter_init(self):
+        debug("系统启动、初始化并连接网络中...", module="FSM")
+        self._init_and_connect_system()
+
+    def _on_enter_connecting(self):
+        # 进入重连流程
+        info("开始网络连接流程", module="FSM")
+        try:
+            if self.network_manager:
+                self.network_manager.connect()
+            else:
+                error("网络管理器不可用", module="FSM")
                 self._transition_to_error()
-            
+        except Exception as e:
+            error("启动网络连接流程失败: {}", e, module="FSM")
+            self._transition_to_error()
+
+    def _on_enter_running(self):
+        info("进入 RUNNING 状态", module="FSM")
+        self.error_count = 0  # 重置错误计数
+
+    def _on_enter_error(self):
+        info("系统错误状态", module="FSM")
+        self.error_count += 1
+
     def _init_and_connect_system(self):
         """初始化系统并启动网络连接"""
         try:
             # 执行基本的系统初始化
             debug("执行系统初始化任务", module="FSM")
-            
+
             # 启动网络连接
             if not self.network_manager:
                 error("网络管理器不可用", module="FSM")
                 self._transition_to_error()
                 return
-                
+
             # 直接调用网络管理器的连接方法
             success = self.network_manager.connect()
             if not success:
                 warning("网络连接启动失败", module="FSM")
-                
+
         except Exception as e:
             error("系统初始化和网络连接失败: {}", e, module="FSM")
             self._transition_to_error()
-            
+
     def _transition_to_error(self):
         """转换到错误状态"""
         if self.error_count >= self.max_errors:
             error("达到最大错误次数, 系统将重启", module="FSM")
+            # 重启前保存事件追踪, 便于离线复盘(未启用追踪时无操作)
+            self.event_bus.flush_trace()
+            # 热启动快照累计错误复位次数, 复位后网络可走快速路径
+            get_warm_boot().record_error_reset(self.error_count)
             machine.reset()
         else:
             self._enter_state(STATE_ERROR)
-            
+
     def _update_led(self):
         """更新LED状态"""
         try:
-            from hw.led import play
-            
-            # 与当前简化状态模型对齐: INIT/CONNECTING/RUNNING/ERROR
-            led_modes = {
-                STATE_INIT: "blink",
-                STATE_CONNECTING: "pulse",
-                STATE_RUNNING: "cruise",
-                STATE_ERROR: "blink",
-            }
-            
-            mode = led_modes.get(self.current_state, "off")
-            play(mode)
-            
+            if led_play is not None:
+                led_play(LED_MODES[self.current_state])
         except Exception as e:
             error("更新LED状态失败: {}", e, module="FSM")
-            
-    def _try_enter_running_if_fully_connected(self):
+
+    # ---- 守卫与转换动作 ----
+    def _is_fully_connected(self):
+        return bool(self.network_manager and self.network_manager.is_connected())
+
+    def _log_wifi_up(self):
+        info("WiFi连接成功", module="FSM")
+
+    def _log_mqtt_up(self):
+        info("MQTT连接成功", module="FSM")
+
+    def _log_wifi_lost(self):
+        warning("WiFi连接断开, 重新连接", module="FSM")
+
+    def _log_mqtt_lost(self):
+        warning("MQTT连接断开, 重新连接", module="FSM")
+
+    def _led_sos(self):
+        """连接阶段发生断开/失败: 不改变状态机策略, 但让LED进入SOS提示"""
+        try:
+            if led_play is not None:
+                led_play("sos")
+                debug("连接阶段断开: LED进入SOS模式", module="FSM")
+        except Exception:
+            pass
+
+    def _try_enter_running(self):
         """在 INIT/CONNECTING 阶段, 若网络已完全连通则进入 RUNNING"""
         try:
-            if self.current_state in (STATE_INIT, STATE_CONNECTING):
-                if self.network_manager and self.network_manager.is_connected():
-                    self._enter_state(STATE_RUNNING)
+            if self._is_fully_connected():
+                self._enter_state(STATE_RUNNING)
         except Exception as e:
             error("尝试进入 RUNNING 失败: {}", e, module="FSM")
-            
+
     def _handle_event(self, event_name, *args, **kwargs):
-        """处理事件"""
+        """处理事件: 按 (状态, 事件, 载荷状态) 查转换表"""
         try:
-            # 处理网络相关事件
-            if event_name == EVENTS["WIFI_STATE_CHANGE"]:
-                self._handle_wifi_event(*args, **kwargs)
-            elif event_name == EVENTS["MQTT_STATE_CHANGE"]:
-                self._handle_mqtt_event(*args, **kwargs)
-            elif event_name == EVENTS["SYSTEM_STATE_CHANGE"]:
-                self._handle_system_event(*args, **kwargs)
-                
+            ev = EVENT_CODES.get(event_name)
+            if ev is None:
+                return
+            payload = PAYLOAD_CODES.get(kwargs.get("state"), P_OTHER)
+            entry = self._table[(self.current_state * EV_COUNT + ev) * P_COUNT + payload]
+            if entry is None:
+                return
+            guard, target, action = entry
+            if action is not None:
+                action()
+            if target is not None and (guard is None or guard()):
+                self._enter_state(target)
+
         except Exception as e:
             error("处理事件 {} 时发生错误: {}", event_name, e, module="FSM")
-            
-    def _handle_wifi_event(self, *args, **kwargs):
-        """处理WiFi事件"""
-        state = kwargs.get('state', 'unknown')
-        
-        if state == 'connected' and self.current_state in (STATE_INIT, STATE_CONNECTING):
-            # WiFi连接成功, 检查是否完全连接
-            info("WiFi连接成功", module="FSM")
-            self._try_enter_running_if_fully_connected()
-            
-        elif state == 'disconnected' and self.current_state == STATE_RUNNING:
-            # WiFi断开, 需要重新连接
-            warning("WiFi连接断开, 重新连接", module="FSM")
-            self._enter_state(STATE_INIT)
-        
-        # 连接阶段发生断开/失败: 不改变状态机策略, 但让LED进入SOS提示
-        elif state == 'disconnected' and self.current_state in (STATE_INIT, STATE_CONNECTING):
-            try:
-                from hw.led import play
-                play('sos')
-                debug("WiFi断开于连接阶段: LED进入SOS模式", module="FSM")
-            except Exception:
-                pass
-            
-    def _handle_mqtt_event(self, *args, **kwargs):
-        """处理MQTT事件"""
-        state = kwargs.get('state', 'unknown')
-        
-        if state == 'connected' and self.current_state in (STATE_INIT, STATE_CONNECTING):
-            # MQTT连接成功, 检查是否完全连接
-            info("MQTT连接成功", module="FSM")
-            self._try_enter_running_if_fully_connected()
-            
-        elif state == 'disconnected' and self.current_state == STATE_RUNNING:
-            # MQTT断开, 重新连接
-            warning("MQTT连接断开, 重新连接", module="FSM")
-            self._enter_state(STATE_INIT)
-        
-        # 连接阶段发生断开/失败: 不改变状态机策略, 但让LED进入SOS提示
-        elif state == 'disconnected' and self.current_state in (STATE_INIT, STATE_CONNECTING):
-            try:
-                from hw.led import play
-                play('sos')
-                debug("MQTT断开于连接阶段: LED进入SOS模式", module="FSM")
-            except Exception:
-                pass
-            
-    def _handle_system_event(self, *args, **kwargs):
-        """处理系统事件"""
-        state = kwargs.get('state', 'unknown')
-        
-        if state == 'running' and self.current_state == STATE_INIT:
-            # 系统报告运行状态
-            self._enter_state(STATE_RUNNING)
-            
+
     def update(self):
-        """状态机主循环更新"""
+        """执行已到期的截止时间任务(超时与周期动作)
+
+        主循环直接驱动共享调度器; 本方法保留给未接入调度器的调用方(回放/基准工具)
+        """
         try:
-            current_time = time.ticks_ms()
-            elapsed = time.ticks_diff(current_time, self.state_start_time)
-            
-            # 根据当前状态执行相应逻辑
-            if self.current_state in (STATE_INIT, STATE_CONNECTING):
-                # INIT/CONNECTING: 若网络已全连通, 切换到 RUNNING
-                self._try_enter_running_if_fully_connected()
-                
-            elif self.current_state == STATE_RUNNING:
-                # 运行状态的定期检查
-                self._check_system_health()
-                
-            elif self.current_state == STATE_ERROR:
-                if elapsed >= 10000:  # 10秒后重试
-                    info("错误状态超时({} ms), 尝试重新连接", elapsed, module="FSM")
-                    self._enter_state(STATE_CONNECTING)
-            
+            self.scheduler.run_due()
         except Exception as e:
             error("状态机更新失败: {}", e, module="FSM")
-            
+
     def _check_system_health(self):
         """检查系统健康状态"""
         try:
@@ -275,25 +447,21 @@ class FSM:
                     warning("网络连接丢失", module="FSM")
                     self._enter_state(STATE_CONNECTING)
                     return
-                    
-
-                    
-            # 定期垃圾回收
-            current_time = time.ticks_ms()
-            if not hasattr(self, '_last_gc_time'):
-                self._last_gc_time = current_time
-                
-            if time.ticks_diff(current_time, self._last_gc_time) >= 30000:  # 30秒
-                gc.collect()
-                self._last_gc_time = current_time
-                
+
+            # 每个健康检查周期请求一次垃圾回收, 由回收调度器在主循环空闲时执行
+            get_gc_scheduler().request("fsm_health")
+
         except Exception as e:
             error("系统健康检查失败: {}", e, module="FSM")
-            
+
     def get_current_state(self):
         """获取当前状态名称"""
         return STATE_NAMES.get(self.current_state, "UNKNOWN")
-            
+
+    def export_graph(self):
+        """导出状态图(Graphviz DOT 文本)"""
+        return export_dot()
+
     def force_state(self, state_name):
         """强制设置状态"""
         state_map = {v: k for k, v in STATE_NAMES.items()}
@@ -301,4 +469,4 @@ class FSM:
             debug("强制设置状态为: {}", state_name, module="FSM")
             self._enter_state(state_map[state_name])
         else:
-            error("未知的状态名称: {}", state_name, module="FSM")
\ No newline at end of file
+            error("未知的状态名称: {}", state_name, module="FSM")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# tools/bench_dispatch_latency.py
+"""
+EventBus 发布到回调的延迟基准: 主循环轮询 vs 发布唤醒的分发任务
+
+- poll: 重现旧主循环, 每 50ms 调用一次 process_events(受 TIMER_TICK_MS 门控)
+- dispatcher: run_dispatcher() 任务, 由 publish 唤醒
+
+使用 tools/stubs 中的 uasyncio/utime 桩在 CPython 上运行(真实时钟)。
+输出延迟分位数与分发侧唤醒次数(空唤醒即队列为空时的无效轮询)。
+run() 也由 tools/benchmark.py 的 bus_latency 用例复用(固定的短发布间隔)。
+
+用法: python tools/bench_dispatch_latency.py [-n 事件数]
+"""
+
+import benchlib
+import uasyncio as asyncio
+from benchlib import percentile, time
+
+EVENT = "sensor.data"
+MAIN_LOOP_MS = 50
+
+
+def _make_bus():
+    bus = benchlib.fresh_bus((EVENT,))  # 测量延迟, 不受配额限流
+    bus._last_process_time = 0
+    latencies = []
+
+    def on_event(event_name, t_pub=None, **kwargs):
+        latencies.append(time.ticks_diff(time.ticks_us(), t_pub))
+
+    bus.subscribe(EVENT, on_event)
+
+    # 统计分发侧唤醒次数
+    counters = {"wakeups": 0, "empty": 0}
+    orig_batch = bus._dispatch_batch
+
+    def counted_batch():
+        counters["wakeups"] += 1
+        n = orig_batch()
+        if n == 0:
+            counters["empty"] += 1
+        return n
+
+    bus._dispatch_batch = counted_batch
+    return bus, latencies, counters
+
+
+def random_gaps(n, seed):
+    """不规则发布间隔(ms), 夹杂较长空闲"""
+    import random
+
+    rnd = random.Random(seed)
+    return [rnd.choice((3, 7, 15, 40, 120)) for _ in range(n)]
+
+
+async def _producer(bus, n, gaps):
+    for i in range(n):
+        await asyncio.sleep_ms(gaps[i % len(gaps)])
+        bus.publish(EVENT, t_pub=time.ticks_us())
+    # 等待最后一批被分发
+    await asyncio.sleep_ms(200)
+
+
+async def _poll_loop(bus):
+    while True:
+        bus.process_events()
+        await asyncio.sleep_ms(MAIN_LOOP_MS)
+
+
+async def run(mode, n, gaps):
+    """mode 为 "poll" 或 "dispatcher"; 按 gaps(ms, 循环使用)发布 n 个事件, 返回延迟分位数与唤醒统计"""
+    bus, latencies, counters = _make_bus()
+    if mode == "poll":
+        consumer = asyncio.create_task(_poll_loop(bus))
+    else:
+        consumer = asyncio.create_task(bus.run_dispatcher())
+    t0 = time.ticks_ms()
+    await _producer(bus, n, gaps)
+    elapsed_s = time.ticks_diff(time.ticks_ms(), t0) / 1000
+    consumer.cancel()
+    try:
+        await consumer
+    except asyncio.CancelledError:
+        pass
+    if "_dispatch_batch" in bus.__dict__:
+        del bus._dispatch_batch
+    latencies.sort()
+    return {
+        "events": len(latencies),
+        "p50_us": percentile(latencies, 50),
+        "p95_us": percentile(latencies, 95),
+        "p99_us": percentile(latencies, 99),
+        "max_us": latencies[-1] if latencies else 0,
+        "wakeups_per_s": counters["wakeups"] / elapsed_s,
+        "empty_wakeups_per_s": counters["empty"] / elapsed_s,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="发布到回调延迟基准")
+    parser.add_argument("-n", type=int, default=100, help="发布事件数")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("{:<11} {:>7} {:>9} {:>9} {:>9} {:>10} {:>10}".format(
+        "mode", "events", "p50 us", "p95 us", "max us", "wake/s", "empty/s"))
+    for mode in ("poll", "dispatcher"):
+        r = asyncio.run(run(mode, args.n, random_gaps(args.n, args.seed)))
+        print("{:<11} {:>7} {:>9} {:>9} {:>9} {:>10.1f} {:>10.1f}".format(
+            mode, r["events"], r["p50_us"], r["p95_us"], r["max_us"],
+            r["wakeups_per_s"], r["empty_wakeups_per_s"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# tools/bench_event_alloc.py
+"""
+EventBus 每事件分配量基准: 记录池关闭 vs 开启
+
+- 关闭(池容量 0): 每次发布都新建事件记录, 等价于重构前每事件构造 (name, args, kwargs) 元组
+- 开启: 记录从 EventRecordPool 取出, 分发后归还
+
+测量一次 publish + dispatch 的瞬时分配字节数, 分别覆盖无载荷、位置参数、关键字参数三种发布形式。
+
+make_bus()/cases() 也由 tools/benchmark.py 的 bus_alloc 用例复用。
+
+用法: python tools/bench_event_alloc.py [-n 次数]
+"""
+
+import benchlib
+from lib.event_bus_lock import EventBusConfig, EventRecordPool, PriorityEventQueue, register_event
+
+EVENT = "sensor.data"
+POOL_SIZE = EventBusConfig.MAX_QUEUE_SIZE + EventBusConfig.POOL_SPARE
+
+
+def make_bus(pool_size=POOL_SIZE, event=EVENT):
+    """pool_size 为 0 时关闭记录池; event 取消配额(测量分配量, 不受限流)并挂一个空回调"""
+    bus = benchlib.fresh_bus((event,))
+    bus._pool = EventRecordPool(pool_size)
+    queue = PriorityEventQueue(EventBusConfig.LANES, EventBusConfig.DEFAULT_LANE, bus._pool.release)
+    for name, lane in EventBusConfig.EVENT_LANES.items():
+        queue.set_lane(register_event(name), lane)
+    bus.event_queue = queue
+    bus.subscribe(event, lambda event_name, *a, **kw: None)
+    return bus
+
+
+def cases(bus, event=EVENT):
+    """((名称, 一次 publish + dispatch), ...): 无载荷、位置参数、关键字参数"""
+    eid = register_event(event)
+    q = bus.event_queue
+
+    def dispatch():
+        bus._execute_event(q.dequeue())
+
+    def bare():
+        bus.publish(eid)
+        dispatch()
+
+    def positional():
+        bus.publish(eid, 1)
+        dispatch()
+
+    def keyword():
+        bus.publish(eid, value=1)
+        dispatch()
+
+    return (("publish(id)", bare), ("publish(id, 1)", positional), ("publish(id, value=1)", keyword))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="每事件分配量基准")
+    parser.add_argument("-n", type=int, default=5000, help="每种情形的迭代次数")
+    args = parser.parse_args()
+
+    print("{:<22} {:>14} {:>14}".format("case", "no pool B/ev", "pool B/ev"))
+    results = {}
+    for label, size in (("off", 0), ("on", POOL_SIZE)):
+        bus = make_bus(size)
+        for name, fn in cases(bus):
+            # 预热, 使池与分发表进入稳态
+            for _ in range(100):
+                fn()
+            results.setdefault(name, {})[label] = benchlib.measure_alloc(fn, args.n)
+    for name, r in results.items():
+        print("{:<22} {:>14.1f} {:>14.1f}".format(name, r["off"], r["on"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# tools/bench_event_queue.py
+"""
+EventQueue 基准: 旧列表队列 vs 定长环形队列
+
+直接调用队列的 enqueue/dequeue, 不经过 publish 与回调分发, 只比较队列结构本身。
+两种队列接收同一批预先分配的 EventRecord, 记录本身不计入分配量。
+
+测量内容(每种容量各一组):
+- steady: 队列半满时交替 enqueue + dequeue(持续积压)
+- overflow: 队列已满时 enqueue(丢弃最旧)
+- drain: 从空队列填满后逐条 dequeue 清空(每事件一次 enqueue + 一次 dequeue)
+- 每次操作的耗时(ns)与瞬时分配字节数
+
+列表队列 pop(0) 需搬移其余元素, 出队耗时随积压长度线性增长; 环形队列与容量无关。
+CPython 上搬移由 C memmove 完成, 小容量时列表反而更快, 差距在积压较长时显现;
+列表出队收缩后再入队会重新分配底层数组(drain 的 B/op), 环形队列槽位预分配不再分配。
+容量超过 256 时 CPython 的下标/长度整数需要分配(steady 的 B/op), MicroPython 小整数不占堆。
+
+bench_queue() 也由 tools/benchmark.py 的 queue_ops 用例复用。
+
+用法: python tools/bench_event_queue.py [-n 次数] [--sizes 64,4096]
+"""
+
+import benchlib
+from lib.event_bus_lock import EventBusConfig, EventQueue, EventRecord
+
+
+class LegacyListQueue:
+    """重构前的列表队列实现(pop(0) 出队/丢弃), 仅作对照"""
+
+    def __init__(self, max_size):
+        self.queue = []
+        self.max_size = max_size
+        self._drops = 0
+
+    def enqueue(self, event_item):
+        if len(self.queue) >= self.max_size:
+            self.queue.pop(0)
+            self._drops += 1
+        self.queue.append(event_item)
+        return True
+
+    def dequeue(self):
+        if self.queue:
+            return self.queue.pop(0)
+        return None
+
+    def is_empty(self):
+        return len(self.queue) == 0
+
+
+QUEUES = (("list(pop0)", LegacyListQueue), ("ring", EventQueue))
+
+
+def _ns_per_op(fn, rounds, ops):
+    rate, _ = benchlib.measure_rate(fn, rounds)
+    return 1e9 / (rate * ops) if rate else 0.0
+
+
+def bench_queue(queue_cls, size, n):
+    """返回 {场景_ns: 每操作耗时, 场景_bytes: 每操作分配字节数}"""
+    records = [EventRecord() for _ in range(size)]
+    q = queue_cls(size)
+    rounds = max(1, n // size)
+    alloc_rounds = min(rounds, 20)
+
+    for r in records[:size // 2]:
+        q.enqueue(r)
+    rec = records[-1]
+
+    def steady():
+        q.enqueue(rec)
+        q.dequeue()
+
+    result = {
+        "steady_ns": _ns_per_op(steady, n, 2),
+        "steady_bytes": benchlib.measure_alloc(steady, min(n, 2000)) / 2,
+    }
+
+    while not q.is_empty():
+        q.dequeue()
+    for r in records:
+        q.enqueue(r)
+
+    def overflow():
+        for r in records:
+            q.enqueue(r)
+
+    result["overflow_ns"] = _ns_per_op(overflow, rounds, size)
+    result["overflow_bytes"] = benchlib.measure_alloc(overflow, alloc_rounds) / size
+
+    def drain():
+        for r in records:
+            q.enqueue(r)
+        while q.dequeue() is not None:
+            pass
+
+    while not q.is_empty():
+        q.dequeue()
+    result["drain_ns"] = _ns_per_op(drain, rounds, size)
+    result["drain_bytes"] = benchlib.measure_alloc(drain, alloc_rounds) / size
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="EventQueue 入队/出队耗时与分配基准")
+    parser.add_argument("-n", type=int, default=50000, help="每个场景的操作次数")
+    parser.add_argument("--sizes", default="{},4096".format(EventBusConfig.MAX_QUEUE_SIZE),
+                        help="队列容量列表, 逗号分隔")
+    args = parser.parse_args()
+
+    print("{:<12} {:>6} {:>10} {:>8} {:>12} {:>8} {:>10} {:>8}".format(
+        "queue", "size", "steady ns", "B/op", "overflow ns", "B/op", "drain ns", "B/op"))
+    for size in (int(s) for s in args.sizes.split(",")):
+        for name, cls in QUEUES:
+            r = bench_queue(cls, size, args.n)
+            print("{:<12} {:>6} {:>10.0f} {:>8.1f} {:>12.0f} {:>8.1f} {:>10.0f} {:>8.1f}".format(
+                name, size, r["steady_ns"], r["steady_bytes"], r["overflow_ns"],
+                r["overflow_bytes"], r["drain_ns"], r["drain_bytes"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# tools/bench_wakeups.py
+"""
+主循环唤醒次数基准: 在虚拟时钟上运行完整 MainController, 统计每分钟事件循环唤醒次数
+
+- 事件循环的 selector 等待被替换为"推进虚拟时钟": 每次带超时的等待即一次唤醒(设备上即一次 CPU 从空闲醒来)
+- utime 桩的时钟与事件循环虚拟时间同步, 固件内 ticks_ms/ticks_diff 看到的是同一时间线
+- 网络: WLAN 桩直接连通, MQTT 连接/收包替换为立即成功的空操作, 发布写入只计数的假套接字
+- 预热(默认 60s, 含启动、连接与首次维护)后统计稳态窗口内的唤醒次数
+- --lightsleep: 开启 system.lightsleep 并周期性断开 WLAN 制造链路抖动, 使网络进入共享退避;
+  machine.lightsleep 改为推进虚拟时钟并计数, 统计期间未执行任何 lightsleep 时以非零退出码失败
+
+不依赖特定主循环实现, 对旧版 50ms 轮询主循环同样适用, 便于前后对比。
+
+用法: python tools/bench_wakeups.py [--minutes 10] [--warmup 60] [--lightsleep]
+"""
+
+import argparse
+import asyncio
+import sys
+
+import benchlib
+import machine
+import utime
+
+import lib.logger as logger
+
+
+class _SelectorProxy:
+    """把 selector 的阻塞等待换成虚拟时钟推进"""
+
+    def __init__(self, loop, selector):
+        self._loop = loop
+        self._selector = selector
+
+    def select(self, timeout=None):
+        if timeout is None:
+            raise RuntimeError("事件循环无定时器可等待(所有任务都在等待外部事件)")
+        if timeout > 0:
+            self._loop.vt += timeout
+            self._loop.wakeups += 1
+        return self._selector.select(0)
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """虚拟时间事件循环: time() 返回虚拟秒数, 空闲等待瞬间完成"""
+
+    def __init__(self):
+        super().__init__()
+        self.vt = 0.0
+        self.wakeups = 0
+        self._selector = _SelectorProxy(self, self._selector)
+
+    def time(self):
+        return self.vt
+
+
+def _connect_stubs(nm):
+    """让网络栈无需真实网络即可连通"""
+    wlan = nm.wifi_manager.wlan
+    networks = nm.wifi_config.get("networks") or [{"ssid": "bench"}]
+    wlan.scan_results = [(networks[0]["ssid"].encode(), b"\x11" * 6, 6, -50, 3, 0)]
+    wlan.set_connected(True)
+
+    ctrl = nm.mqtt_controller
+
+    async def connect_async():
+        ctrl.client.sock = benchlib.FakeSocket()
+        ctrl._is_connected = True
+        return True
+
+    async def process_once():
+        return True
+
+    ctrl.connect_async = connect_async
+    ctrl.process_once = process_once
+
+
+def _install_lightsleep(loop):
+    """machine.lightsleep 推进虚拟时钟(整个事件循环随之停摆)并计数"""
+    def lightsleep(ms=0):
+        loop.vt += ms / 1000
+        loop.wakeups += 1
+        loop.lightsleeps += 1
+    loop.lightsleeps = 0
+    machine.lightsleep = lightsleep
+
+
+async def _flap_link(nm, up_s=2, down_s=1):
+    """链路连通后很快断开, 重复制造抖动直至进入共享退避"""
+    wlan = nm.wifi_manager.wlan
+    while True:
+        while not nm.mqtt_connected:
+            await asyncio.sleep(0.5)
+        await asyncio.sleep(up_s)
+        wlan.set_connected(False)
+        await asyncio.sleep(down_s)
+        wlan.set_connected(True)
+
+
+async def _run(minutes, warmup_s, flap=False):
+    loop = asyncio.get_running_loop()
+    from main import MainController
+
+    controller = MainController()
+    _connect_stubs(controller.network_manager)
+    task = asyncio.create_task(controller.run())
+    flapper = asyncio.create_task(_flap_link(controller.network_manager)) if flap else None
+
+    # 旧版主循环没有截止时间调度器, 只统计事件循环唤醒
+    sched = getattr(controller, "scheduler", None)
+    if sched is not None and not hasattr(sched, "sleep"):
+        sched = None
+
+    await asyncio.sleep(warmup_s)
+    start_wakeups = loop.wakeups
+    start_light = getattr(loop, "lightsleeps", 0)
+    start_main = sched.get_stats()["wakeups"] if sched else 0
+    start_vt = loop.vt
+    await asyncio.sleep(minutes * 60)
+    wakeups = loop.wakeups - start_wakeups
+    span_min = (loop.vt - start_vt) / 60
+
+    task.cancel()
+    if flapper is not None:
+        flapper.cancel()
+    state = controller.state_machine.get_current_state() if controller.state_machine else "?"
+    return {
+        "state": state,
+        "minutes": round(span_min, 2),
+        "wakeups": wakeups,
+        "wakeups_per_min": round(wakeups / span_min, 1),
+        "main_loop": sched.get_stats()["wakeups"] - start_main if sched else None,
+        "lightsleeps": getattr(loop, "lightsleeps", 0) - start_light if flap else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主循环唤醒次数基准(虚拟时钟)")
+    parser.add_argument("--minutes", type=float, default=10, help="稳态统计时长(虚拟分钟)")
+    parser.add_argument("--warmup", type=float, default=60, help="预热时长(虚拟秒)")
+    parser.add_argument("--lightsleep", action="store_true",
+                        help="开启 lightsleep 并制造链路抖动, 断言 lightsleep 分支被执行")
+    args = parser.parse_args()
+
+    logger.LOG_LEVEL = logger.ERROR
+    loop = VirtualClockLoop()
+    asyncio.set_event_loop(loop)
+    utime.set_clock(lambda: int(loop.vt * 1000000))
+    if args.lightsleep:
+        from config import get_config
+        get_config("system")["lightsleep"] = True
+        _install_lightsleep(loop)
+    try:
+        report = loop.run_until_complete(_run(args.minutes, args.warmup, args.lightsleep))
+    finally:
+        utime.set_clock(None)
+    print("状态 {state}, 统计 {minutes} 分钟: 事件循环唤醒 {wakeups} 次, {wakeups_per_min} 次/分钟"
+          .format(**report))
+    if report["main_loop"] is not None:
+        print("其中主循环醒来(含提前唤醒): {} 次".format(report["main_loop"]))
+    if report["lightsleeps"] is not None:
+        print("lightsleep: {} 次".format(report["lightsleeps"]))
+        if not report["lightsleeps"]:
+            print("失败: 共享退避期间未执行 lightsleep", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# tools/benchlib.py
+"""
+主机端基准工具公共部分
+
+- 将 tools/stubs 与 app 加入 sys.path, 使固件模块可在 CPython 上导入
+- 提供计时与单次操作分配量测量
+- 提供各基准共用的固件对象构造: fresh_bus()、network_stack()、FakeSocket
+- 也可在 MicroPython unix 端口上运行(需在仓库根目录执行), 此时桩模块仅补齐 machine/network 等缺失模块
+"""
+
+import gc
+import sys
+
+try:
+    from os.path import abspath, dirname, join
+except ImportError:  # MicroPython unix 端口无 os.path
+    def abspath(p):
+        return p
+
+    def dirname(p):
+        return p.rsplit("/", 1)[0] if "/" in p else "."
+
+    def join(*parts):
+        return "/".join(parts)
+
+ROOT = dirname(dirname(abspath(__file__)))
+STUBS_DIR = join(ROOT, "tools", "stubs")
+APP_DIR = join(ROOT, "app")
+IS_MICROPYTHON = sys.implementation.name == "micropython"
+
+
+def setup_path():
+    """桩模块优先, 其次 app 源码; MicroPython 上真实的 utime/uasyncio 优先于桩模块"""
+    if IS_MICROPYTHON:
+        if APP_DIR not in sys.path:
+            sys.path.insert(0, APP_DIR)
+        if STUBS_DIR not in sys.path:
+            sys.path.append(STUBS_DIR)
+        return
+    for p in (APP_DIR, STUBS_DIR):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+
+
+setup_path()
+
+import utime as time  # noqa: E402
+
+try:
+    import tracemalloc
+except ImportError:  # MicroPython unix 端口
+    tracemalloc = None
+
+
+def measure_rate(fn, n):
+    """执行 fn() n 次, 返回 (ops/s, 总耗时 us)"""
+    gc.collect()
+    t0 = time.ticks_us()
+    for _ in range(n):
+        fn()
+    dt = time.ticks_diff(time.ticks_us(), t0)
+    return (n * 1000000 / dt if dt > 0 else 0), dt
+
+
+def measure_alloc(fn, n):
+    """测量每次 fn() 的瞬时堆分配字节数(均值)
+
+    - MicroPython: 关闭 GC 后读取 gc.mem_alloc() 增量, 为真实分配量
+    - CPython: 逐次重置 tracemalloc 峰值, 取 峰值-起点 之和, 为分配量下界
+    """
+    if tracemalloc is None:
+        gc.collect()
+        gc.disable()
+        try:
+            a0 = gc.mem_alloc()
+            for _ in range(n):
+                fn()
+            return (gc.mem_alloc() - a0) / n
+        finally:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(n):
+            cur0 = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            total += tracemalloc.get_traced_memory()[1] - cur0
+        return total / n
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(sorted_values, p):
+    """已排序序列的百分位数(最近秩)"""
+    if not sorted_values:
+        return 0
+    k = int(round(p / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[k]
+
+
+# ---------------------------------------------------------------------------
+# 固件对象构造: 各基准脚本与 benchmark.py 共用
+# ---------------------------------------------------------------------------
+
+
+class FakeSocket:
+    """不联网的套接字, 只累计写入字节数"""
+
+    def __init__(self):
+        self.written = 0
+
+    def write(self, buf, n=None):
+        n = len(buf) if n is None else n
+        self.written += n
+        return n
+
+    def read(self, n):
+        return b""
+
+    def setblocking(self, flag):
+        pass
+
+    def close(self):
+        pass
+
+
+def fresh_bus(unlimited=()):
+    """新建并清空事件总线; unlimited 中的事件取消配额, 测量不受限流"""
+    from lib.event_bus_lock import EventBus
+
+    bus = EventBus()
+    bus.cleanup()
+    for event in unlimited:
+        bus.set_quota(event, None)
+    return bus
+
+
+def network_stack(bus=None):
+    """构造不启动连接任务的 NetworkManager + FSM(连接状态由调用方设置), 返回 (bus, nm, fsm)"""
+    from config import get_config
+    from lib.async_runtime import get_async_runtime
+
+    get_async_runtime().create_task = lambda coro, name=None: coro.close()
+    from net.network_manager import NetworkManager
+    from state_machine import FSM
+
+    config = get_config()
+    bus = bus or fresh_bus()
+    nm = NetworkManager(config, bus)
+    fsm = FSM(bus, config, nm)
+    return bus, nm, fsm
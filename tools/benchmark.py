@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# tools/benchmark.py
+"""
+固件热路径基准套件, 输出 JSON 报告用于跨提交对比
+
+覆盖(bus_alloc/bus_latency/queue_ops 直接调用对应单项脚本的测量函数, 不重复实现):
+- bus_throughput: EventBus 发布 + 批量分发吞吐(events/s)
+- bus_alloc: 单次 publish + dispatch 的分配字节数(bench_event_alloc, 记录池开启)
+- bus_latency: publish 到回调的延迟分位数(bench_dispatch_latency 的 run_dispatcher 模式, 真实时钟)
+- queue_ops: EventQueue 入队/出队耗时与分配量(bench_event_queue, 默认容量)
+- fsm_event: FSM 处理一对 MQTT 连接/断开事件(RUNNING <-> INIT)的耗时
+- json_dumps: 周期指标载荷序列化(与 metrics.publish 发送的字段一致)
+- diag_payload: 各子系统诊断(state/diag/<名称>)的 JSON 长度与序列化分配量, 取最大一项
+- mqtt_encode: MQTTClient.publish 报文编码(假套接字, 不联网)
+- mqtt_publish: NetworkManager.mqtt_publish 全路径(JSON + 编码 + GC 守卫)
+- loop_profiler: LoopProfiler.record 单次样本的吞吐与分配字节数
+
+硬件相关模块(machine/network/utime/uasyncio)由 tools/stubs 提供, 总线/网络栈构造与假套接字见 benchlib;
+也可在 MicroPython unix 端口运行。
+
+用法:
+    python tools/benchmark.py [-o report.json] [--quick] [--only a,b]
+    python tools/benchmark.py --compare old.json [new.json] [--tolerance 10]
+"""
+
+import gc
+import json
+import sys
+
+import benchlib
+from benchlib import IS_MICROPYTHON, FakeSocket, fresh_bus, measure_alloc, measure_rate, network_stack, time
+
+import bench_dispatch_latency
+import bench_event_alloc
+import bench_event_queue
+import lib.logger as logger
+
+EVENT = "bench.data"
+# 指标后缀 -> 方向: 1 越大越好, -1 越小越好
+_DIRECTIONS = (("_per_s", 1), ("_us", -1), ("_ns", -1), ("_bytes", -1))
+# bus_latency 的发布间隔(ms): 短间隔使套件在数秒内完成
+LATENCY_GAPS_MS = (1, 3, 7, 2, 15)
+
+
+def _quiet_logs():
+    """基准期间只保留错误日志, 避免打印干扰计时"""
+    logger.LOG_LEVEL = logger.ERROR
+
+
+# ---------------------------------------------------------------------------
+# 基准用例: 每个用例返回 {指标名: 数值}
+# ---------------------------------------------------------------------------
+
+
+def bench_bus_throughput(n):
+    from lib.event_bus_lock import register_event
+
+    bus = fresh_bus((EVENT,))
+    bus.subscribe(EVENT, lambda event_name, *a, **kw: None)
+    eid = register_event(EVENT)
+    batch = 16
+
+    def step():
+        for i in range(batch):
+            bus.publish(eid, i)
+        while not bus.event_queue.is_empty():
+            bus._dispatch_batch()
+
+    rate, _ = measure_rate(step, max(1, n // batch))
+    return {"events_per_s": round(rate * batch)}
+
+
+def bench_bus_alloc(n):
+    bus = bench_event_alloc.make_bus(event=EVENT)
+    metrics = {}
+    for key, (_name, fn) in zip(("bare", "positional", "keyword"), bench_event_alloc.cases(bus, EVENT)):
+        for _ in range(100):  # 预热, 使池与分发表进入稳态
+            fn()
+        metrics[key + "_bytes"] = round(measure_alloc(fn, n), 1)
+    return metrics
+
+
+def bench_bus_latency(n):
+    import uasyncio as asyncio
+
+    r = asyncio.run(bench_dispatch_latency.run("dispatcher", n, LATENCY_GAPS_MS))
+    return {key: r[key] for key in ("p50_us", "p95_us", "p99_us", "max_us")}
+
+
+def bench_queue_ops(n):
+    from lib.event_bus_lock import EventBusConfig, EventQueue
+
+    r = bench_event_queue.bench_queue(EventQueue, EventBusConfig.MAX_QUEUE_SIZE, n)
+    return {key: round(value, 1) for key, value in r.items()}
+
+
+def bench_fsm_event(n):
+    from lib.event_bus_lock import EVENTS
+
+    bus, nm, fsm = network_stack()
+    nm.wifi_connected = True
+    nm._link_stable = True  # 只测 FSM 转换, 跳过链路稳定窗口
+    mqtt_event = EVENTS["MQTT_STATE_CHANGE"]
+
+    def cycle():
+        nm.mqtt_connected = True
+        bus.publish(mqtt_event, state="connected")
+        bus._dispatch_batch()
+        nm.mqtt_connected = False
+        bus.publish(mqtt_event, state="disconnected")
+        bus._dispatch_batch()
+
+    rate, total_us = measure_rate(cycle, n)
+    rate_upd, _ = measure_rate(fsm.update, n)
+    return {
+        "cycle_us": round(total_us / n, 1),
+        "cycles_per_s": round(rate),
+        "update_per_s": round(rate_upd),
+    }
+
+
+def _metrics_payload():
+    """与 MainController._job_metrics_publish 发送的周期指标字段一致"""
+    return {
+        "uptime_ms": 123456789,
+        "unix_s": 1760000000,
+        "state": "RUNNING",
+        "mem": {"free_kb": 142, "percent": 37.5},
+        "mcu_temp_c": 41.2,
+        "env": {"temperature": 23.81, "humidity": 51.2},
+        "net": {"wifi": True, "ntp": True, "mqtt": True},
+    }
+
+
+def bench_json_dumps(n):
+    from utils import json_dumps
+
+    payload = _metrics_payload()
+    rate, _ = measure_rate(lambda: json_dumps(payload), n)
+    return {
+        "ops_per_s": round(rate),
+        "alloc_bytes": round(measure_alloc(lambda: json_dumps(payload), n), 1),
+        "payload_len": len(json_dumps(payload)),
+    }
+
+
+def _diag_payloads():
+    """由真实子系统生成诊断载荷, 剖析器/FSM 先产生若干样本使直方图非空"""
+    from lib.gc_scheduler import get_gc_scheduler
+    from lib.loop_profiler import LoopProfiler, PHASES
+    from lib.scheduler import get_scheduler
+    from lib.warm_boot import get_warm_boot
+
+    _bus, nm, fsm = network_stack()
+    profiler = LoopProfiler()
+    for phase in range(len(PHASES)):
+        for us in (40, 800, 7000, 250000):
+            profiler.record(phase, us)
+    return {
+        "link": nm.get_link_stats(),
+        "warm": get_warm_boot().get_stats(),
+        "sched": get_scheduler().get_stats(),
+        "gc": get_gc_scheduler().get_stats(),
+        "fsm": fsm.get_metrics(),
+        "loop": profiler.dump(),
+    }
+
+
+def bench_diag_payload(n):
+    from utils import json_dumps
+
+    payloads = _diag_payloads()
+    lengths = {name: len(json_dumps(p)) for name, p in payloads.items()}
+    name = max(lengths, key=lengths.get)
+    largest = payloads[name]
+    return {
+        "max_payload_len": lengths[name],
+        "max_payload": name,
+        "total_len": sum(lengths.values()),
+        "alloc_bytes": round(measure_alloc(lambda: json_dumps(largest), n), 1),
+    }
+
+
+def bench_mqtt_encode(n):
+    from lib.umqtt_lock import MQTTClient
+
+    client = MQTTClient(b"bench", "127.0.0.1")
+    client.sock = FakeSocket()
+    topic = b"device/aabbccddeeff/state/metrics"
+    msg = json.dumps(_metrics_payload()).encode()
+
+    def publish():
+        client.publish(topic, msg)
+
+    rate, _ = measure_rate(publish, n)
+    written = client.sock.written
+    return {
+        "ops_per_s": round(rate),
+        "alloc_bytes": round(measure_alloc(publish, n), 1),
+        "packet_len": (client.sock.written - written) // n,
+    }
+
+
+def bench_mqtt_publish(n):
+    _bus, nm, _fsm = network_stack()
+    ctrl = nm.mqtt_controller
+    if ctrl is None or ctrl.client is None:
+        return {"skipped": 1}
+    ctrl.client.sock = FakeSocket()
+    ctrl._is_connected = True
+    nm.mqtt_connected = True
+    topic = nm.get_state_topic("metrics")
+    payload = _metrics_payload()
+
+    def publish():
+        nm.mqtt_publish(topic, payload)
+
+    rate, _ = measure_rate(publish, n)
+    return {
+        "ops_per_s": round(rate),
+        "alloc_bytes": round(measure_alloc(publish, n), 1),
+    }
+
+
+def bench_loop_profiler(n):
+    from lib.loop_profiler import LoopProfiler, P_ITER
+
+    profiler = LoopProfiler()
+    samples = (40, 800, 7000, 250000)
+
+    def record():
+        for us in samples:
+            profiler.record(P_ITER, us)
+
+    rate, _ = measure_rate(record, n)
+    return {
+        "record_per_s": round(rate * len(samples)),
+        "alloc_bytes": round(measure_alloc(record, n) / len(samples), 1),
+    }
+
+
+# (名称, 函数, 默认迭代次数)
+CASES = (
+    ("bus_throughput", bench_bus_throughput, 20000),
+    ("bus_alloc", bench_bus_alloc, 2000),
+    ("bus_latency", bench_bus_latency, 200),
+    ("queue_ops", bench_queue_ops, 20000),
+    ("fsm_event", bench_fsm_event, 500),
+    ("json_dumps", bench_json_dumps, 2000),
+    ("diag_payload", bench_diag_payload, 500),
+    ("mqtt_encode", bench_mqtt_encode, 5000),
+    ("mqtt_publish", bench_mqtt_publish, 2000),
+    ("loop_profiler", bench_loop_profiler, 5000),
+)
+
+
+def _git_rev():
+    try:
+        import subprocess
+
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=benchlib.ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run_suite(only=None, quick=False):
+    _quiet_logs()
+    results = {}
+    for name, fn, n in CASES:
+        if only and name not in only:
+            continue
+        if quick:
+            n = max(10, n // 10)
+        gc.collect()
+        t0 = time.ticks_ms()
+        try:
+            metrics = fn(n)
+        except Exception as e:
+            metrics = {"error": repr(e)}
+        metrics["n"] = n
+        results[name] = metrics
+        print("{:<16} {} ({} ms)".format(name, metrics, time.ticks_diff(time.ticks_ms(), t0)))
+    return {
+        "meta": {
+            "impl": sys.implementation.name,
+            "version": ".".join(str(v) for v in sys.implementation.version[:3]),
+            "commit": None if IS_MICROPYTHON else _git_rev(),
+            "time": int(time.time()),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def _direction(metric):
+    for suffix, d in _DIRECTIONS:
+        if metric.endswith(suffix):
+            return d
+    return 0
+
+
+def compare(old, new, tolerance):
+    """逐指标对比两份报告, 返回劣化超过 tolerance(%) 的指标数"""
+    regressions = 0
+    print("{:<16} {:<18} {:>12} {:>12} {:>8}".format("case", "metric", "old", "new", "delta"))
+    for case, metrics in new["results"].items():
+        base = old["results"].get(case, {})
+        for metric, value in metrics.items():
+            d = _direction(metric)
+            ref = base.get(metric)
+            if not d or not isinstance(value, (int, float)) or not isinstance(ref, (int, float)) or not ref:
+                continue
+            delta = (value - ref) * 100.0 / ref
+            worse = delta * d < -tolerance
+            regressions += worse
+            print("{:<16} {:<18} {:>12} {:>12} {:>+7.1f}%{}".format(
+                case, metric, ref, value, delta, "  <-- 劣化" if worse else ""))
+    return regressions
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv):
+    out = None
+    only = None
+    quick = False
+    compare_paths = []
+    tolerance = 10.0
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "-o":
+            i += 1
+            out = argv[i]
+        elif arg == "--only":
+            i += 1
+            only = argv[i].split(",")
+        elif arg == "--quick":
+            quick = True
+        elif arg == "--compare":
+            while i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+                i += 1
+                compare_paths.append(argv[i])
+        elif arg == "--tolerance":
+            i += 1
+            tolerance = float(argv[i])
+        elif arg in ("-h", "--help"):
+            print(__doc__)
+            return 0
+        else:
+            print("未知参数: {}".format(arg))
+            return 2
+        i += 1
+
+    if compare_paths:
+        old = _load(compare_paths[0])
+        new = _load(compare_paths[1]) if len(compare_paths) > 1 else run_suite(only, quick)
+        bad = compare(old, new, tolerance)
+        print("劣化指标: {} (阈值 {}%)".format(bad, tolerance))
+        return 1 if bad else 0
+
+    report = run_suite(only, quick)
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f)
+        print("报告已写入 {}".format(out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+# tools/fsm_graph.py
+"""
+导出状态机转换表为 Graphviz DOT 文本
+
+用法:
+    python tools/fsm_graph.py > fsm.dot
+    dot -Tsvg fsm.dot -o fsm.svg
+"""
+
+import benchlib  # noqa: F401  (设置 sys.path)
+from state_machine import export_dot
+
+
+if __name__ == "__main__":
+    print(export_dot())
@@ -0,0 +1,135 @@
+# tools/stubs/machine.py
+"""
+主机端 machine 桩模块(仅用于 CPython 基准/回放工具)
+
+- Pin/Timer/WDT/I2C/RTC 只保存状态, 不驱动任何硬件
+- reset()/deepsleep() 不退出进程, 仅计数, 便于回放统计重启次数
+"""
+
+reset_count = 0
+deepsleep_count = 0
+
+PWRON_RESET = 1
+HARD_RESET = 2
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, pin, mode=-1, pull=-1, value=None):
+        self.pin = pin
+        self._value = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = 1 if v else 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        """保存中断回调, 主机端测试通过 fire_irq() 模拟边沿"""
+        self.irq_handler = handler
+        return None
+
+    def fire_irq(self):
+        if getattr(self, "irq_handler", None) is not None:
+            self.irq_handler(self)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, timer_id=-1):
+        self.timer_id = timer_id
+        self.callback = None
+
+    def init(self, mode=PERIODIC, period=-1, callback=None, freq=-1):
+        self.callback = callback
+
+    def deinit(self):
+        self.callback = None
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+
+    def feed(self):
+        pass
+
+
+class I2C:
+    def __init__(self, id=0, scl=None, sda=None, freq=400000):
+        pass
+
+    def scan(self):
+        return []
+
+    def writeto(self, addr, buf):
+        raise OSError(19)
+
+    def readfrom(self, addr, nbytes):
+        raise OSError(19)
+
+
+class RTC:
+    _memory = b""
+
+    def __init__(self, id=0):
+        pass
+
+    def memory(self, data=None):
+        if data is None:
+            return RTC._memory
+        RTC._memory = bytes(data)
+
+    def datetime(self, dt=None):
+        return (2000, 1, 1, 5, 0, 0, 0, 0)
+
+
+def unique_id():
+    return b"\x01\x02\x03\x04\x05\x06"
+
+
+def reset():
+    global reset_count
+    reset_count += 1
+
+
+def soft_reset():
+    reset()
+
+
+def reset_cause():
+    return PWRON_RESET
+
+
+def deepsleep(ms=0):
+    global deepsleep_count
+    deepsleep_count += 1
+
+
+def lightsleep(ms=0):
+    pass
+
+
+def idle():
+    pass
+
+
+def freq(hz=None):
+    return 160000000
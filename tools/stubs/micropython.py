@@ -0,0 +1,41 @@
+# tools/stubs/micropython.py
+"""
+主机端 micropython 桩模块(仅用于 CPython 基准/回放工具)
+
+主机上没有中断上下文, schedule() 把回调排入待执行队列, 由 run_scheduled() 在"主上下文"中执行,
+与设备上中断返回后再运行已调度回调的时序一致。
+"""
+
+_pending = []
+
+
+def const(x):
+    return x
+
+
+def schedule(fn, arg):
+    if len(_pending) >= 8:  # 与固件调度队列容量一致, 满时抛出 RuntimeError
+        raise RuntimeError("schedule queue full")
+    _pending.append((fn, arg))
+
+
+def run_scheduled():
+    """执行已调度的回调, 返回执行数"""
+    n = 0
+    while _pending:
+        fn, arg = _pending.pop(0)
+        fn(arg)
+        n += 1
+    return n
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def native(fn):
+    return fn
+
+
+def viper(fn):
+    return fn
@@ -0,0 +1,55 @@
+# tools/stubs/network.py
+"""
+主机端 network 桩模块(仅用于 CPython 基准/回放工具)
+
+WLAN 不产生真实连接, 连接状态可由工具通过 set_connected() 直接控制。
+"""
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 1000
+STAT_CONNECTING = 1001
+STAT_GOT_IP = 1010
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        self._active = False
+        self._connected = False
+        self._config = {"channel": 1, "mac": b"\x01\x02\x03\x04\x05\x06"}
+        self.scan_results = []
+
+    def active(self, state=None):
+        if state is None:
+            return self._active
+        self._active = bool(state)
+
+    def scan(self):
+        return list(self.scan_results)
+
+    def connect(self, ssid=None, password=None, bssid=None):
+        self._config["ssid"] = ssid
+
+    def disconnect(self):
+        self._connected = False
+
+    def isconnected(self):
+        return self._connected
+
+    def set_connected(self, connected):
+        self._connected = bool(connected)
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -60
+        return STAT_GOT_IP if self._connected else STAT_IDLE
+
+    def ifconfig(self, cfg=None):
+        return ("192.168.1.100", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+
+    def config(self, *args, **kwargs):
+        if kwargs:
+            self._config.update(kwargs)
+            return None
+        return self._config.get(args[0]) if args else None
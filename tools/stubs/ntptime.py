@@ -0,0 +1,13 @@
+# tools/stubs/ntptime.py
+"""主机端 ntptime 桩模块(仅用于 CPython 基准/回放工具), settime() 不访问网络"""
+
+host = "pool.ntp.org"
+
+
+def time():
+    import time as _time
+    return int(_time.time())
+
+
+def settime():
+    pass
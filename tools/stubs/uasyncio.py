@@ -0,0 +1,45 @@
+# tools/stubs/uasyncio.py
+"""
+主机端 uasyncio 桩模块(仅用于 CPython 基准/回放工具)
+
+在标准 asyncio 之上补齐 MicroPython 特有接口: sleep_ms, ThreadSafeFlag
+"""
+
+import asyncio as _asyncio
+from asyncio import (  # noqa: F401
+    CancelledError,
+    Event,
+    Lock,
+    TimeoutError,
+    create_task,
+    gather,
+    get_event_loop,
+    run,
+    sleep,
+    wait_for,
+)
+
+
+async def sleep_ms(ms):
+    await _asyncio.sleep(ms / 1000)
+
+
+def wait_for_ms(aw, timeout_ms):
+    return _asyncio.wait_for(aw, timeout_ms / 1000)
+
+
+class ThreadSafeFlag:
+    """与 MicroPython ThreadSafeFlag 语义一致: wait() 返回时自动清除"""
+
+    def __init__(self):
+        self._event = _asyncio.Event()
+
+    def set(self):
+        self._event.set()
+
+    def clear(self):
+        self._event.clear()
+
+    async def wait(self):
+        await self._event.wait()
+        self._event.clear()
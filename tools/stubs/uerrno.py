@@ -0,0 +1,4 @@
+# tools/stubs/uerrno.py
+"""主机端 uerrno 桩模块, 直接复用 CPython errno"""
+
+from errno import *  # noqa: F401,F403
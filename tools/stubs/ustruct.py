@@ -0,0 +1,4 @@
+# tools/stubs/ustruct.py
+"""主机端 ustruct 桩模块, 直接复用 CPython struct"""
+
+from struct import *  # noqa: F401,F403
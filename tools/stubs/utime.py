@@ -0,0 +1,83 @@
+# tools/stubs/utime.py
+"""
+主机端 utime 桩模块(仅用于 CPython 基准/回放工具)
+
+- 提供 ticks_ms/ticks_us/ticks_diff/ticks_add/sleep_ms 等 MicroPython 接口
+- ticks 在 2^30 处回绕, 与设备端语义一致
+- 支持通过 set_clock() 注入虚拟时钟, 便于确定性测量
+- 支持通过 set_time() 设定墙钟(模拟上电后 RTC 未校时与 NTP 校时)
+"""
+
+import time as _time
+
+TICKS_PERIOD = 1 << 30
+_TICKS_HALF = TICKS_PERIOD // 2
+
+# 时钟源: 返回单调递增的微秒数
+_clock_us = None
+# 墙钟: (设定的秒数, 设定时的时钟源微秒数), None 表示跟随主机时间
+_wall = None
+
+
+def _real_clock_us():
+    return _time.perf_counter_ns() // 1000
+
+
+def set_clock(fn_us=None):
+    """注入虚拟时钟(返回微秒的可调用对象), 传 None 恢复真实时钟"""
+    global _clock_us
+    _clock_us = fn_us
+
+
+def _now_us():
+    return _clock_us() if _clock_us is not None else _real_clock_us()
+
+
+def ticks_us():
+    return _now_us() % TICKS_PERIOD
+
+
+def ticks_ms():
+    return (_now_us() // 1000) % TICKS_PERIOD
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % TICKS_PERIOD
+
+
+def ticks_diff(a, b):
+    return ((a - b + _TICKS_HALF) % TICKS_PERIOD) - _TICKS_HALF
+
+
+def sleep_ms(ms):
+    if _clock_us is None and ms > 0:
+        _time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    if _clock_us is None and us > 0:
+        _time.sleep(us / 1000000)
+
+
+def sleep(s):
+    sleep_ms(int(s * 1000))
+
+
+def set_time(secs=None):
+    """设定墙钟为 secs 秒(之后随时钟源走时), 传 None 恢复主机时间"""
+    global _wall
+    _wall = None if secs is None else (int(secs), _now_us())
+
+
+def time():
+    if _wall is not None:
+        return _wall[0] + (_now_us() - _wall[1]) // 1000000
+    return int(_time.time())
+
+
+def localtime(secs=None):
+    return _time.localtime(secs)
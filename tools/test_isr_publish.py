@@ -0,0 +1,160 @@
+# tools/test_isr_publish.py
+"""
+中断发布路径主机端测试(CPython)
+
+用法:
+    python tools/test_isr_publish.py
+    python -m pytest -q tools/test_isr_publish.py
+
+覆盖: hw.button 引脚 IRQ -> EventBus.publish_from_isr -> 槽位环 -> micropython.schedule 搬运 /
+ThreadSafeFlag 唤醒分发任务 -> 订阅者; 消抖、槽位溢出计数, 以及无 ThreadSafeFlag 时不在中断中
+调用 asyncio.Event.set()。
+machine.Pin.fire_irq() 模拟边沿, micropython.run_scheduled() 模拟中断返回后运行已调度回调。
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchlib  # noqa: E402,F401  (设置 sys.path)
+
+import micropython  # noqa: E402
+import uasyncio as asyncio  # noqa: E402
+import utime  # noqa: E402
+import lib.logger as logger  # noqa: E402
+from hw import button  # noqa: E402
+from lib.event_bus_lock import EVENTS, EventBus, EventBusConfig, register_event  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.us = 1000000
+
+    def __call__(self):
+        return self.us
+
+    def advance_ms(self, ms):
+        self.us += ms * 1000
+
+
+def _setup():
+    logger.LOG_LEVEL = logger.ERROR
+    clock = _Clock()
+    utime.set_clock(clock)
+    micropython._pending.clear()
+    bus = EventBus()
+    bus.cleanup()
+    got = []
+    bus.subscribe(EVENTS["BUTTON_PRESS"], lambda event_name, pin: got.append(pin))
+    button.attach(bus, pin=9, debounce_ms=50)
+    return clock, bus, got
+
+
+def _teardown():
+    button.cleanup()
+    micropython._pending.clear()
+    utime.set_clock(None)
+
+
+def test_irq_scheduled_drain():
+    clock, bus, got = _setup()
+    try:
+        clock.advance_ms(100)
+        button._instance._pin.fire_irq()
+        assert bus.get_stats()["isr"]["pending"] == 1
+        assert got == []
+        assert micropython.run_scheduled() == 1
+        bus._dispatch_batch()
+        assert got == [9]
+        assert bus.get_stats()["isr"]["pending"] == 0
+    finally:
+        _teardown()
+
+
+def test_debounce():
+    clock, bus, got = _setup()
+    try:
+        pin = button._instance._pin
+        clock.advance_ms(100)
+        pin.fire_irq()
+        clock.advance_ms(10)
+        pin.fire_irq()  # 抖动, 丢弃
+        clock.advance_ms(60)
+        pin.fire_irq()
+        micropython.run_scheduled()
+        bus._dispatch_batch()
+        assert got == [9, 9]
+        assert button.get_stats()["presses"] == 2
+    finally:
+        _teardown()
+
+
+def test_slot_overflow_then_drain():
+    clock, bus, got = _setup()
+    try:
+        eid = register_event(EVENTS["BUTTON_PRESS"])
+        usable = EventBusConfig.ISR_SLOTS - 1
+        results = [bus.publish_from_isr(eid, i) for i in range(usable + 3)]
+        assert results == [True] * usable + [False] * 3
+        assert bus.get_stats()["isr"]["drops"] == 3
+        micropython.run_scheduled()
+        while bus._dispatch_batch():
+            pass
+        assert got == list(range(usable))
+    finally:
+        _teardown()
+
+
+def test_dispatcher_woken_by_thread_safe_flag():
+    clock, bus, got = _setup()
+    utime.set_clock(None)  # 分发任务使用真实时钟
+
+    async def run():
+        task = asyncio.create_task(bus.run_dispatcher())
+        await asyncio.sleep_ms(5)
+        button._instance._last_ms = utime.ticks_add(utime.ticks_ms(), -1000)
+        button._instance._pin.fire_irq()
+        assert micropython._pending == []  # ThreadSafeFlag 直接唤醒, 不经 schedule
+        await asyncio.sleep_ms(20)
+        task.cancel()
+
+    try:
+        asyncio.run(run())
+        assert got == [9]
+    finally:
+        _teardown()
+
+
+def test_event_fallback_uses_schedule():
+    clock, bus, got = _setup()
+    try:
+        # 模拟固件无 ThreadSafeFlag: 唤醒标志为 asyncio.Event, 中断中不得调用其 set()
+        bus._wake_isr_safe = False
+        bus._dispatcher_active = True
+        calls = []
+        bus._wake.set = lambda: calls.append(1)
+        clock.advance_ms(100)
+        button._instance._pin.fire_irq()
+        assert calls == []
+        assert len(micropython._pending) == 1
+        micropython.run_scheduled()  # 主上下文中 publish() 再置位唤醒标志
+        assert calls == [1]
+    finally:
+        _teardown()
+
+
+def _run():
+    failed = 0
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print("PASS", name)
+            except AssertionError as e:
+                failed += 1
+                print("FAIL", name, e)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_run())
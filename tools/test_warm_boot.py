@@ -0,0 +1,98 @@
+# tools/test_warm_boot.py
+"""
+热启动快照主机端测试(CPython)
+
+用法:
+    python tools/test_warm_boot.py
+    python -m pytest -q tools/test_warm_boot.py
+
+场景: 冷启动(RTC 墙钟接近纪元) -> WiFi 连通并获取 IP -> NTP 校时 -> 保存快照 -> 热复位后读取,
+断言首次热复位即可复用 IP 与 NTP; 租期耗尽后 IP 失效。
+虚拟时钟驱动 utime, machine.RTC 内存由 tools/stubs 在进程内保持(模拟软复位后 RTC 内存保留)。
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchlib  # noqa: E402,F401  (设置 sys.path)
+
+import machine  # noqa: E402
+import utime  # noqa: E402
+from lib.warm_boot import WarmBoot  # noqa: E402
+
+CONFIG = {"enabled": True, "max_age_s": 3600, "lease_s": 1800, "ntp_max_age_s": 21600}
+IFCONFIG = ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+NTP_EPOCH_S = 815000000  # NTP 校时后的墙钟(MicroPython 纪元 2000 年起算)
+
+
+class _Clock:
+    def __init__(self):
+        self.us = 0
+
+    def __call__(self):
+        return self.us
+
+    def advance(self, seconds):
+        self.us += int(seconds * 1000000)
+
+
+def _cold_boot_then_sync():
+    """上电: RTC 未校时 -> WiFi 连通 -> NTP 校时 -> 周期保存; 返回时钟"""
+    clock = _Clock()
+    utime.set_clock(clock)
+    machine.RTC._memory = b""
+    utime.set_time(3)  # 上电后 RTC 从接近纪元处走时
+
+    warm = WarmBoot(CONFIG)
+    assert not warm.warm
+    clock.advance(4)
+    warm.remember_wifi("home", b"\x11\x22\x33\x44\x55\x66", 6, IFCONFIG, renewed=True)
+    clock.advance(2)
+    utime.set_time(NTP_EPOCH_S)  # ntptime.settime()
+    warm.remember_ntp()
+    clock.advance(60)
+    warm.save()
+    return clock
+
+
+def test_first_warm_reset_reuses_ip():
+    clock = _cold_boot_then_sync()
+    clock.advance(30)  # 看门狗复位, RTC 走时与 RTC 内存保留
+
+    warm = WarmBoot(CONFIG)
+    assert warm.warm
+    assert warm.wifi_hint() == ("home", b"\x11\x22\x33\x44\x55\x66", 6)
+    assert warm.ip_hint() == IFCONFIG
+    assert warm.ntp_valid()
+
+
+def test_ip_expires_after_lease():
+    clock = _cold_boot_then_sync()
+    # 租期从获取 IP 时起算(NTP 校时前 2s), 而非校时后的时刻
+    clock.advance(CONFIG["lease_s"] - 60)
+
+    warm = WarmBoot(CONFIG)
+    assert warm.warm
+    assert warm.ip_hint() is None
+    assert warm.ntp_valid()
+
+
+def _run():
+    failed = 0
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print("PASS", name)
+            except AssertionError as e:
+                failed += 1
+                print("FAIL", name, e)
+            finally:
+                utime.set_time(None)
+                utime.set_clock(None)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_run())
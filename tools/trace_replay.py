@@ -0,0 +1,303 @@
+# tools/trace_replay.py
+"""
+事件追踪解码与离线回放(主机端, CPython)
+
+用法:
+    python tools/trace_replay.py trace.bin --dump           # 逐条打印记录
+    python tools/trace_replay.py trace.bin                  # 统计 + 回放到 FSM/NetworkManager
+    python tools/trace_replay.py --synth-storm storm.bin    # 生成与 run.log 相同节奏的 MQTT 重连风暴追踪
+
+回放方式:
+- 以追踪时间戳驱动虚拟时钟(utime.set_clock), 按发布记录重新发布状态事件
+- NetworkManager 的连接任务不启动, 其 wifi/mqtt 连接标志由追踪中的状态事件设置
+- 追踪中的连通/断开视为原始链路变化, 经当前 NetworkManager 的链路迟滞(稳定窗口、抖动计数)处理;
+  MQTT "connected" 由 NetworkManager 在链路稳定后自行发布, 不直接重放
+- 事件之间按 --tick-ms 步进调用 FSM.update(), 模拟主循环节拍
+- machine/network/ntptime 等硬件模块由 tools/stubs 提供
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchlib  # noqa: E402,F401  (设置 sys.path)
+
+import utime  # noqa: E402
+from benchlib import percentile  # noqa: E402
+from lib.event_trace import (  # noqa: E402
+    MAGIC, ENTRY_FMT, ENTRY_SIZE, KIND_PUBLISH, KIND_DISPATCH, EventTrace,
+)
+
+TICKS_PERIOD = utime.TICKS_PERIOD
+KIND_NAMES = {KIND_PUBLISH: "PUB", KIND_DISPATCH: "DSP"}
+
+
+def _read_str(data, pos):
+    n = data[pos]
+    return data[pos + 1: pos + 1 + n].decode("utf-8"), pos + 1 + n
+
+
+def decode(data):
+    """解码追踪文件, 返回 (事件名表, 状态码表, 记录列表)
+
+    记录为 dict: t_us(展开回绕后的相对时间), kind, eid, depth, state, dur_us
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("不是事件追踪文件")
+    version, entry_size, name_count = struct.unpack_from("<BBH", data, 4)
+    if entry_size != ENTRY_SIZE:
+        raise ValueError("记录长度不匹配: {} != {}".format(entry_size, ENTRY_SIZE))
+    pos = 8
+    names = []
+    for _ in range(name_count):
+        name, pos = _read_str(data, pos)
+        names.append(name)
+    state_count = data[pos]
+    pos += 1
+    states = []
+    for _ in range(state_count):
+        state, pos = _read_str(data, pos)
+        states.append(state)
+    (count,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+
+    entries = []
+    prev = None
+    t_us = 0
+    for i in range(count):
+        ts, kind, eid, depth, code, dur = struct.unpack_from(ENTRY_FMT, data, pos + i * ENTRY_SIZE)
+        if prev is not None:
+            t_us += (ts - prev) % TICKS_PERIOD
+        prev = ts
+        entries.append({
+            "t_us": t_us,
+            "kind": kind,
+            "eid": eid,
+            "depth": depth,
+            "state": states[code] if code < len(states) else "",
+            "dur_us": dur,
+        })
+    return names, states, entries
+
+
+def dump(names, entries):
+    for e in entries:
+        name = names[e["eid"]] if e["eid"] < len(names) else "#{}".format(e["eid"])
+        print("{:>12.3f}ms {} {:<24} depth={:<3} {:<16} {}".format(
+            e["t_us"] / 1000, KIND_NAMES.get(e["kind"], "?"), name, e["depth"], e["state"],
+            "{}us".format(e["dur_us"]) if e["kind"] == KIND_DISPATCH else "",
+        ))
+
+
+def summarize(names, entries):
+    """按事件统计发布数、分发耗时分位与最大队列深度"""
+    per_event = {}
+    max_depth = 0
+    for e in entries:
+        stat = per_event.setdefault(e["eid"], {"pub": 0, "durs": []})
+        if e["kind"] == KIND_PUBLISH:
+            stat["pub"] += 1
+        else:
+            stat["durs"].append(e["dur_us"])
+        max_depth = max(max_depth, e["depth"])
+
+    span_ms = entries[-1]["t_us"] / 1000 if entries else 0
+    print("追踪: {} 条记录, 跨度 {:.1f} ms, 最大队列深度 {}".format(len(entries), span_ms, max_depth))
+    print("{:<24} {:>6} {:>6} {:>8} {:>8} {:>8}".format("事件", "发布", "分发", "p50us", "p95us", "maxus"))
+    for eid, stat in sorted(per_event.items()):
+        durs = sorted(stat["durs"])
+        print("{:<24} {:>6} {:>6} {:>8} {:>8} {:>8}".format(
+            names[eid] if eid < len(names) else "#{}".format(eid), stat["pub"], len(durs),
+            percentile(durs, 50) if durs else "-", percentile(durs, 95) if durs else "-",
+            durs[-1] if durs else "-",
+        ))
+
+
+def replay(names, entries, tick_ms=50, stable_ms=None):
+    """把发布记录按原时间线重放到 FSM 与 NetworkManager, 返回回放报告
+
+    stable_ms 不为 None 时覆盖配置中的链路稳定窗口
+    """
+    clock = [0]
+    utime.set_clock(lambda: clock[0])
+
+    import machine
+    from config import get_config
+    from lib.async_runtime import get_async_runtime
+    from lib.event_bus_lock import EventBus, EVENTS
+
+    # 连接任务由追踪驱动, 不创建真实协程
+    get_async_runtime().create_task = lambda coro, name=None: coro.close()
+
+    from net.network_manager import NetworkManager
+    from state_machine import FSM, STATE_NAMES, STATE_RUNNING
+
+    config = get_config()
+    bus = EventBus()
+    nm = NetworkManager(config, bus)
+    if stable_ms is not None:
+        nm.link_stable_ms = stable_ms
+    fsm = FSM(bus, config, nm)
+
+    transitions = []
+    enter_state = fsm._enter_state
+
+    def record_enter(new_state):
+        transitions.append((clock[0], fsm.current_state, new_state))
+        enter_state(new_state)
+
+    fsm._enter_state = record_enter
+
+    flags = {
+        EVENTS["WIFI_STATE_CHANGE"]: "wifi_connected",
+        EVENTS["MQTT_STATE_CHANGE"]: "mqtt_connected",
+    }
+    tick_us = tick_ms * 1000
+    next_tick = 0
+
+    def advance(to_us):
+        nonlocal next_tick
+        while next_tick <= to_us:
+            clock[0] = next_tick
+            nm._check_link_stability(utime.ticks_ms())
+            bus._dispatch_batch()
+            fsm.update()
+            next_tick += tick_us
+        clock[0] = to_us
+
+    for e in entries:
+        if e["kind"] != KIND_PUBLISH or e["eid"] >= len(names):
+            continue
+        advance(e["t_us"])
+        name = names[e["eid"]]
+        flag = flags.get(name)
+        if flag and e["state"] in ("connected", "disconnected"):
+            was_up = nm.wifi_connected and nm.mqtt_connected
+            setattr(nm, flag, e["state"] == "connected")
+            if name == EVENTS["WIFI_STATE_CHANGE"] and e["state"] == "disconnected":
+                nm.mqtt_connected = False
+            is_up = nm.wifi_connected and nm.mqtt_connected
+            if is_up and not was_up:
+                nm._link_up()
+            elif was_up and not is_up:
+                nm._link_down()
+            if name == EVENTS["MQTT_STATE_CHANGE"] and e["state"] == "connected":
+                bus._dispatch_batch()
+                continue
+        if e["state"]:
+            bus.publish(name, state=e["state"])
+        else:
+            bus.publish(name)
+        bus._dispatch_batch()
+    if entries:
+        advance(entries[-1]["t_us"] + tick_us)
+
+    # 汇总: 各状态驻留时间与重连周期
+    residency = {}
+    last_t, last_state = 0, transitions[0][1] if transitions else fsm.current_state
+    for t, _old, new in transitions:
+        residency[last_state] = residency.get(last_state, 0) + (t - last_t)
+        last_t, last_state = t, new
+    residency[last_state] = residency.get(last_state, 0) + (clock[0] - last_t)
+
+    running_spans = []
+    entered_running = None
+    for t, old, new in transitions:
+        if new == STATE_RUNNING and entered_running is None:
+            entered_running = t
+        elif old == STATE_RUNNING and new != STATE_RUNNING and entered_running is not None:
+            running_spans.append(t - entered_running)
+            entered_running = None
+
+    metrics = fsm.get_metrics()
+    link = nm.get_link_stats()
+    utime.set_clock(None)
+    return {
+        "fsm": metrics,
+        "link": link,
+        "transitions": [(t, STATE_NAMES.get(o, "?"), STATE_NAMES.get(n, "?")) for t, o, n in transitions],
+        "residency_ms": {STATE_NAMES.get(s, "?"): us // 1000 for s, us in residency.items()},
+        "reconnects": len(running_spans),
+        "running_span_ms": [us // 1000 for us in running_spans],
+        "resets": machine.reset_count,
+        "bus": bus.get_stats(),
+    }
+
+
+def print_replay(report, show_transitions=False):
+    print("回放: {} 次状态转换, {} 次 RUNNING 后掉线, {} 次重启".format(
+        len(report["transitions"]), report["reconnects"], report["resets"]))
+    print("状态驻留(ms): {}".format(report["residency_ms"]))
+    spans = sorted(report["running_span_ms"])
+    if spans:
+        print("RUNNING 保持时长(ms): p50={} max={}".format(percentile(spans, 50), spans[-1]))
+    fsm = report["fsm"]
+    print("到达 RUNNING(ms) 桶上界 {}: 启动 {} 恢复 {}".format(
+        fsm["ttr_buckets_ms"], fsm["ttr_boot"], fsm["ttr_reconnect"]))
+    print("转换计数: {}".format(fsm["transitions"]))
+    print("链路: {}".format(report["link"]))
+    if show_transitions:
+        for t, old, new in report["transitions"]:
+            print("{:>12.3f}ms {} -> {}".format(t / 1000, old, new))
+
+
+def synth_storm(path, cycles=10, period_ms=4000, hold_ms=20):
+    """按 run.log 节奏生成追踪: WiFi 连接后, MQTT 每 period_ms 连上并在 hold_ms 内断开"""
+    from lib.event_bus_lock import EVENT_NAMES, EVENTS, event_id
+    from lib.event_trace import state_code
+
+    clock = [0]
+    utime.set_clock(lambda: clock[0])
+    trace = EventTrace(capacity=4 * cycles + 4)
+    wifi = event_id(EVENTS["WIFI_STATE_CHANGE"])
+    mqtt = event_id(EVENTS["MQTT_STATE_CHANGE"])
+
+    def emit(t_ms, eid, state):
+        clock[0] = t_ms * 1000
+        code = state_code((), {"state": state})
+        trace.record(KIND_PUBLISH, eid, 0, code)
+        clock[0] += 300
+        trace.record(KIND_DISPATCH, eid, 0, code, 300)
+
+    emit(0, wifi, "connected")
+    t = 3000
+    for _ in range(cycles):
+        emit(t, mqtt, "connected")
+        emit(t + hold_ms, mqtt, "disconnected")
+        t += period_ms
+    utime.set_clock(None)
+    return trace.flush(EVENT_NAMES, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="事件追踪解码与离线回放")
+    parser.add_argument("trace", nargs="?", help="设备导出的追踪文件(/trace.bin)")
+    parser.add_argument("--dump", action="store_true", help="逐条打印记录")
+    parser.add_argument("--no-replay", action="store_true", help="只统计不回放")
+    parser.add_argument("--transitions", action="store_true", help="打印回放中的状态转换")
+    parser.add_argument("--tick-ms", type=int, default=50, help="回放时 FSM.update() 步进间隔")
+    parser.add_argument("--stable-ms", type=int, help="覆盖链路稳定窗口(0 关闭迟滞)")
+    parser.add_argument("--synth-storm", metavar="OUT", help="生成重连风暴示例追踪并退出")
+    parser.add_argument("--cycles", type=int, default=10, help="示例追踪的重连次数")
+    args = parser.parse_args()
+
+    if args.synth_storm:
+        count = synth_storm(args.synth_storm, cycles=args.cycles)
+        print("已写入 {} ({} 条)".format(args.synth_storm, count))
+        return
+    if not args.trace:
+        parser.error("缺少追踪文件")
+
+    with open(args.trace, "rb") as f:
+        names, _states, entries = decode(f.read())
+    if args.dump:
+        dump(names, entries)
+    summarize(names, entries)
+    if not args.no_replay:
+        print_replay(replay(names, entries, args.tick_ms, args.stable_ms), args.transitions)
+
+
+if __name__ == "__main__":
+    main()